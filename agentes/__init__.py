@@ -7,11 +7,15 @@ from .agente_academico import AgenteAcademico
 from .agente_horarios import AgenteHorarios
 from .agente_regulamentos import AgenteRegulamentos
 from .agente_financeiro import AgenteFinanceiro
+from .barramento import BarramentoLocal
+from .admissao import AdmissaoInscricoes
 
 __all__ = [
     'AgenteAssistente',
     'AgenteAcademico',
     'AgenteHorarios',
     'AgenteRegulamentos',
-    'AgenteFinanceiro'
+    'AgenteFinanceiro',
+    'BarramentoLocal',
+    'AdmissaoInscricoes'
 ]
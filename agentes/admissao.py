@@ -0,0 +1,201 @@
+"""
+Admissão de Inscrições - Janelas por escalão e controlo do débito
+No início de um período de inscrições chegam pedidos de todos os estudantes
+ao mesmo tempo. O Agente Assistente faz passar cada inscrição por aqui antes
+de consultar os agentes especializados:
+- as janelas abrem por escalão (primeiro os estudantes com estatuto, depois
+  por ano, do mais avançado para o primeiro), com intervalo_janelas segundos
+  entre escalões;
+- os pedidos que chegam antes da sua janela, ou quando o débito está no
+  limite, esperam numa fila justa: cada estudante tem um pedido de cada vez
+  na fila, por muitos que envie;
+- os pedidos são admitidos a uma taxa configurável (pedidos/s) por um balde
+  de fichas, para que a carga fique dentro do que os agentes aguentam;
+- opcionalmente, um pedido que espera mais do que espera_maxima segundos
+  desiste e sai da fila.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+
+# Ano mais avançado considerado nos escalões (anos acima contam como este)
+ANO_MAXIMO = 5
+
+
+def escalao(estudante, ano_maximo=ANO_MAXIMO):
+    """
+    Escalão do estudante (0 abre primeiro): 0 com estatuto, depois um
+    escalão por ano, do ano_maximo para o 1.º
+    """
+    if estudante.get("estatuto"):
+        return 0
+    ano = min(max(estudante.get("ano", 1), 1), ano_maximo)
+    return 1 + ano_maximo - ano
+
+
+class BaldeFichas:
+    """
+    Balde de fichas: enche-se a taxa fichas por segundo até à capacidade e
+    cada pedido admitido gasta uma ficha. Permite rajadas até à capacidade,
+    mas o débito médio nunca passa a taxa.
+    """
+    
+    def __init__(self, taxa, capacidade=None, relogio=time.monotonic):
+        self.taxa = taxa
+        self.capacidade = capacidade or max(1.0, taxa)
+        self.relogio = relogio
+        self.fichas = self.capacidade
+        self.ultima = relogio()
+    
+    def encher(self):
+        agora = self.relogio()
+        self.fichas = min(self.capacidade, self.fichas + (agora - self.ultima) * self.taxa)
+        self.ultima = agora
+    
+    def tirar(self):
+        """Gasta uma ficha se houver; devolve False se o balde estiver vazio"""
+        self.encher()
+        if self.fichas >= 1:
+            self.fichas -= 1
+            return True
+        return False
+    
+    def espera(self):
+        """Segundos até haver uma ficha"""
+        self.encher()
+        return max(0.0, (1 - self.fichas) / self.taxa)
+
+
+class AdmissaoInscricoes:
+    """
+    Fila de admissão das inscrições, partilhada pelos pedidos do Assistente.
+    
+    Os pedidos cuja janela ainda não abriu esperam numa heap ordenada pela
+    hora de abertura, pela prioridade e pela ordem de chegada, e passam por
+    essa ordem para a fila quando a janela abre. Depois de aberta a janela,
+    ninguém passa à frente de quem já espera. A fila é justa entre
+    estudantes: cada um tem no máximo um pedido na fila e os seguintes só
+    entram, no fim da fila, quando o anterior é admitido, pelo que um
+    estudante que envia muitos pedidos não atrasa os outros. Uma única
+    tarefa despacha a fila à medida que o balde tem fichas.
+    """
+    
+    def __init__(self, taxa, rajada=None, intervalo_janelas=0.0, abertura=None,
+                 espera_maxima=None, relogio=time.monotonic):
+        self.relogio = relogio
+        self.balde = BaldeFichas(taxa, rajada, relogio)
+        # Segundos entre a abertura de um escalão e a do seguinte
+        self.intervalo_janelas = intervalo_janelas
+        # Instante em que abre o escalão 0 (por omissão, agora)
+        self.abertura = relogio() if abertura is None else abertura
+        # Segundos que um pedido espera antes de desistir (None: sem limite)
+        self.espera_maxima = espera_maxima
+        # Heap de (abre_em, prioridade, sequencia, estudante_id, futuro) dos pedidos antes da janela
+        self.por_abrir = []
+        self.sequencia = itertools.count()
+        # Fila de (estudante_id, futuro) com a janela aberta, um pedido por estudante
+        self.fila = deque()
+        # estudante_id (com um pedido na fila) -> pedidos seguintes do estudante
+        self.seguintes = {}
+        self.chegada = asyncio.Event()
+        self.despacho = None
+        self.admitidos = 0
+    
+    def abre_em(self, escalao):
+        """Instante em que abre a janela do escalão"""
+        return self.abertura + escalao * self.intervalo_janelas
+    
+    async def admitir(self, estudante_id, escalao=0, prioridade=()):
+        """
+        Espera até o pedido ser admitido e devolve True; devolve False se
+        desistir ao fim de espera_maxima segundos. Passa logo se a janela do
+        escalão já abriu, não há ninguém à espera (na fila ou com a janela já
+        aberta) e o balde tem fichas.
+        """
+        agora = self.relogio()
+        abre_em = self.abre_em(escalao)
+        aberta = agora >= abre_em
+        # Quem chegou antes, para uma janela que entretanto abriu, passa à frente
+        self.abrir(agora)
+        if aberta and not self.fila and self.balde.tirar():
+            self.admitidos += 1
+            return True
+        
+        futuro = asyncio.get_running_loop().create_future()
+        if aberta:
+            self.enfileirar(estudante_id, futuro)
+        else:
+            heapq.heappush(self.por_abrir, (abre_em, prioridade, next(self.sequencia), estudante_id, futuro))
+        self.chegada.set()
+        if self.despacho is None or self.despacho.done():
+            self.despacho = asyncio.create_task(self.despachar())
+        try:
+            # O futuro é cancelado se o tempo acabar e o despacho passa-lhe à frente
+            await asyncio.wait_for(futuro, self.espera_maxima)
+        except asyncio.TimeoutError:
+            return False
+        return True
+    
+    def abrir(self, agora):
+        """Passa para a fila, pela ordem de prioridade e de chegada, os pedidos cuja janela já abriu"""
+        while self.por_abrir and self.por_abrir[0][0] <= agora:
+            *_, estudante_id, futuro = heapq.heappop(self.por_abrir)
+            if not futuro.done():
+                self.enfileirar(estudante_id, futuro)
+    
+    def enfileirar(self, estudante_id, futuro):
+        """Coloca o pedido no fim da fila ou, se o estudante já lá tiver um, a seguir a esse"""
+        if estudante_id in self.seguintes:
+            self.seguintes[estudante_id].append(futuro)
+        else:
+            self.seguintes[estudante_id] = deque()
+            self.fila.append((estudante_id, futuro))
+    
+    def avancar(self):
+        """Retira o primeiro da fila; o pedido seguinte do mesmo estudante passa para o fim"""
+        estudante_id, futuro = self.fila.popleft()
+        seguintes = self.seguintes[estudante_id]
+        while seguintes and seguintes[0].done():
+            seguintes.popleft()
+        if seguintes:
+            self.fila.append((estudante_id, seguintes.popleft()))
+        else:
+            del self.seguintes[estudante_id]
+        return futuro
+    
+    async def despachar(self):
+        """Abre as janelas a seu tempo e admite os pedidos da fila ao débito do balde"""
+        while self.fila or self.por_abrir:
+            agora = self.relogio()
+            self.abrir(agora)
+            
+            if self.fila and self.fila[0][1].done():
+                # Pedido que desistiu de esperar (espera_maxima ou cancelamento)
+                self.avancar()
+                continue
+            if not self.fila:
+                await self.dormir(self.por_abrir[0][0] - agora)
+                continue
+            if not self.balde.tirar():
+                await self.dormir(self.balde.espera())
+                continue
+            
+            self.admitidos += 1
+            self.avancar().set_result(None)
+    
+    async def dormir(self, segundos):
+        """Espera, mas acorda mais cedo se chegar um pedido"""
+        self.chegada.clear()
+        try:
+            await asyncio.wait_for(self.chegada.wait(), segundos)
+        except asyncio.TimeoutError:
+            pass
+    
+    def em_fila(self):
+        """Pedidos à espera de admissão (antes da janela ou na fila)"""
+        return (sum(1 for *_, futuro in self.por_abrir if not futuro.done())
+                + sum(1 for _, futuro in self.fila if not futuro.done())
+                + sum(1 for seguintes in self.seguintes.values() for futuro in seguintes if not futuro.done()))
@@ -4,11 +4,26 @@ Este agente verifica regras académicas como pré-requisitos,
 limites de créditos, e processa equivalências.
 """
 
+import asyncio
 import json
-import os
+import time
 from spade.agent import Agent
 from spade.behaviour import CyclicBehaviour
 from spade.message import Message
+from .repositorio import RepositorioDados, obter_repositorio
+from .creditos import LIMITE_CREDITOS, CreditosInscritos
+from .elegibilidade import calcular_elegibilidade
+from .equivalencias import decidir
+from .lista_espera import ListaEspera, prioridade
+from .reservas import RegistoVagas
+from .turmas import escolher_turma, separar_chave
+
+# Máximo de decisões de equivalência guardadas (as mais antigas saem primeiro)
+LIMITE_DECISOES_EQUIVALENCIA = 100000
+
+# Segundos entre revisões das listas de espera (lugares libertados por reservas
+# que expiraram ou por vagas acrescentadas ao catálogo)
+INTERVALO_LISTA_ESPERA = 1.0
 
 
 class AcademicoBehaviour(CyclicBehaviour):
@@ -18,27 +33,38 @@ class AcademicoBehaviour(CyclicBehaviour):
         print("✅ Agente Académico iniciado.")
         await self.carregar_dados()
     
-    async def carregar_dados(self):
+    async def carregar_dados(self, diretorio=None):
         """Carrega dados de cursos e estudantes"""
+        # Gravações de inscrições em curso
+        self.gravacoes = set()
+        # Lugares reservados por inscrições aprovadas e ainda não gravadas
+        self.registo_vagas = RegistoVagas()
+        # Estudantes à espera de vaga, promovidos quando um lugar fica livre
+        self.lista_espera = ListaEspera()
+        self.promocao = None
+        self.ultima_revisao = time.monotonic()
+        # Decisões de equivalência já tomadas: (origem, destino) -> decisão
+        self.decisoes_equivalencia = {}
+        # Tabela e catálogo a partir dos quais as decisões foram tomadas
+        self.origem_decisoes = None
         try:
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            
-            with open(os.path.join(base_dir, 'data', 'cursos.json'), 'r', encoding='utf-8') as f:
-                self.cursos_data = json.load(f)
-            
-            with open(os.path.join(base_dir, 'data', 'estudantes.json'), 'r', encoding='utf-8') as f:
-                self.estudantes_data = json.load(f)
+            self.repositorio = obter_repositorio(diretorio)
             
             print("📚 Dados académicos carregados com sucesso.")
         except Exception as e:
             print(f"❌ Erro ao carregar dados: {e}")
-            self.cursos_data = {"cursos": []}
-            self.estudantes_data = {"estudantes": []}
+            self.repositorio = RepositorioDados(diretorio)
+        # Um só registo de créditos por repositório, avisado pelo armazenamento partilhado
+        if self.repositorio.creditos is None:
+            self.repositorio.creditos = CreditosInscritos(self.repositorio)
     
     async def run(self):
         """Processa pedidos relacionados com regras académicas"""
         msg = await self.receive(timeout=10)
         
+        if self.lista_espera.filas and time.monotonic() - self.ultima_revisao >= INTERVALO_LISTA_ESPERA:
+            self.agendar_promocao()
+        
         if msg:
             try:
                 content = json.loads(msg.body)
@@ -46,23 +72,313 @@ class AcademicoBehaviour(CyclicBehaviour):
                 
                 if tipo == "verificar_inscricao":
                     resposta = await self.verificar_inscricao(content)
+                elif tipo == "verificar_inscricao_lote":
+                    resposta = await self.verificar_inscricao_lote(content)
                 elif tipo == "verificar_equivalencia":
                     resposta = await self.verificar_equivalencia(content)
+                elif tipo == "verificar_equivalencia_lote":
+                    resposta = await self.verificar_equivalencia_lote(content)
+                elif tipo == "cadeia_prerequisitos":
+                    resposta = await self.cadeia_prerequisitos(content)
+                elif tipo == "creditos_restantes":
+                    resposta = await self.creditos_restantes(content)
+                elif tipo == "libertar_reserva":
+                    resposta = await self.libertar_reserva(content)
+                elif tipo == "entrar_lista_espera":
+                    resposta = await self.entrar_lista_espera(content)
+                elif tipo == "sair_lista_espera":
+                    resposta = await self.sair_lista_espera(content)
+                elif tipo == "consultar_lista_espera":
+                    resposta = await self.consultar_lista_espera(content)
+                elif tipo in ("registar_inscricao", "anular_inscricao"):
+                    # A gravação é aguardada numa tarefa à parte, para que os outros
+                    # pedidos continuem a ser atendidos enquanto o commit decorre
+                    tarefa = asyncio.create_task(self.gravar_e_responder(msg, content))
+                    self.gravacoes.add(tarefa)
+                    tarefa.add_done_callback(self.gravacoes.discard)
+                    return
                 else:
                     resposta = {
                         "status": "erro",
                         "mensagem": "Tipo de pedido desconhecido"
                     }
                 
-                # Enviar resposta
-                reply = Message(to=str(msg.sender))
-                reply.set_metadata("performative", "inform")
-                reply.body = json.dumps(resposta)
-                await self.send(reply)
+                await self.responder(msg, resposta)
                 
             except Exception as e:
                 print(f"❌ Erro no Agente Académico: {e}")
     
+    async def responder(self, msg, resposta):
+        """Envia a resposta ao remetente do pedido"""
+        reply = Message(to=str(msg.sender))
+        reply.set_metadata("performative", "inform")
+        reply.thread = msg.thread
+        reply.body = json.dumps(resposta)
+        await self.send(reply)
+    
+    async def gravar_e_responder(self, msg, content):
+        """Grava a inscrição ou anulação pedida e responde quando estiver gravada"""
+        try:
+            if content.get("tipo") == "registar_inscricao":
+                resposta = await self.registar_inscricao(content)
+            else:
+                resposta = await self.anular_inscricao(content)
+        except Exception as e:
+            print(f"❌ Erro ao gravar no Agente Académico: {e}")
+            resposta = {
+                "status": "erro",
+                "mensagem": "Não foi possível gravar a alteração"
+            }
+        await self.responder(msg, resposta)
+    
+    async def registar_inscricao(self, content):
+        """
+        Grava as inscrições aprovadas e ocupa as respetivas vagas. Nas
+        disciplinas com turmas, o estudante fica na turma com mais lugares
+        livres de entre as que não colidem com o seu horário ("turmas":
+        {disciplina: [turmas sem conflito]}, indicadas pelo Agente Horários).
+        """
+        estudante_id = content.get("estudante_id")
+        disciplinas = content.get("disciplinas", [])
+        candidatas = content.get("turmas", {})
+        
+        print(f"💾 Registando inscrição: {estudante_id} -> {', '.join(disciplinas)}")
+        
+        estudante = self.buscar_estudante(estudante_id)
+        if not estudante:
+            return {
+                "status": "erro",
+                "mensagem": "Estudante não encontrado"
+            }
+        
+        # Cada lugar é confirmado e registado sem ceder o controlo entre os dois
+        # passos, para que nenhum outro pedido o veja livre entretanto
+        inscritas = estudante.get("disciplinas_inscritas", [])
+        registadas = []
+        sem_vaga = []
+        turmas = {}
+        gravacoes = []
+        for d in dict.fromkeys(disciplinas):
+            if d in inscritas:
+                # Uma inscrição já gravada não ocupa segunda vaga
+                registadas.append(d)
+                continue
+            curso = self.buscar_curso(d)
+            turma = None
+            if curso and curso.get("turmas"):
+                turma = escolher_turma(curso, candidatas.get(d))
+                if turma is None:
+                    # Sem lugar numa turma compatível: a reserva da disciplina deixa de servir
+                    self.registo_vagas.libertar(estudante_id, d)
+                    sem_vaga.append(d)
+                    continue
+            if not curso or not self.registo_vagas.confirmar(estudante_id, d, curso.get("vagas", 0)):
+                sem_vaga.append(d)
+                continue
+            gravacoes.append(self.repositorio.armazenamento.inscrever(estudante_id, d, turma))
+            registadas.append(d)
+            if turma:
+                turmas[d] = turma
+        await asyncio.gather(*gravacoes)
+        
+        if sem_vaga:
+            return {
+                "status": "recusado",
+                "mensagem": f"Não há vagas disponíveis em {', '.join(sem_vaga)}",
+                "registadas": registadas,
+                "sem_vaga": sem_vaga,
+                "turmas": turmas
+            }
+        return {
+            "status": "sucesso",
+            "mensagem": f"Inscrição registada em {len(registadas)} disciplina(s)",
+            "registadas": registadas,
+            "sem_vaga": [],
+            "turmas": turmas
+        }
+    
+    async def libertar_reserva(self, content):
+        """Liberta o lugar reservado numa inscrição que não chegou a ser confirmada"""
+        libertada = self.registo_vagas.libertar(content.get("estudante_id"), content.get("disciplina"))
+        return {
+            "status": "sucesso" if libertada else "erro",
+            "mensagem": "Reserva libertada" if libertada else "Reserva não encontrada"
+        }
+    
+    async def anular_inscricao(self, content):
+        """Anula uma inscrição e liberta a vaga"""
+        estudante_id = content.get("estudante_id")
+        disciplina = content.get("disciplina")
+        
+        print(f"🗑️ Anulando inscrição: {estudante_id} -> {disciplina}")
+        
+        estudante = self.buscar_estudante(estudante_id)
+        if not estudante or disciplina not in estudante.get("disciplinas_inscritas", []):
+            return {
+                "status": "erro",
+                "mensagem": "Não está inscrito nesta disciplina"
+            }
+        
+        turma = estudante.get("turmas", {}).get(disciplina)
+        await self.repositorio.armazenamento.anular_inscricao(estudante_id, disciplina, turma)
+        # O lugar libertado passa ao primeiro estudante da lista de espera
+        if self.lista_espera.filas:
+            self.agendar_promocao()
+        
+        return {
+            "status": "sucesso",
+            "mensagem": f"Inscrição em {disciplina} anulada"
+        }
+    
+    async def entrar_lista_espera(self, content):
+        """
+        Coloca o estudante na lista de espera de uma disciplina sem vagas. A
+        posição depende do estatuto e do ano (ver lista_espera.prioridade) e
+        é dada pela consulta da lista de espera; quando um lugar fica livre,
+        a inscrição é feita automaticamente.
+        """
+        estudante_id = content.get("estudante_id")
+        disciplina = content.get("disciplina")
+        
+        print(f"⏳ Lista de espera: {estudante_id} -> {disciplina}")
+        
+        estudante = self.buscar_estudante(estudante_id)
+        if not estudante:
+            return {
+                "status": "erro",
+                "mensagem": "Estudante não encontrado"
+            }
+        if not self.buscar_curso(disciplina):
+            return {
+                "status": "erro",
+                "mensagem": "Disciplina não encontrada"
+            }
+        if disciplina in estudante.get("disciplinas_inscritas", []) or disciplina in estudante.get("disciplinas_completas", []):
+            return {
+                "status": "erro",
+                "mensagem": "Já está inscrito ou já completou esta disciplina"
+            }
+        
+        horario = tuple(
+            aula
+            for chave in self.repositorio.chaves_horario(disciplina)
+            for aula in self.repositorio.buscar_horario(chave) or ()
+        )
+        estatuto = self.repositorio.buscar_estatuto(estudante.get("estatuto"))
+        self.lista_espera.entrar(estudante_id, disciplina, prioridade(estudante, estatuto, horario))
+        em_espera = self.lista_espera.em_espera(disciplina)
+        return {
+            "status": "sucesso",
+            "disciplina": disciplina,
+            "em_espera": em_espera,
+            "mensagem": f"Em lista de espera para {disciplina} ({em_espera} estudante(s) em espera)"
+        }
+    
+    async def sair_lista_espera(self, content):
+        """Retira o estudante da lista de espera de uma disciplina"""
+        saiu = self.lista_espera.sair(content.get("estudante_id"), content.get("disciplina"))
+        return {
+            "status": "sucesso" if saiu else "erro",
+            "mensagem": "Saiu da lista de espera" if saiu else "Não está na lista de espera desta disciplina"
+        }
+    
+    async def consultar_lista_espera(self, content):
+        """Disciplinas em que o estudante está em espera (com a posição) e as já obtidas pela lista"""
+        estudante_id = content.get("estudante_id")
+        em_espera = self.lista_espera.do_estudante(estudante_id)
+        promovidas = self.lista_espera.promovidas.get(estudante_id, [])
+        return {
+            "status": "sucesso",
+            "lista_espera": em_espera,
+            "promovidas": promovidas,
+            "mensagem": f"Em espera em {len(em_espera)} disciplina(s), {len(promovidas)} obtida(s) pela lista de espera"
+        }
+    
+    def agendar_promocao(self):
+        """Revê as listas de espera numa tarefa à parte (uma de cada vez), sem atrasar os pedidos"""
+        self.ultima_revisao = time.monotonic()
+        if self.promocao and not self.promocao.done():
+            return
+        self.promocao = asyncio.create_task(self.promover_pendentes())
+        self.gravacoes.add(self.promocao)
+        self.promocao.add_done_callback(self.gravacoes.discard)
+    
+    async def promover_pendentes(self):
+        """Promove estudantes em todas as disciplinas com lista de espera e lugares livres"""
+        try:
+            for disciplina in self.lista_espera.disciplinas():
+                await self.promover_lista_espera(disciplina)
+        except Exception as e:
+            print(f"❌ Erro ao promover a lista de espera: {e}")
+    
+    async def promover_lista_espera(self, disciplina):
+        """
+        Enquanto a disciplina tiver lugares livres, inscreve o primeiro estudante
+        elegível da lista de espera. As verificações de conflitos de horário e
+        das regras académicas (créditos, pré-requisitos) são repetidas para cada
+        estudante; quem não passa mantém o lugar na lista para uma próxima vaga.
+        Devolve os estudantes inscritos.
+        """
+        promovidos = []
+        adiados = []
+        try:
+            while True:
+                curso = self.buscar_curso(disciplina)
+                if not curso or self.registo_vagas.disponiveis(disciplina, curso.get("vagas", 0)) <= 0:
+                    break
+                entrada = self.lista_espera.retirar(disciplina)
+                if entrada is None:
+                    break
+                estudante_id = entrada[0]
+                estudante = self.buscar_estudante(estudante_id)
+                if not estudante:
+                    continue
+                if disciplina in estudante.get("disciplinas_inscritas", []) or disciplina in estudante.get("disciplinas_completas", []):
+                    continue
+                
+                turmas = self.turmas_sem_conflito(estudante, disciplina)
+                if turmas is None:
+                    adiados.append(entrada)
+                    continue
+                if not self.avaliar_inscricao(estudante, disciplina, self.creditos_inscritos(estudante))["aprovado"]:
+                    adiados.append(entrada)
+                    continue
+                resposta = await self.registar_inscricao({
+                    "estudante_id": estudante_id,
+                    "disciplinas": [disciplina],
+                    "turmas": {disciplina: turmas} if turmas else {}
+                })
+                if resposta["status"] != "sucesso":
+                    adiados.append(entrada)
+                    continue
+                self.lista_espera.promovida(estudante_id, disciplina)
+                promovidos.append(estudante_id)
+                print(f"⬆️ Lista de espera: {estudante_id} inscrito em {disciplina}")
+        finally:
+            for estudante_id, ordem in adiados:
+                self.lista_espera.repor(estudante_id, disciplina, ordem)
+        return promovidos
+    
+    def turmas_sem_conflito(self, estudante, disciplina):
+        """
+        Repete a verificação de conflitos do Agente Horários com os horários
+        do repositório: devolve None se a disciplina colidir com as
+        inscrições do estudante, as turmas sem conflito se tiver turmas, ou []
+        """
+        turmas = estudante.get("turmas", {})
+        inscritas = [
+            chave for codigo in estudante.get("disciplinas_inscritas", [])
+            for chave in self.repositorio.chaves_horario(codigo, turmas.get(codigo))
+        ]
+        
+        livres = [
+            chave for chave in self.repositorio.chaves_horario(disciplina)
+            if not any(self.repositorio.colidem(chave, outra) for outra in inscritas)
+        ]
+        if not livres:
+            return None
+        return [turma for _, turma in map(separar_chave, livres) if turma]
+    
     async def verificar_inscricao(self, content):
         """Verifica se estudante pode se inscrever na disciplina"""
         estudante_id = content.get("estudante_id")
@@ -78,6 +394,46 @@ class AcademicoBehaviour(CyclicBehaviour):
                 "mensagem": "Estudante não encontrado"
             }
         
+        return self.avaliar_inscricao(estudante, disciplina_codigo, self.creditos_inscritos(estudante))
+    
+    async def verificar_inscricao_lote(self, content):
+        """
+        Verifica a inscrição em várias disciplinas de uma só vez.
+        As disciplinas são avaliadas pela ordem do pedido e o limite de
+        créditos aplica-se ao conjunto das inscrições atuais e das já
+        aprovadas neste lote.
+        """
+        estudante_id = content.get("estudante_id")
+        disciplinas = content.get("disciplinas", [])
+        
+        print(f"🎓 Verificando inscrição em lote: {estudante_id} -> {', '.join(disciplinas)}")
+        
+        estudante = self.buscar_estudante(estudante_id)
+        if not estudante:
+            return {
+                "aprovado": False,
+                "mensagem": "Estudante não encontrado",
+                "resultados": []
+            }
+        
+        creditos_atuais = self.creditos_inscritos(estudante)
+        resultados = []
+        for disciplina_codigo in disciplinas:
+            resultado = self.avaliar_inscricao(estudante, disciplina_codigo, creditos_atuais)
+            if resultado["aprovado"]:
+                creditos_atuais += self.buscar_curso(disciplina_codigo).get("creditos", 0)
+            resultados.append({"disciplina": disciplina_codigo, **resultado})
+        
+        return {
+            "aprovado": any(r["aprovado"] for r in resultados),
+            "resultados": resultados
+        }
+    
+    def avaliar_inscricao(self, estudante, disciplina_codigo, creditos_atuais):
+        """
+        Aplica as regras de inscrição a uma disciplina, dado o total de créditos
+        já inscritos. Se a inscrição for aprovada, fica com um lugar reservado.
+        """
         # Buscar curso
         curso = self.buscar_curso(disciplina_codigo)
         if not curso:
@@ -100,45 +456,124 @@ class AcademicoBehaviour(CyclicBehaviour):
                 "mensagem": "Já completou esta disciplina"
             }
         
-        # Verificar pré-requisitos
-        prerequisitos = curso.get("prerequisitos", [])
-        disciplinas_completas = estudante.get("disciplinas_completas", [])
-        
-        prerequisitos_faltantes = [p for p in prerequisitos if p not in disciplinas_completas]
-        
-        if prerequisitos_faltantes:
+        # Verificar pré-requisitos (em bits, no grafo compilado do catálogo)
+        grafo = self.repositorio.grafo_prerequisitos
+        if grafo.faltam(disciplina_codigo, grafo.feitas(estudante)):
+            disciplinas_completas = estudante.get("disciplinas_completas", [])
+            prerequisitos_faltantes = [p for p in curso.get("prerequisitos", []) if p not in disciplinas_completas]
             return {
                 "aprovado": False,
                 "mensagem": f"Faltam pré-requisitos: {', '.join(prerequisitos_faltantes)}"
             }
         
-        # Verificar vagas
+        # Verificar vagas (descontando os lugares reservados por outros pedidos)
         vagas = curso.get("vagas", 0)
-        if vagas <= 0:
+        if self.registo_vagas.disponiveis(disciplina_codigo, vagas, estudante.get("id")) <= 0:
             return {
                 "aprovado": False,
-                "mensagem": "Não há vagas disponíveis"
+                "mensagem": "Não há vagas disponíveis",
+                "sem_vaga": True
             }
         
         # Verificar limite de créditos (máximo 30 créditos por semestre)
-        creditos_atuais = sum([
-            self.buscar_curso(d).get("creditos", 0) 
-            for d in estudante.get("disciplinas_inscritas", [])
-            if self.buscar_curso(d)
-        ])
         novos_creditos = curso.get("creditos", 0)
         
-        if creditos_atuais + novos_creditos > 30:
+        if creditos_atuais + novos_creditos > LIMITE_CREDITOS:
             return {
                 "aprovado": False,
-                "mensagem": f"Excede o limite de 30 créditos por semestre (atual: {creditos_atuais}, novo: {novos_creditos})"
+                "mensagem": f"Excede o limite de {LIMITE_CREDITOS} créditos por semestre (atual: {creditos_atuais}, novo: {novos_creditos})"
             }
         
+        self.registo_vagas.reservar(estudante.get("id"), disciplina_codigo, vagas)
         return {
             "aprovado": True,
             "mensagem": f"Inscrição aprovada em {curso.get('nome')} ({novos_creditos} créditos)"
         }
     
+    def calcular_elegibilidade(self):
+        """
+        Modo em lote: para todos os estudantes e todas as disciplinas, indica
+        se a inscrição seria aprovada pelas regras de verificar_inscricao, numa
+        matriz NumPy (MatrizElegibilidade). Não reserva lugares; o resultado
+        reflete as inscrições e vagas do momento em que é calculado.
+        """
+        estudantes = [self.buscar_estudante(e.get("id")) for e in self.repositorio.estudantes]
+        cursos = [self.buscar_curso(codigo) for codigo in self.repositorio.cursos_por_codigo]
+        livres = [self.registo_vagas.disponiveis(c.get("codigo"), c.get("vagas", 0)) > 0 for c in cursos]
+        return calcular_elegibilidade(estudantes, cursos, self.repositorio.grafo_prerequisitos, livres)
+    
+    def creditos_inscritos(self, estudante):
+        """Créditos das disciplinas em que o estudante está inscrito (total mantido em memória)"""
+        return self.repositorio.creditos.total(estudante.get("id"))
+    
+    async def creditos_restantes(self, content):
+        """Créditos inscritos do estudante e quantos pode ainda inscrever neste semestre"""
+        estudante_id = content.get("estudante_id")
+        
+        print(f"🧮 Créditos restantes: {estudante_id}")
+        
+        estudante = self.buscar_estudante(estudante_id)
+        if not estudante:
+            return {
+                "status": "erro",
+                "mensagem": "Estudante não encontrado"
+            }
+        
+        creditos = self.repositorio.creditos
+        inscritos = creditos.total(estudante_id)
+        restantes = creditos.restantes(estudante_id)
+        return {
+            "status": "sucesso",
+            "estudante_id": estudante_id,
+            "creditos_inscritos": inscritos,
+            "creditos_restantes": restantes,
+            "limite": LIMITE_CREDITOS,
+            "mensagem": f"{inscritos} créditos inscritos, pode inscrever mais {restantes} (limite: {LIMITE_CREDITOS})"
+        }
+    
+    async def cadeia_prerequisitos(self, content):
+        """
+        Cadeia completa de pré-requisitos de uma disciplina (diretos e
+        indiretos), pela ordem em que podem ser feitos. Com estudante_id
+        indica também os que o estudante ainda não fez.
+        """
+        estudante_id = content.get("estudante_id")
+        disciplina_codigo = content.get("disciplina")
+        
+        print(f"🔗 Cadeia de pré-requisitos: {disciplina_codigo}")
+        
+        if not self.buscar_curso(disciplina_codigo):
+            return {
+                "status": "erro",
+                "mensagem": "Disciplina não encontrada"
+            }
+        
+        grafo = self.repositorio.grafo_prerequisitos
+        cadeia = grafo.cadeia(disciplina_codigo) & ~grafo.conjunto([disciplina_codigo])
+        resposta = {
+            "status": "sucesso",
+            "disciplina": disciplina_codigo,
+            "cadeia": grafo.codigos_de(cadeia),
+            "mensagem": f"{disciplina_codigo} tem {bin(cadeia).count('1')} pré-requisitos na cadeia completa"
+        }
+        if disciplina_codigo in grafo.ciclos:
+            resposta["ciclo"] = True
+            resposta["mensagem"] += " (em ciclo)"
+        
+        if estudante_id:
+            estudante = self.buscar_estudante(estudante_id)
+            if not estudante:
+                return {
+                    "status": "erro",
+                    "mensagem": "Estudante não encontrado"
+                }
+            feitas = grafo.feitas(estudante)
+            resposta["em_falta"] = grafo.codigos_de(cadeia & ~feitas)
+            resposta["pode_inscrever"] = not grafo.faltam(disciplina_codigo, feitas)
+            resposta["mensagem"] += f", {len(resposta['em_falta'])} por fazer"
+        
+        return resposta
+    
     async def verificar_equivalencia(self, content):
         """Verifica se pode conceder equivalência entre disciplinas"""
         estudante_id = content.get("estudante_id")
@@ -162,44 +597,95 @@ class AcademicoBehaviour(CyclicBehaviour):
                 "mensagem": f"Não completou a disciplina {disciplina_origem}"
             }
         
-        # Buscar cursos
-        curso_origem = self.buscar_curso(disciplina_origem)
-        curso_destino = self.buscar_curso(disciplina_destino)
+        return dict(self.decidir_equivalencia(disciplina_origem, disciplina_destino))
+    
+    async def verificar_equivalencia_lote(self, content):
+        """
+        Avalia de uma só vez as equivalências de um estudante transferido.
+        As origens são as disciplinas indicadas em disciplinas_origem (por
+        omissão, todas as completas); os destinos são os da tabela de
+        equivalências para cada origem e, se indicados, os de
+        disciplinas_destino. Para cada destino concedido fica a primeira
+        origem aprovada ("concedidas": {destino: origem}).
+        """
+        estudante_id = content.get("estudante_id")
         
-        if not curso_origem or not curso_destino:
+        estudante = self.buscar_estudante(estudante_id)
+        if not estudante:
             return {
                 "status": "recusado",
-                "mensagem": "Uma das disciplinas não foi encontrada"
+                "mensagem": "Estudante não encontrado",
+                "resultados": []
             }
         
-        # Verificar créditos (deve ter pelo menos 80% dos créditos)
-        creditos_origem = curso_origem.get("creditos", 0)
-        creditos_destino = curso_destino.get("creditos", 0)
+        completas = estudante.get("disciplinas_completas", [])
+        origens = content.get("disciplinas_origem") or completas
+        pedidos = content.get("disciplinas_destino") or []
         
-        if creditos_origem < creditos_destino * 0.8:
-            return {
-                "status": "recusado",
-                "mensagem": f"Créditos insuficientes (origem: {creditos_origem}, necessário: {creditos_destino * 0.8})"
-            }
+        print(f"🔄 Verificando equivalências em lote: {estudante_id} ({len(origens)} disciplinas de origem)")
+        
+        tabela = self.repositorio.tabela_equivalencias
+        feitas = set(completas)
+        resultados = []
+        concedidas = {}
+        for origem in dict.fromkeys(origens):
+            if origem not in feitas:
+                resultados.append({
+                    "disciplina_origem": origem,
+                    "status": "recusado",
+                    "mensagem": f"Não completou a disciplina {origem}"
+                })
+                continue
+            # Pares plausíveis: os da tabela e os pedidos, sem destinos já feitos
+            for destino in dict.fromkeys(tabela.destinos(origem) + pedidos):
+                if destino in feitas or destino == origem:
+                    continue
+                decisao = self.decidir_equivalencia(origem, destino)
+                resultados.append({"disciplina_origem": origem, "disciplina_destino": destino, **decisao})
+                if decisao["status"] == "aprovado":
+                    concedidas.setdefault(destino, origem)
         
         return {
-            "status": "aprovado",
-            "mensagem": f"Equivalência aprovada: {curso_origem.get('nome')} ≈ {curso_destino.get('nome')}"
+            "status": "aprovado" if concedidas else "recusado",
+            "mensagem": f"{len(concedidas)} equivalências concedidas em {len(resultados)} pares avaliados",
+            "concedidas": concedidas,
+            "resultados": resultados
         }
     
+    def decidir_equivalencia(self, disciplina_origem, disciplina_destino):
+        """
+        Decisão sobre o par (igual para todos os estudantes), guardada em
+        memória enquanto a tabela de equivalências e o catálogo forem os mesmos
+        """
+        tabela = self.repositorio.tabela_equivalencias
+        cursos = self.repositorio.cursos_por_codigo
+        if self.origem_decisoes is None or self.origem_decisoes[0] is not tabela or self.origem_decisoes[1] is not cursos:
+            self.decisoes_equivalencia = {}
+            self.origem_decisoes = (tabela, cursos)
+        
+        par = (disciplina_origem, disciplina_destino)
+        decisao = self.decisoes_equivalencia.get(par)
+        if decisao is None:
+            curso_destino = cursos.get(disciplina_destino)
+            if not curso_destino:
+                decisao = {
+                    "status": "recusado",
+                    "mensagem": "Uma das disciplinas não foi encontrada"
+                }
+            else:
+                decisao = decidir(tabela.regra(*par), cursos.get(disciplina_origem), curso_destino)
+            if len(self.decisoes_equivalencia) >= LIMITE_DECISOES_EQUIVALENCIA:
+                del self.decisoes_equivalencia[next(iter(self.decisoes_equivalencia))]
+            self.decisoes_equivalencia[par] = decisao
+        return decisao
+    
     def buscar_estudante(self, estudante_id):
         """Busca estudante por ID"""
-        for estudante in self.estudantes_data.get("estudantes", []):
-            if estudante.get("id") == estudante_id:
-                return estudante
-        return None
+        return self.repositorio.buscar_estudante(estudante_id)
     
     def buscar_curso(self, codigo):
         """Busca curso por código"""
-        for curso in self.cursos_data.get("cursos", []):
-            if curso.get("codigo") == codigo:
-                return curso
-        return None
+        return self.repositorio.buscar_curso(codigo)
 
 
 class AgenteAcademico(Agent):
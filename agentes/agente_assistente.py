@@ -10,6 +10,9 @@ from spade.behaviour import CyclicBehaviour
 from spade.message import Message
 from spade.template import Template
 import asyncio
+from .admissao import escalao
+from .lista_espera import prioridade
+from .repositorio import obter_repositorio
 
 
 class AssistenteBehaviour(CyclicBehaviour):
@@ -17,166 +20,580 @@ class AssistenteBehaviour(CyclicBehaviour):
     
     async def on_start(self):
         print("✅ Agente Assistente iniciado e pronto para receber pedidos.")
+        # Pedidos enviados aos agentes especializados, indexados pelo thread
+        # da conversa, à espera da respetiva resposta
         self.pending_requests = {}
         self.request_counter = 0
+        self.tarefas = set()
+        self.agentes_especializados = {
+            str(self.agent.agente_academico),
+            str(self.agent.agente_horarios),
+            str(self.agent.agente_regulamentos),
+            str(self.agent.agente_financeiro)
+        }
     
     async def run(self):
-        """Processa mensagens dos estudantes e coordena com outros agentes"""
+        """Encaminha respostas para os pedidos pendentes e lança novos pedidos"""
         msg = await self.receive(timeout=10)
         
         if msg:
-            try:
-                content = json.loads(msg.body)
-                tipo_pedido = content.get("tipo")
-                estudante_id = content.get("estudante_id")
-                
-                print(f"\n📩 Pedido recebido de {estudante_id}: {tipo_pedido}")
-                
-                if tipo_pedido == "inscricao":
-                    await self.processar_inscricao(content, msg.sender)
-                elif tipo_pedido == "equivalencia":
-                    await self.processar_equivalencia(content, msg.sender)
-                elif tipo_pedido == "estatuto":
-                    await self.processar_estatuto(content, msg.sender)
-                elif tipo_pedido == "consulta_horario":
-                    await self.consultar_horario(content, msg.sender)
-                else:
-                    await self.enviar_resposta(msg.sender, {
-                        "status": "erro",
-                        "mensagem": "Tipo de pedido desconhecido"
+            # Resposta de um agente especializado a um pedido em curso
+            futuro = self.pending_requests.pop(msg.thread, None) if msg.thread else None
+            if futuro:
+                if not futuro.done():
+                    futuro.set_result(msg)
+                return
+            
+            # Resposta que chegou depois do timeout (ou de um pedido cancelado)
+            if str(msg.sender.bare) in self.agentes_especializados:
+                print(f"⚠️ Resposta sem pedido pendente descartada (thread {msg.thread})")
+                return
+            
+            # Novo pedido de estudante: processado em paralelo com os restantes
+            tarefa = asyncio.create_task(self.processar_pedido(msg))
+            self.tarefas.add(tarefa)
+            tarefa.add_done_callback(self.tarefas.discard)
+    
+    async def processar_pedido(self, msg):
+        """Processa um pedido de estudante e coordena com outros agentes"""
+        try:
+            content = json.loads(msg.body)
+            tipo_pedido = content.get("tipo")
+            estudante_id = content.get("estudante_id")
+            
+            print(f"\n📩 Pedido recebido de {estudante_id}: {tipo_pedido}")
+            
+            if tipo_pedido in ("inscricao", "inscricao_lote") and self.agent.admissao:
+                if not await self.aguardar_admissao(content):
+                    await self.enviar_resposta(msg, {
+                        "status": "recusado",
+                        "mensagem": "Demasiados pedidos de inscrição neste momento. Tente novamente mais tarde."
                     })
-            except Exception as e:
-                print(f"❌ Erro ao processar mensagem: {e}")
+                    return
+            
+            if tipo_pedido == "inscricao":
+                await self.processar_inscricao(content, msg)
+            elif tipo_pedido == "inscricao_lote":
+                await self.processar_inscricao_lote(content, msg)
+            elif tipo_pedido == "equivalencia":
+                await self.processar_equivalencia(content, msg)
+            elif tipo_pedido == "equivalencia_lote":
+                await self.processar_equivalencia_lote(content, msg)
+            elif tipo_pedido == "propinas_lote":
+                await self.processar_propinas_lote(content, msg)
+            elif tipo_pedido == "estatuto":
+                await self.processar_estatuto(content, msg)
+            elif tipo_pedido == "consulta_horario":
+                await self.consultar_horario(content, msg)
+            elif tipo_pedido == "propor_horario":
+                await self.propor_horario(content, msg)
+            elif tipo_pedido == "disciplinas_compativeis":
+                await self.disciplinas_compativeis(content, msg)
+            elif tipo_pedido == "cadeia_prerequisitos":
+                await self.cadeia_prerequisitos(content, msg)
+            elif tipo_pedido == "creditos_restantes":
+                await self.creditos_restantes(content, msg)
+            elif tipo_pedido in ("lista_espera", "sair_lista_espera"):
+                await self.lista_espera(content, msg)
+            else:
+                await self.enviar_resposta(msg, {
+                    "status": "erro",
+                    "mensagem": "Tipo de pedido desconhecido"
+                })
+        except Exception as e:
+            print(f"❌ Erro ao processar mensagem: {e}")
+    
+    async def pedir(self, destinatario, dados, timeout=10):
+        """
+        Envia um pedido a um agente especializado e aguarda a resposta.
+        Cada pedido leva um thread próprio, pelo que a resposta é entregue
+        a este pedido mesmo com outros pedidos em curso.
+        Devolve o conteúdo da resposta, ou None se expirar o timeout.
+        """
+        self.request_counter += 1
+        thread_id = f"{self.agent.jid}#{self.request_counter}"
+        futuro = asyncio.get_running_loop().create_future()
+        self.pending_requests[thread_id] = futuro
+        
+        msg = Message(to=str(destinatario))
+        msg.set_metadata("performative", "request")
+        msg.thread = thread_id
+        msg.body = json.dumps(dados)
+        
+        try:
+            await self.send(msg)
+            resposta = await asyncio.wait_for(futuro, timeout)
+            return json.loads(resposta.body)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self.pending_requests.pop(thread_id, None)
+    
+    async def aguardar_admissao(self, content):
+        """
+        Espera pela vez da inscrição na fila de admissão (janelas por escalão
+        e débito máximo). Entre pedidos do mesmo escalão passam primeiro os
+        estudantes com prioridade pelo estatuto, pelas regras da lista de espera.
+        Devolve False se o pedido desistiu ao fim da espera máxima da fila.
+        """
+        repositorio = obter_repositorio()
+        estudante = repositorio.buscar_estudante(content.get("estudante_id")) or {}
+        estatuto = repositorio.buscar_estatuto(estudante.get("estatuto"))
+        disciplinas = content.get("disciplinas") or [content.get("disciplina")]
+        horario = tuple(
+            aula
+            for disciplina in disciplinas
+            for chave in repositorio.chaves_horario(disciplina)
+            for aula in repositorio.buscar_horario(chave) or ()
+        )
+        return await self.agent.admissao.admitir(
+            content.get("estudante_id"), escalao(estudante), prioridade(estudante, estatuto, horario)
+        )
     
-    async def processar_inscricao(self, content, sender):
+    async def processar_inscricao(self, content, pedido):
         """Processa pedido de inscrição em disciplina"""
         print("🔄 Processando inscrição...")
         
-        # Verificar propinas com Agente Financeiro
-        msg_financeiro = Message(to=str(self.agent.agente_financeiro))
-        msg_financeiro.set_metadata("performative", "request")
-        msg_financeiro.body = json.dumps({
-            "tipo": "verificar_propinas",
-            "estudante_id": content["estudante_id"]
-        })
-        await self.send(msg_financeiro)
+        # Turmas sem conflito de horário, se a disciplina tiver turmas
+        turmas = {}
+        if self.agent.inscricao_paralela:
+            resposta = await self.verificar_inscricao_paralela(content, turmas)
+        else:
+            resposta = await self.verificar_inscricao_sequencial(content, turmas)
         
-        # Aguardar resposta do Agente Financeiro
-        resp_financeiro = await self.receive(timeout=10)
-        if resp_financeiro:
-            resp_fin_data = json.loads(resp_financeiro.body)
-            if not resp_fin_data.get("aprovado"):
-                await self.enviar_resposta(sender, {
+        # Recusada só por falta de vagas: o estudante fica em lista de espera
+        sem_vaga = bool(resposta and resposta.pop("sem_vaga", False))
+        
+        # Só se confirma a inscrição ao estudante depois de gravada
+        if resposta and resposta["status"] == "aprovado":
+            resp_reg_data = await self.registar_inscricao(content["estudante_id"], [content["disciplina"]], turmas)
+            turma = resp_reg_data.get("turmas", {}).get(content["disciplina"])
+            if turma:
+                resposta["turma"] = turma
+                resposta["mensagem"] += f" - turma {turma}"
+            if resp_reg_data.get("status") == "recusado":
+                resposta = {
                     "status": "recusado",
-                    "mensagem": "Propinas em atraso. Regularize a situação antes de se inscrever."
-                })
-                return
+                    "mensagem": "Não há vagas disponíveis"
+                }
+                sem_vaga = True
+            elif resp_reg_data.get("status") != "sucesso":
+                resposta = {
+                    "status": "erro",
+                    "mensagem": "Não foi possível registar a inscrição. Tente novamente."
+                }
         
-        # Verificar horários com Agente Horários
-        msg_horarios = Message(to=str(self.agent.agente_horarios))
-        msg_horarios.set_metadata("performative", "request")
-        msg_horarios.body = json.dumps({
-            "tipo": "verificar_conflito",
+        if sem_vaga and content.get("lista_espera", True):
+            await self.colocar_em_espera(content["estudante_id"], content["disciplina"], resposta)
+        
+        if resposta:
+            await self.enviar_resposta(pedido, resposta)
+    
+    async def colocar_em_espera(self, estudante_id, disciplina, resposta):
+        """
+        Pede ao Agente Académico que coloque o estudante na lista de espera da
+        disciplina e acrescenta à resposta o número de estudantes em espera
+        (campo em_espera); a posição é dada pelo pedido "lista_espera"
+        """
+        resp_data = await self.pedir(self.agent.agente_academico, {
+            "tipo": "entrar_lista_espera",
+            "estudante_id": estudante_id,
+            "disciplina": disciplina
+        })
+        if resp_data and resp_data.get("status") == "sucesso":
+            resposta["em_espera"] = resp_data["em_espera"]
+            resposta["mensagem"] += f" - ficou em lista de espera ({resp_data['em_espera']} estudante(s) em espera)"
+    
+    async def registar_inscricao(self, estudante_id, disciplinas, turmas=None):
+        """
+        Pede ao Agente Académico que confirme os lugares reservados e grave as
+        inscrições aprovadas, nas disciplinas com turmas numa das turmas sem
+        conflito (turmas: {disciplina: [turmas]}). Devolve a resposta (vazia
+        se não houve resposta).
+        """
+        dados = {
+            "tipo": "registar_inscricao",
+            "estudante_id": estudante_id,
+            "disciplinas": disciplinas
+        }
+        if turmas:
+            dados["turmas"] = turmas
+        resp_data = await self.pedir(self.agent.agente_academico, dados)
+        return resp_data or {}
+    
+    async def libertar_reserva(self, content):
+        """Liberta o lugar reservado pelo Agente Académico para uma inscrição recusada"""
+        await self.pedir(self.agent.agente_academico, {
+            "tipo": "libertar_reserva",
             "estudante_id": content["estudante_id"],
             "disciplina": content["disciplina"]
         })
-        await self.send(msg_horarios)
+    
+    def verificacoes_inscricao(self, content, turmas=None):
+        """
+        Lista as verificações de uma inscrição, pela ordem em que são decididas:
+        Financeiro, Horários e Académico. Cada verificação é um tuplo
+        (agente, pedido, avaliar), em que avaliar devolve a resposta final
+        ao estudante ou None se a inscrição deve seguir para a próxima.
+        As turmas sem conflito indicadas pelo Agente Horários ficam em turmas.
+        """
+        def avaliar_financeiro(resp_fin_data):
+            if not resp_fin_data.get("aprovado"):
+                return {
+                    "status": "recusado",
+                    "mensagem": "Propinas em atraso. Regularize a situação antes de se inscrever."
+                }
+            return None
         
-        # Aguardar resposta do Agente Horários
-        resp_horarios = await self.receive(timeout=10)
-        if resp_horarios:
-            resp_hor_data = json.loads(resp_horarios.body)
+        def avaliar_horarios(resp_hor_data):
             if not resp_hor_data.get("sem_conflito"):
-                await self.enviar_resposta(sender, {
+                resposta = {
                     "status": "recusado",
                     "mensagem": f"Conflito de horário: {resp_hor_data.get('mensagem')}"
-                })
-                return
-        
-        # Verificar regras académicas com Agente Académico
-        msg_academico = Message(to=str(self.agent.agente_academico))
-        msg_academico.set_metadata("performative", "request")
-        msg_academico.body = json.dumps({
-            "tipo": "verificar_inscricao",
-            "estudante_id": content["estudante_id"],
-            "disciplina": content["disciplina"]
-        })
-        await self.send(msg_academico)
+                }
+                # Todos os conflitos, para o estudante os resolver de uma só vez
+                if "conflitos" in resp_hor_data:
+                    resposta["conflitos"] = resp_hor_data["conflitos"]
+                return resposta
+            if turmas is not None and "turmas" in resp_hor_data:
+                turmas[content["disciplina"]] = resp_hor_data["turmas"]
+            return None
         
-        # Aguardar resposta do Agente Académico
-        resp_academico = await self.receive(timeout=10)
-        if resp_academico:
-            resp_acad_data = json.loads(resp_academico.body)
+        def avaliar_academico(resp_acad_data):
             if resp_acad_data.get("aprovado"):
-                await self.enviar_resposta(sender, {
+                return {
                     "status": "aprovado",
                     "mensagem": resp_acad_data.get("mensagem", "Inscrição aprovada!")
-                })
-            else:
-                await self.enviar_resposta(sender, {
-                    "status": "recusado",
-                    "mensagem": resp_acad_data.get("mensagem", "Inscrição recusada")
-                })
+                }
+            resposta = {
+                "status": "recusado",
+                "mensagem": resp_acad_data.get("mensagem", "Inscrição recusada")
+            }
+            if resp_acad_data.get("sem_vaga"):
+                resposta["sem_vaga"] = True
+            return resposta
+        
+        return [
+            (self.agent.agente_financeiro, {
+                "tipo": "verificar_propinas",
+                "estudante_id": content["estudante_id"]
+            }, avaliar_financeiro),
+            (self.agent.agente_horarios, {
+                "tipo": "verificar_conflito",
+                "estudante_id": content["estudante_id"],
+                "disciplina": content["disciplina"],
+                "relatorio": True
+            }, avaliar_horarios),
+            (self.agent.agente_academico, {
+                "tipo": "verificar_inscricao",
+                "estudante_id": content["estudante_id"],
+                "disciplina": content["disciplina"]
+            }, avaliar_academico)
+        ]
     
-    async def processar_equivalencia(self, content, sender):
+    async def verificar_inscricao_sequencial(self, content, turmas=None):
+        """Consulta Financeiro, Horários e Académico um de cada vez"""
+        for destinatario, dados, avaliar in self.verificacoes_inscricao(content, turmas):
+            resp_data = await self.pedir(destinatario, dados)
+            if resp_data:
+                resposta = avaliar(resp_data)
+                if resposta:
+                    return resposta
+        return None
+    
+    async def verificar_inscricao_paralela(self, content, turmas=None):
+        """
+        Envia as três verificações em simultâneo. As respostas são avaliadas
+        pela ordem do modo sequencial, para que a recusa comunicada seja a
+        mesma; assim que uma verificação recusa, as restantes são canceladas,
+        exceto a do Académico, que pode reservar um lugar (ver libertar_se_reservado).
+        """
+        verificacoes = self.verificacoes_inscricao(content, turmas)
+        tarefas = [
+            asyncio.create_task(self.pedir(destinatario, dados))
+            for destinatario, dados, _ in verificacoes
+        ]
+        
+        resposta = None
+        try:
+            for tarefa, (_, _, avaliar) in zip(tarefas, verificacoes):
+                resp_data = await tarefa
+                if resp_data:
+                    resposta = avaliar(resp_data)
+                    if resposta:
+                        return resposta
+            return None
+        finally:
+            academico = tarefas[-1]
+            recusada = bool(resposta) and resposta["status"] != "aprovado"
+            for tarefa in tarefas:
+                if not tarefa.done() and not (recusada and tarefa is academico):
+                    tarefa.cancel()
+            
+            # O Académico pode já ter aprovado (e reservado um lugar) quando outro
+            # agente recusa, ou aprovar depois; a reserva é libertada sem atrasar a resposta
+            if recusada and not academico.cancelled():
+                tarefa = asyncio.create_task(self.libertar_se_reservado(academico, content))
+                self.tarefas.add(tarefa)
+                tarefa.add_done_callback(self.tarefas.discard)
+    
+    async def libertar_se_reservado(self, verificacao, content):
+        """Espera pela resposta do Académico a uma inscrição recusada e liberta o lugar se o reservou"""
+        resp_data = await verificacao
+        if (resp_data or {}).get("aprovado"):
+            await self.libertar_reserva(content)
+    
+    async def processar_inscricao_lote(self, content, pedido):
+        """
+        Processa a inscrição em várias disciplinas com uma única mensagem
+        por agente especializado. A resposta traz o veredicto de cada disciplina.
+        """
+        print("🔄 Processando inscrição em lote...")
+        
+        estudante_id = content["estudante_id"]
+        # Disciplinas repetidas no pedido contam uma só vez
+        disciplinas = list(dict.fromkeys(content.get("disciplinas", [])))
+        resultados = {}
+        turmas = {}
+        # Disciplinas recusadas só por falta de vagas (para a lista de espera)
+        sem_vaga = []
+        
+        def recusar(disciplina, mensagem, conflitos=None):
+            resultados[disciplina] = {
+                "disciplina": disciplina,
+                "status": "recusado",
+                "mensagem": mensagem
+            }
+            if conflitos:
+                resultados[disciplina]["conflitos"] = conflitos
+        
+        # Verificar propinas com Agente Financeiro (uma vez para todo o lote)
+        resp_fin_data = await self.pedir(self.agent.agente_financeiro, {
+            "tipo": "verificar_propinas",
+            "estudante_id": estudante_id
+        })
+        if resp_fin_data and not resp_fin_data.get("aprovado"):
+            for d in disciplinas:
+                recusar(d, "Propinas em atraso. Regularize a situação antes de se inscrever.")
+        
+        # Verificar conflitos entre as novas disciplinas e com as já inscritas
+        pendentes = [d for d in disciplinas if d not in resultados]
+        if pendentes:
+            resp_hor_data = await self.pedir(self.agent.agente_horarios, {
+                "tipo": "verificar_conflito_lote",
+                "estudante_id": estudante_id,
+                "disciplinas": pendentes,
+                "relatorio": True
+            })
+            if resp_hor_data:
+                if "resultados" not in resp_hor_data:
+                    for d in pendentes:
+                        recusar(d, f"Conflito de horário: {resp_hor_data.get('mensagem')}")
+                for resultado in resp_hor_data.get("resultados", []):
+                    if not resultado.get("sem_conflito"):
+                        recusar(resultado["disciplina"], f"Conflito de horário: {resultado.get('mensagem')}",
+                                resultado.get("conflitos"))
+                    elif "turmas" in resultado:
+                        turmas[resultado["disciplina"]] = resultado["turmas"]
+        
+        # Verificar regras académicas para as disciplinas sem conflito
+        pendentes = [d for d in disciplinas if d not in resultados]
+        if pendentes:
+            resp_acad_data = await self.pedir(self.agent.agente_academico, {
+                "tipo": "verificar_inscricao_lote",
+                "estudante_id": estudante_id,
+                "disciplinas": pendentes
+            })
+            if resp_acad_data:
+                if "resultados" not in resp_acad_data:
+                    for d in pendentes:
+                        recusar(d, resp_acad_data.get("mensagem", "Inscrição recusada"))
+                for resultado in resp_acad_data.get("resultados", []):
+                    if resultado.get("aprovado"):
+                        resultados[resultado["disciplina"]] = {
+                            "disciplina": resultado["disciplina"],
+                            "status": "aprovado",
+                            "mensagem": resultado.get("mensagem", "Inscrição aprovada!")
+                        }
+                    else:
+                        recusar(resultado["disciplina"], resultado.get("mensagem", "Inscrição recusada"))
+                        if resultado.get("sem_vaga"):
+                            sem_vaga.append(resultado["disciplina"])
+        
+        for d in disciplinas:
+            if d not in resultados:
+                recusar(d, "Sem resposta do Agente Académico")
+        
+        aprovadas = [d for d in disciplinas if resultados[d]["status"] == "aprovado"]
+        if aprovadas:
+            resp_reg_data = await self.registar_inscricao(
+                estudante_id, aprovadas, {d: turmas[d] for d in aprovadas if d in turmas}
+            )
+            for d in resp_reg_data.get("sem_vaga", []):
+                recusar(d, "Não há vagas disponíveis")
+                sem_vaga.append(d)
+            for d, turma in resp_reg_data.get("turmas", {}).items():
+                if d in resultados:
+                    resultados[d]["turma"] = turma
+            registadas = resp_reg_data.get("registadas", [])
+            for d in aprovadas:
+                if d not in registadas and resultados[d]["status"] == "aprovado":
+                    resultados[d] = {
+                        "disciplina": d,
+                        "status": "erro",
+                        "mensagem": "Não foi possível registar a inscrição. Tente novamente."
+                    }
+            aprovadas = [d for d in aprovadas if d in registadas]
+        
+        if content.get("lista_espera", True):
+            await asyncio.gather(*(self.colocar_em_espera(estudante_id, d, resultados[d]) for d in sem_vaga))
+        
+        if len(aprovadas) == len(disciplinas) and disciplinas:
+            status = "aprovado"
+        elif aprovadas:
+            status = "parcial"
+        else:
+            status = "recusado"
+        
+        await self.enviar_resposta(pedido, {
+            "status": status,
+            "mensagem": f"{len(aprovadas)} de {len(disciplinas)} inscrições aprovadas",
+            "resultados": [resultados[d] for d in disciplinas]
+        })
+    
+    async def processar_equivalencia(self, content, pedido):
         """Processa pedido de equivalência"""
         print("🔄 Processando equivalência...")
         
-        msg_academico = Message(to=str(self.agent.agente_academico))
-        msg_academico.set_metadata("performative", "request")
-        msg_academico.body = json.dumps({
+        resp_data = await self.pedir(self.agent.agente_academico, {
             "tipo": "verificar_equivalencia",
             "estudante_id": content["estudante_id"],
             "disciplina_origem": content.get("disciplina_origem"),
             "disciplina_destino": content.get("disciplina_destino")
         })
-        await self.send(msg_academico)
+        if resp_data:
+            await self.enviar_resposta(pedido, resp_data)
+    
+    async def processar_equivalencia_lote(self, content, pedido):
+        """Pede ao Agente Académico todas as equivalências de um estudante transferido numa só mensagem"""
+        print("🔄 Processando equivalências em lote...")
+        
+        resp_data = await self.pedir(self.agent.agente_academico, {
+            "tipo": "verificar_equivalencia_lote",
+            "estudante_id": content["estudante_id"],
+            "disciplinas_origem": content.get("disciplinas_origem"),
+            "disciplinas_destino": content.get("disciplinas_destino")
+        })
+        if resp_data:
+            await self.enviar_resposta(pedido, resp_data)
+    
+    async def processar_propinas_lote(self, content, pedido):
+        """Pede ao Agente Financeiro a situação de um conjunto de estudantes numa só mensagem"""
+        print("🔄 Verificando propinas em lote...")
+        
+        resp_data = await self.pedir(self.agent.agente_financeiro, {
+            "tipo": "verificar_propinas_lote",
+            "estudante_ids": content.get("estudante_ids", [])
+        })
+        if resp_data:
+            await self.enviar_resposta(pedido, resp_data)
+    
+    async def cadeia_prerequisitos(self, content, pedido):
+        """Pede ao Agente Académico a cadeia completa de pré-requisitos de uma disciplina"""
+        print("🔄 Consultando pré-requisitos...")
+        
+        resp_data = await self.pedir(self.agent.agente_academico, {
+            "tipo": "cadeia_prerequisitos",
+            "estudante_id": content.get("estudante_id"),
+            "disciplina": content.get("disciplina")
+        })
+        if resp_data:
+            await self.enviar_resposta(pedido, resp_data)
+    
+    async def lista_espera(self, content, pedido):
+        """
+        Consulta as listas de espera do estudante ("lista_espera") ou retira-o
+        da lista de uma disciplina ("sair_lista_espera") no Agente Académico
+        """
+        print("🔄 Consultando lista de espera...")
         
-        resp = await self.receive(timeout=10)
-        if resp:
-            resp_data = json.loads(resp.body)
-            await self.enviar_resposta(sender, resp_data)
+        if content.get("tipo") == "sair_lista_espera":
+            dados = {"tipo": "sair_lista_espera", "disciplina": content.get("disciplina")}
+        else:
+            dados = {"tipo": "consultar_lista_espera"}
+        dados["estudante_id"] = content.get("estudante_id")
+        resp_data = await self.pedir(self.agent.agente_academico, dados)
+        if resp_data:
+            await self.enviar_resposta(pedido, resp_data)
     
-    async def processar_estatuto(self, content, sender):
+    async def creditos_restantes(self, content, pedido):
+        """Pede ao Agente Académico os créditos inscritos e os que o estudante ainda pode inscrever"""
+        print("🔄 Consultando créditos...")
+        
+        resp_data = await self.pedir(self.agent.agente_academico, {
+            "tipo": "creditos_restantes",
+            "estudante_id": content.get("estudante_id")
+        })
+        if resp_data:
+            await self.enviar_resposta(pedido, resp_data)
+    
+    async def processar_estatuto(self, content, pedido):
         """Processa pedido de estatuto especial"""
         print("🔄 Processando pedido de estatuto...")
         
-        msg_regulamentos = Message(to=str(self.agent.agente_regulamentos))
-        msg_regulamentos.set_metadata("performative", "request")
-        msg_regulamentos.body = json.dumps({
+        resp_data = await self.pedir(self.agent.agente_regulamentos, {
             "tipo": "verificar_estatuto",
             "estudante_id": content["estudante_id"],
             "tipo_estatuto": content.get("tipo_estatuto"),
             "documentos": content.get("documentos", [])
         })
-        await self.send(msg_regulamentos)
-        
-        resp = await self.receive(timeout=10)
-        if resp:
-            resp_data = json.loads(resp.body)
-            await self.enviar_resposta(sender, resp_data)
+        if resp_data:
+            await self.enviar_resposta(pedido, resp_data)
     
-    async def consultar_horario(self, content, sender):
+    async def consultar_horario(self, content, pedido):
         """Consulta horário e possíveis conflitos"""
         print("🔄 Consultando horários...")
         
-        msg_horarios = Message(to=str(self.agent.agente_horarios))
-        msg_horarios.set_metadata("performative", "request")
-        msg_horarios.body = json.dumps({
+        resp_data = await self.pedir(self.agent.agente_horarios, {
             "tipo": "consultar_horario",
             "estudante_id": content["estudante_id"]
         })
-        await self.send(msg_horarios)
+        if resp_data:
+            await self.enviar_resposta(pedido, resp_data)
+    
+    async def propor_horario(self, content, pedido):
+        """Pede ao Agente Horários um horário sem conflitos para as disciplinas desejadas"""
+        print("🔄 Propondo horário...")
         
-        resp = await self.receive(timeout=10)
-        if resp:
-            resp_data = json.loads(resp.body)
-            await self.enviar_resposta(sender, resp_data)
+        dados = {
+            "tipo": "propor_horario",
+            "estudante_id": content.get("estudante_id"),
+            "disciplinas": content.get("disciplinas", [])
+        }
+        if "max_horarios" in content:
+            dados["max_horarios"] = content["max_horarios"]
+        resp_data = await self.pedir(self.agent.agente_horarios, dados)
+        if resp_data:
+            await self.enviar_resposta(pedido, resp_data)
     
-    async def enviar_resposta(self, destinatario, dados):
-        """Envia resposta ao estudante"""
-        msg = Message(to=str(destinatario))
+    async def disciplinas_compativeis(self, content, pedido):
+        """Pede ao Agente Horários as disciplinas que cabem no horário do estudante"""
+        print("🔄 Procurando disciplinas compatíveis...")
+        
+        resp_data = await self.pedir(self.agent.agente_horarios, {
+            "tipo": "disciplinas_compativeis",
+            "estudante_id": content["estudante_id"],
+            "prerequisitos": content.get("prerequisitos", False),
+            "com_vagas": content.get("com_vagas", False)
+        })
+        if resp_data:
+            await self.enviar_resposta(pedido, resp_data)
+    
+    async def enviar_resposta(self, pedido, dados):
+        """Envia resposta ao estudante, no mesmo thread do pedido original"""
+        msg = Message(to=str(pedido.sender))
         msg.set_metadata("performative", "inform")
+        msg.thread = pedido.thread
         msg.body = json.dumps(dados)
         await self.send(msg)
         print(f"✉️ Resposta enviada: {dados['status']}")
@@ -186,12 +603,16 @@ class AgenteAssistente(Agent):
     """Agente Assistente - Coordenador principal do sistema"""
     
     def __init__(self, jid, password, agente_academico, agente_horarios, 
-                 agente_regulamentos, agente_financeiro):
+                 agente_regulamentos, agente_financeiro, inscricao_paralela=False, admissao=None):
         super().__init__(jid, password)
         self.agente_academico = agente_academico
         self.agente_horarios = agente_horarios
         self.agente_regulamentos = agente_regulamentos
         self.agente_financeiro = agente_financeiro
+        # Consultar Financeiro, Horários e Académico em simultâneo nas inscrições
+        self.inscricao_paralela = inscricao_paralela
+        # Fila de admissão das inscrições (AdmissaoInscricoes); None admite tudo de imediato
+        self.admissao = admissao
     
     async def setup(self):
         """Configuração inicial do agente"""
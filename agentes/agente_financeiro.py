@@ -1,13 +1,15 @@
 """
 Agente Financeiro - Verificação de Propinas
-Este agente verifica se o estudante tem propinas em atraso.
+Este agente verifica se o estudante tem propinas em atraso, um a um ou para
+um conjunto de estudantes numa só mensagem, a partir do índice de dívidas do
+repositório (ver dividas.py).
 """
 
 import json
-import os
 from spade.agent import Agent
 from spade.behaviour import CyclicBehaviour
 from spade.message import Message
+from .repositorio import RepositorioDados, obter_repositorio
 
 
 class FinanceiroBehaviour(CyclicBehaviour):
@@ -17,18 +19,15 @@ class FinanceiroBehaviour(CyclicBehaviour):
         print("✅ Agente Financeiro iniciado.")
         await self.carregar_dados()
     
-    async def carregar_dados(self):
+    async def carregar_dados(self, diretorio=None):
         """Carrega dados de estudantes"""
         try:
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            
-            with open(os.path.join(base_dir, 'data', 'estudantes.json'), 'r', encoding='utf-8') as f:
-                self.estudantes_data = json.load(f)
+            self.repositorio = obter_repositorio(diretorio)
             
             print("💰 Dados financeiros carregados com sucesso.")
         except Exception as e:
             print(f"❌ Erro ao carregar dados: {e}")
-            self.estudantes_data = {"estudantes": []}
+            self.repositorio = RepositorioDados(diretorio)
     
     async def run(self):
         """Processa pedidos relacionados com situação financeira"""
@@ -41,6 +40,8 @@ class FinanceiroBehaviour(CyclicBehaviour):
                 
                 if tipo == "verificar_propinas":
                     resposta = await self.verificar_propinas(content)
+                elif tipo == "verificar_propinas_lote":
+                    resposta = await self.verificar_propinas_lote(content)
                 elif tipo == "consultar_dividas":
                     resposta = await self.consultar_dividas(content)
                 else:
@@ -52,6 +53,7 @@ class FinanceiroBehaviour(CyclicBehaviour):
                 # Enviar resposta
                 reply = Message(to=str(msg.sender))
                 reply.set_metadata("performative", "inform")
+                reply.thread = msg.thread
                 reply.body = json.dumps(resposta)
                 await self.send(reply)
                 
@@ -64,17 +66,14 @@ class FinanceiroBehaviour(CyclicBehaviour):
         
         print(f"💳 Verificando situação financeira: {estudante_id}")
         
-        # Buscar estudante
-        estudante = self.buscar_estudante(estudante_id)
-        if not estudante:
+        # Verificar se tem propinas em atraso (None: estudante não existe)
+        propinas_em_atraso = self.repositorio.propinas_em_atraso(estudante_id)
+        if propinas_em_atraso is None:
             return {
                 "aprovado": False,
                 "mensagem": "Estudante não encontrado"
             }
         
-        # Verificar se tem propinas em atraso
-        propinas_em_atraso = estudante.get("propinas_em_atraso", False)
-        
         if propinas_em_atraso:
             return {
                 "aprovado": False,
@@ -86,21 +85,45 @@ class FinanceiroBehaviour(CyclicBehaviour):
             "mensagem": "Situação financeira regularizada"
         }
     
+    async def verificar_propinas_lote(self, content):
+        """
+        Verifica de uma só vez a situação financeira de vários estudantes
+        (estudante_ids), por exemplo de uma turma ou de um ano inteiro
+        """
+        estudante_ids = content.get("estudante_ids") or []
+        
+        print(f"💳 Verificando situação financeira em lote: {len(estudante_ids)} estudantes")
+        
+        aprovados, em_atraso, nao_encontrados = [], [], []
+        for estudante_id, atraso in zip(estudante_ids, self.repositorio.propinas_em_atraso_lote(estudante_ids)):
+            if atraso is None:
+                nao_encontrados.append(estudante_id)
+            elif atraso:
+                em_atraso.append(estudante_id)
+            else:
+                aprovados.append(estudante_id)
+        
+        return {
+            "status": "sucesso",
+            "mensagem": f"{len(em_atraso)} de {len(estudante_ids)} estudantes com propinas em atraso",
+            "aprovados": aprovados,
+            "em_atraso": em_atraso,
+            "nao_encontrados": nao_encontrados
+        }
+    
     async def consultar_dividas(self, content):
         """Consulta detalhes de dívidas do estudante"""
         estudante_id = content.get("estudante_id")
         
         print(f"📊 Consultando dívidas: {estudante_id}")
         
-        estudante = self.buscar_estudante(estudante_id)
-        if not estudante:
+        propinas_em_atraso = self.repositorio.propinas_em_atraso(estudante_id)
+        if propinas_em_atraso is None:
             return {
                 "status": "erro",
                 "mensagem": "Estudante não encontrado"
             }
         
-        propinas_em_atraso = estudante.get("propinas_em_atraso", False)
-        
         if propinas_em_atraso:
             return {
                 "status": "sucesso",
@@ -120,10 +143,7 @@ class FinanceiroBehaviour(CyclicBehaviour):
     
     def buscar_estudante(self, estudante_id):
         """Busca estudante por ID"""
-        for estudante in self.estudantes_data.get("estudantes", []):
-            if estudante.get("id") == estudante_id:
-                return estudante
-        return None
+        return self.repositorio.buscar_estudante(estudante_id)
 
 
 class AgenteFinanceiro(Agent):
@@ -1,13 +1,22 @@
 """
 Agente Horários - Gestão de Conflitos de Horário
-Este agente detecta conflitos de horário entre disciplinas.
+Este agente detecta conflitos de horário entre disciplinas. Nas disciplinas
+com várias turmas indica as turmas que cabem no horário do estudante.
 """
 
 import json
-import os
+from collections import OrderedDict
 from spade.agent import Agent
 from spade.behaviour import CyclicBehaviour
 from spade.message import Message
+from .conflitos import MatrizConflitos, bits
+from .horario import NOMES_DIAS, compilar_horario, formatar_hora, minutos, sobreposicoes, sobrepostos
+from .repositorio import RepositorioDados, obter_repositorio
+from .solucionador import resolver_horario
+from .turmas import separar_chave
+
+# Número máximo de respostas de consultar_horario guardadas em memória
+LIMITE_HORARIOS_CONSULTADOS = 10000
 
 
 class HorariosBehaviour(CyclicBehaviour):
@@ -17,22 +26,25 @@ class HorariosBehaviour(CyclicBehaviour):
         print("✅ Agente Horários iniciado.")
         await self.carregar_dados()
     
-    async def carregar_dados(self):
+    async def carregar_dados(self, diretorio=None):
         """Carrega dados de cursos e estudantes"""
+        # Horário combinado de cada estudante: estudante_id -> (chaves de horário, máscara)
+        self.mascaras_estudantes = {}
+        # Conflitos entre todas as disciplinas do catálogo
+        self.matriz = MatrizConflitos()
+        # Respostas de consultar_horario já serializadas, da menos para a mais
+        # recentemente usada: estudante_id -> ((disciplina, turma), ..., corpo JSON)
+        self.horarios_consultados = OrderedDict()
+        # Cursos (índice do repositório) a partir dos quais as respostas foram geradas
+        self.cursos_consultados = {}
         try:
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            
-            with open(os.path.join(base_dir, 'data', 'cursos.json'), 'r', encoding='utf-8') as f:
-                self.cursos_data = json.load(f)
-            
-            with open(os.path.join(base_dir, 'data', 'estudantes.json'), 'r', encoding='utf-8') as f:
-                self.estudantes_data = json.load(f)
+            self.repositorio = obter_repositorio(diretorio)
+            self.sincronizar_horarios()
             
             print("📅 Dados de horários carregados com sucesso.")
         except Exception as e:
             print(f"❌ Erro ao carregar dados: {e}")
-            self.cursos_data = {"cursos": []}
-            self.estudantes_data = {"estudantes": []}
+            self.repositorio = RepositorioDados(diretorio)
     
     async def run(self):
         """Processa pedidos relacionados com horários"""
@@ -45,8 +57,16 @@ class HorariosBehaviour(CyclicBehaviour):
                 
                 if tipo == "verificar_conflito":
                     resposta = await self.verificar_conflito(content)
+                elif tipo == "verificar_conflito_lote":
+                    resposta = await self.verificar_conflito_lote(content)
                 elif tipo == "consultar_horario":
-                    resposta = await self.consultar_horario(content)
+                    resposta = self.horario_serializado(content)
+                elif tipo == "conflitos_disciplinas":
+                    resposta = await self.conflitos_disciplinas(content)
+                elif tipo == "propor_horario":
+                    resposta = await self.propor_horario(content)
+                elif tipo == "disciplinas_compativeis":
+                    resposta = await self.disciplinas_compativeis(content)
                 else:
                     resposta = {
                         "status": "erro",
@@ -56,16 +76,23 @@ class HorariosBehaviour(CyclicBehaviour):
                 # Enviar resposta
                 reply = Message(to=str(msg.sender))
                 reply.set_metadata("performative", "inform")
-                reply.body = json.dumps(resposta)
+                reply.thread = msg.thread
+                reply.body = resposta if isinstance(resposta, str) else json.dumps(resposta)
                 await self.send(reply)
                 
             except Exception as e:
                 print(f"❌ Erro no Agente Horários: {e}")
     
     async def verificar_conflito(self, content):
-        """Verifica se há conflito de horário"""
+        """
+        Verifica se há conflito de horário. Por omissão indica o primeiro
+        conflito; com "relatorio": true lista todas as disciplinas inscritas
+        que colidem, com os dias e horas em que se sobrepõem. Numa disciplina
+        com turmas basta uma turma sem conflito; a resposta indica quais ("turmas").
+        """
         estudante_id = content.get("estudante_id")
         disciplina_codigo = content.get("disciplina")
+        relatorio = content.get("relatorio", False)
         
         print(f"⏰ Verificando conflitos de horário: {estudante_id} -> {disciplina_codigo}")
         
@@ -77,27 +104,43 @@ class HorariosBehaviour(CyclicBehaviour):
                 "mensagem": "Estudante não encontrado"
             }
         
-        # Buscar horário da nova disciplina
-        curso_novo = self.buscar_curso(disciplina_codigo)
-        if not curso_novo:
+        # Buscar horário da nova disciplina (máscaras de bits já calculadas)
+        chaves = self.repositorio.chaves_horario(disciplina_codigo)
+        if not chaves:
             return {
                 "sem_conflito": False,
                 "mensagem": "Disciplina não encontrada"
             }
         
-        horario_novo = self.parsear_horario(curso_novo.get("horario", ""))
+        ocupado = self.mascara_estudante(estudante)
+        inscritas = self.chaves_estudante(estudante)
+        if chaves != [disciplina_codigo]:
+            livres = [chave for chave in chaves if not self.colide_com(chave, inscritas, ocupado)]
+            if livres:
+                return {
+                    "sem_conflito": True,
+                    "mensagem": "Sem conflitos de horário",
+                    "turmas": [separar_chave(chave)[1] for chave in livres]
+                }
+            return self.recusar_turmas(chaves, inscritas, relatorio=relatorio)
         
-        # Verificar conflitos com disciplinas já inscritas
-        for disc_inscrita in estudante.get("disciplinas_inscritas", []):
-            curso_inscrito = self.buscar_curso(disc_inscrita)
-            if curso_inscrito:
-                horario_inscrito = self.parsear_horario(curso_inscrito.get("horario", ""))
-                
-                conflito = self.detectar_conflito(horario_novo, horario_inscrito)
+        # Verificar conflitos com disciplinas já inscritas: uma interseção de máscaras;
+        # só quando se intersectam se procura (e confirma) a disciplina responsável
+        if self.buscar_mascara(disciplina_codigo) & ocupado:
+            if relatorio:
+                conflitos = self.listar_conflitos(disciplina_codigo, inscritas)
+                if conflitos:
+                    return {
+                        "sem_conflito": False,
+                        "mensagem": self.descrever_conflitos(conflitos),
+                        "conflitos": conflitos
+                    }
+            else:
+                conflito = self.procurar_conflito(disciplina_codigo, inscritas)
                 if conflito:
                     return {
                         "sem_conflito": False,
-                        "mensagem": f"Conflito com {curso_inscrito.get('nome')} ({disc_inscrita})"
+                        "mensagem": f"Conflito com {conflito.get('nome')} ({conflito.get('codigo')})"
                     }
         
         return {
@@ -105,28 +148,485 @@ class HorariosBehaviour(CyclicBehaviour):
             "mensagem": "Sem conflitos de horário"
         }
     
+    async def verificar_conflito_lote(self, content):
+        """
+        Verifica conflitos de horário para várias disciplinas pedidas em conjunto.
+        Cada disciplina é comparada com as já inscritas e com as disciplinas
+        anteriores do mesmo lote que não tiveram conflito. Com "relatorio": true
+        cada disciplina com conflitos traz a lista completa.
+        
+        Numa disciplina com turmas, as turmas sem conflito ficam todas
+        reservadas no horário do lote, porque a turma só é escolhida ao
+        registar a inscrição: as disciplinas seguintes têm de caber ao lado
+        de qualquer uma delas.
+        """
+        estudante_id = content.get("estudante_id")
+        disciplinas = content.get("disciplinas", [])
+        relatorio = content.get("relatorio", False)
+        
+        print(f"⏰ Verificando conflitos de horário em lote: {estudante_id} -> {', '.join(disciplinas)}")
+        
+        estudante = self.buscar_estudante(estudante_id)
+        if not estudante:
+            return {
+                "sem_conflito": False,
+                "mensagem": "Estudante não encontrado",
+                "resultados": []
+            }
+        
+        inscritas = self.chaves_estudante(estudante)
+        mascara_inscritas = self.mascara_estudante(estudante)
+        mascara_aceites = 0
+        aceites = []
+        resultados = []
+        for disciplina_codigo in disciplinas:
+            chaves = self.repositorio.chaves_horario(disciplina_codigo)
+            if not chaves:
+                resultados.append({
+                    "disciplina": disciplina_codigo,
+                    "sem_conflito": False,
+                    "mensagem": "Disciplina não encontrada"
+                })
+                continue
+            
+            if chaves != [disciplina_codigo]:
+                livres = [
+                    chave for chave in chaves
+                    if not self.colide_com(chave, inscritas + aceites, mascara_inscritas | mascara_aceites)
+                ]
+                if not livres:
+                    resultados.append({
+                        "disciplina": disciplina_codigo,
+                        **self.recusar_turmas(chaves, inscritas, aceites, relatorio)
+                    })
+                    continue
+                for chave in livres:
+                    aceites.append(chave)
+                    mascara_aceites |= self.buscar_mascara(chave)
+                resultados.append({
+                    "disciplina": disciplina_codigo,
+                    "sem_conflito": True,
+                    "mensagem": "Sem conflitos de horário",
+                    "turmas": [separar_chave(chave)[1] for chave in livres]
+                })
+                continue
+            
+            mascara_nova = self.buscar_mascara(disciplina_codigo)
+            conflito = None
+            conflito_lote = None
+            conflitos = []
+            if relatorio:
+                if mascara_nova & mascara_inscritas:
+                    conflitos = self.listar_conflitos(disciplina_codigo, inscritas)
+                if mascara_nova & mascara_aceites:
+                    conflitos += self.listar_conflitos(disciplina_codigo, aceites, mesmo_lote=True)
+            else:
+                if mascara_nova & mascara_inscritas:
+                    conflito = self.procurar_conflito(disciplina_codigo, inscritas)
+                if not conflito and mascara_nova & mascara_aceites:
+                    conflito_lote = self.procurar_conflito(disciplina_codigo, aceites)
+            
+            if conflitos:
+                resultados.append({
+                    "disciplina": disciplina_codigo,
+                    "sem_conflito": False,
+                    "mensagem": self.descrever_conflitos(conflitos),
+                    "conflitos": conflitos
+                })
+            elif conflito:
+                resultados.append({
+                    "disciplina": disciplina_codigo,
+                    "sem_conflito": False,
+                    "mensagem": f"Conflito com {conflito.get('nome')} ({conflito.get('codigo')})"
+                })
+            elif conflito_lote:
+                resultados.append({
+                    "disciplina": disciplina_codigo,
+                    "sem_conflito": False,
+                    "mensagem": f"Conflito com {conflito_lote.get('nome')} ({conflito_lote.get('codigo')}), pedida no mesmo lote"
+                })
+            else:
+                aceites.append(disciplina_codigo)
+                mascara_aceites |= mascara_nova
+                resultados.append({
+                    "disciplina": disciplina_codigo,
+                    "sem_conflito": True,
+                    "mensagem": "Sem conflitos de horário"
+                })
+        
+        return {
+            "sem_conflito": all(r["sem_conflito"] for r in resultados),
+            "resultados": resultados
+        }
+    
+    def recusar_turmas(self, chaves, inscritas, aceites=(), relatorio=False):
+        """Resposta para uma disciplina em que todas as turmas (chaves) têm conflitos"""
+        if relatorio:
+            conflitos = []
+            for chave in chaves:
+                turma = separar_chave(chave)[1]
+                for conflito in (self.listar_conflitos(chave, inscritas)
+                                 + self.listar_conflitos(chave, aceites, mesmo_lote=True)):
+                    conflito["turma_pedida"] = turma
+                    conflitos.append(conflito)
+            return {
+                "sem_conflito": False,
+                "mensagem": f"{self.descrever_conflitos(conflitos)} em todas as turmas",
+                "conflitos": conflitos
+            }
+        
+        partes = []
+        for chave in chaves:
+            conflito = self.procurar_conflito(chave, inscritas) or self.procurar_conflito(chave, aceites)
+            if conflito:
+                partes.append(f"{separar_chave(chave)[1]} com {conflito.get('nome')} ({conflito.get('codigo')})")
+        return {
+            "sem_conflito": False,
+            "mensagem": f"Conflito em todas as turmas: {', '.join(partes)}"
+        }
+    
+    def procurar_conflito(self, disciplina_codigo, codigos):
+        """
+        Devolve o primeiro curso, de entre os códigos dados, cujo horário colide
+        com a disciplina (códigos e disciplina como chaves de horário)
+        """
+        self.sincronizar_horarios()
+        linha = self.matriz.linha(disciplina_codigo)
+        if linha & self.matriz.conjunto(codigos):
+            for codigo in codigos:
+                if self.matriz.colidem(disciplina_codigo, codigo):
+                    return self.buscar_curso(separar_chave(codigo)[0])
+        return None
+    
+    def colide_com(self, disciplina_codigo, codigos, ocupado):
+        """
+        Indica se a disciplina colide com alguma das dadas, cujo horário
+        combinado é a máscara ocupado (códigos e disciplina como chaves de
+        horário). Sem interseção com a máscara não há conflito; havendo, é
+        confirmado disciplina a disciplina com os horários compilados.
+        """
+        if not self.buscar_mascara(disciplina_codigo) & ocupado:
+            return False
+        return any(self.repositorio.colidem(disciplina_codigo, codigo) for codigo in codigos)
+    
+    def listar_conflitos(self, disciplina_codigo, codigos, mesmo_lote=False):
+        """
+        Todas as disciplinas, de entre os códigos dados, que colidem com a
+        disciplina, com os intervalos em que as aulas se sobrepõem (códigos e
+        disciplina como chaves de horário; as turmas vêm em "turma")
+        """
+        self.sincronizar_horarios()
+        linha = self.matriz.linha(disciplina_codigo)
+        if not linha & self.matriz.conjunto(codigos):
+            return []
+        
+        horario_novo = self.buscar_horario(disciplina_codigo)
+        conflitos = []
+        for codigo in codigos:
+            if not self.matriz.colidem(disciplina_codigo, codigo):
+                continue
+            intervalos = sobreposicoes(horario_novo, self.buscar_horario(codigo))
+            # Um conflito sem aulas sobrepostas não é conflito
+            if not intervalos:
+                continue
+            codigo_curso, turma = separar_chave(codigo)
+            curso = self.buscar_curso(codigo_curso)
+            conflito = {
+                "codigo": codigo_curso,
+                "nome": curso.get("nome"),
+                "sobreposicoes": [
+                    {"dia": NOMES_DIAS[dia], "inicio": formatar_hora(inicio), "fim": formatar_hora(fim)}
+                    for dia, inicio, fim in intervalos
+                ]
+            }
+            if turma:
+                conflito["turma"] = turma
+            if mesmo_lote:
+                conflito["mesmo_lote"] = True
+            conflitos.append(conflito)
+        return conflitos
+    
+    def descrever_conflitos(self, conflitos):
+        """Mensagem com todas as disciplinas em conflito"""
+        partes = []
+        for c in conflitos:
+            lote = ", pedida no mesmo lote" if c.get("mesmo_lote") else ""
+            partes.append(f"{c['nome']} ({c['codigo']}{lote})")
+        return f"Conflito com {', '.join(dict.fromkeys(partes))}"
+    
+    async def conflitos_disciplinas(self, content):
+        """
+        Indica que pares de disciplinas, de entre as pedidas, têm horários
+        sobrepostos. Duas disciplinas com turmas só colidem se todas as
+        combinações de turmas colidirem.
+        """
+        disciplinas = list(dict.fromkeys(content.get("disciplinas", [])))
+        
+        print(f"⏰ Verificando conflitos entre disciplinas: {', '.join(disciplinas)}")
+        
+        chaves = {d: self.repositorio.chaves_horario(d) for d in disciplinas}
+        desconhecidas = [d for d in disciplinas if not chaves[d]]
+        if desconhecidas:
+            return {
+                "status": "erro",
+                "mensagem": f"Disciplinas não encontradas: {', '.join(desconhecidas)}"
+            }
+        
+        self.sincronizar_horarios()
+        if all(chaves[d] == [d] for d in disciplinas):
+            pares = self.matriz.conflitos_entre(disciplinas)
+        else:
+            pares = [
+                (a, b) for k, a in enumerate(disciplinas) for b in disciplinas[k + 1:]
+                if all(self.matriz.colidem(x, y) for x in chaves[a] for y in chaves[b])
+            ]
+        conflitos = [list(par) for par in pares]
+        return {
+            "status": "sucesso",
+            "sem_conflito": not conflitos,
+            "conflitos": conflitos
+        }
+    
+    async def propor_horario(self, content):
+        """
+        Propõe horários sem conflitos para uma lista de disciplinas desejadas.
+        Cada elemento de "disciplinas" é um código ou uma lista de códigos
+        alternativos (basta um). Com estudante_id, as disciplinas que colidem
+        com as já inscritas ficam de fora. As turmas de uma disciplina contam
+        como alternativas; a turma escolhida vem em "turmas". Devolve o
+        horário com mais disciplinas e uma lista ordenada de até max_horarios
+        alternativas.
+        """
+        estudante_id = content.get("estudante_id")
+        itens = [d if isinstance(d, list) else [d] for d in content.get("disciplinas", [])]
+        max_horarios = max(1, min(int(content.get("max_horarios", 5)), 20))
+        
+        print(f"🧩 Propondo horário: {estudante_id or '-'} -> {len(itens)} disciplinas")
+        
+        desconhecidas = [c for item in itens for c in item if not self.repositorio.chaves_horario(c)]
+        if desconhecidas:
+            return {
+                "status": "erro",
+                "mensagem": f"Disciplinas não encontradas: {', '.join(desconhecidas)}"
+            }
+        
+        self.sincronizar_horarios()
+        bloqueadas = 0
+        if estudante_id:
+            estudante = self.buscar_estudante(estudante_id)
+            if not estudante:
+                return {
+                    "status": "erro",
+                    "mensagem": "Estudante não encontrado"
+                }
+            # Disciplinas já inscritas (todas as turmas) e as que colidem com elas
+            for chave in self.chaves_estudante(estudante):
+                bloqueadas |= self.matriz.linha(chave)
+            for codigo in estudante.get("disciplinas_inscritas", []):
+                bloqueadas |= self.matriz.conjunto(self.repositorio.chaves_horario(codigo))
+        
+        alternativas = [[chave for c in item for chave in self.repositorio.chaves_horario(c)] for item in itens]
+        horarios, completo = resolver_horario(self.matriz, alternativas, bloqueadas, max_horarios)
+        melhor = [separar_chave(chave) for _, chave in horarios[0]] if horarios else []
+        escolhidos = {k for k, _ in horarios[0]} if horarios else set()
+        pedidas = content.get("disciplinas", [])
+        # Horários que só diferem na turma aparecem uma vez
+        propostas = dict.fromkeys(
+            tuple(separar_chave(chave)[0] for _, chave in horario) for horario in horarios
+        )
+        
+        return {
+            "status": "sucesso",
+            "mensagem": f"Horário sem conflitos com {len(melhor)} de {len(itens)} disciplinas pedidas",
+            "disciplinas": [codigo for codigo, _ in melhor],
+            "turmas": {codigo: turma for codigo, turma in melhor if turma},
+            "fora": [pedidas[k] for k in range(len(itens)) if k not in escolhidos],
+            "horarios": [list(proposta) for proposta in propostas],
+            "completo": completo
+        }
+    
+    async def disciplinas_compativeis(self, content):
+        """
+        Lista as disciplinas que o estudante pode acrescentar sem conflitos de
+        horário, numa só passagem pelo catálogo a partir da matriz de conflitos.
+        Opcionalmente ("prerequisitos": true, "com_vagas": true) só as que têm
+        os pré-requisitos feitos e vagas por preencher.
+        """
+        estudante_id = content.get("estudante_id")
+        
+        print(f"📋 Procurando disciplinas compatíveis: {estudante_id}")
+        
+        estudante = self.buscar_estudante(estudante_id)
+        if not estudante:
+            return {
+                "status": "erro",
+                "mensagem": "Estudante não encontrado"
+            }
+        
+        self.sincronizar_horarios()
+        completas = estudante.get("disciplinas_completas", [])
+        grafo = self.repositorio.grafo_prerequisitos
+        feitas = grafo.feitas(estudante)
+        livres = self.matriz.compativeis(self.chaves_estudante(estudante))
+        # Sem as já feitas nem as inscritas (as outras turmas destas incluídas)
+        for codigo in [*completas, *estudante.get("disciplinas_inscritas", [])]:
+            livres &= ~self.matriz.conjunto(self.repositorio.chaves_horario(codigo))
+        
+        disciplinas = []
+        vistas = set()
+        for i in bits(livres):
+            codigo = separar_chave(self.matriz.codigos[i])[0]
+            # Disciplina com várias turmas compatíveis (não necessariamente seguidas na
+            # matriz: uma turma acrescentada numa recarga fica no fim)
+            if codigo in vistas:
+                continue
+            vistas.add(codigo)
+            if content.get("prerequisitos") and grafo.faltam(codigo, feitas):
+                continue
+            if content.get("com_vagas") and self.buscar_curso(codigo).get("vagas", 0) <= 0:
+                continue
+            disciplinas.append(codigo)
+        
+        return {
+            "status": "sucesso",
+            "mensagem": f"{len(disciplinas)} disciplinas compatíveis com o horário atual",
+            "disciplinas": disciplinas
+        }
+    
+    def sincronizar_horarios(self):
+        """
+        Acerta a matriz de conflitos com os horários carregados no repositório.
+        Depois de uma recarga só as disciplinas alteradas são recalculadas, e
+        só as máscaras e os horários consultados dos estudantes inscritos
+        nelas são descartados.
+        """
+        mascaras = self.repositorio.mascaras_por_codigo
+        if mascaras is self.matriz.mascaras:
+            return
+        alteradas = set(self.matriz.atualizar(mascaras, self.repositorio.horarios_por_codigo))
+        if alteradas:
+            self.mascaras_estudantes = {
+                estudante_id: entrada for estudante_id, entrada in self.mascaras_estudantes.items()
+                if alteradas.isdisjoint(entrada[0])
+            }
+        
+        # O horário consultado mostra o nome e o texto do horário de cada disciplina
+        cursos = self.repositorio.cursos_por_codigo
+        anteriores = self.cursos_consultados
+        self.cursos_consultados = cursos
+        alterados = {
+            codigo for codigo in anteriores.keys() | cursos.keys()
+            if self.campos_horario(anteriores.get(codigo)) != self.campos_horario(cursos.get(codigo))
+        }
+        if alterados:
+            for estudante_id, entrada in list(self.horarios_consultados.items()):
+                if not alterados.isdisjoint(codigo for codigo, _ in entrada[0]):
+                    del self.horarios_consultados[estudante_id]
+    
+    @staticmethod
+    def campos_horario(curso):
+        """Campos do curso que aparecem no horário consultado"""
+        if not curso:
+            return None
+        turmas = tuple((t.get("turma"), t.get("horario")) for t in curso.get("turmas", []))
+        return (curso.get("nome"), curso.get("horario"), turmas)
+    
+    def chaves_estudante(self, estudante):
+        """
+        Chaves de horário das disciplinas inscritas: a da turma atribuída ou,
+        se a disciplina tiver turmas e nenhuma estiver atribuída, todas
+        """
+        turmas = estudante.get("turmas", {})
+        chaves = []
+        for codigo in estudante.get("disciplinas_inscritas", []):
+            chaves.extend(self.repositorio.chaves_horario(codigo, turmas.get(codigo)))
+        return chaves
+    
+    def mascara_estudante(self, estudante):
+        """
+        Horário semanal combinado das disciplinas inscritas do estudante, como
+        máscara de bits. A máscara fica em memória: uma nova inscrição é um OR
+        com a máscara da disciplina e uma anulação um AND-NOT.
+        """
+        self.sincronizar_horarios()
+        mascaras = self.repositorio.mascaras_por_codigo
+        
+        estudante_id = estudante.get("id")
+        inscritas = tuple(self.chaves_estudante(estudante))
+        anterior = self.mascaras_estudantes.get(estudante_id)
+        if anterior and anterior[0] == inscritas:
+            return anterior[1]
+        
+        antigas, mascara = anterior or ((), 0)
+        anuladas = 0
+        for codigo in antigas:
+            if codigo not in inscritas:
+                anuladas |= mascaras.get(codigo, 0)
+        mascara &= ~anuladas
+        for codigo in inscritas:
+            # Novas inscrições; depois de uma anulação repõem-se também as aulas
+            # de disciplinas inscritas que partilhavam intervalos com a anulada
+            if codigo not in antigas or mascaras.get(codigo, 0) & anuladas:
+                mascara |= mascaras.get(codigo, 0)
+        
+        self.mascaras_estudantes[estudante_id] = (inscritas, mascara)
+        return mascara
+    
     async def consultar_horario(self, content):
         """Consulta o horário completo do estudante"""
+        return json.loads(self.horario_serializado(content))
+    
+    def horario_serializado(self, content):
+        """
+        Resposta de consultar_horario já em JSON. A resposta de cada estudante
+        fica em memória (LRU, até LIMITE_HORARIOS_CONSULTADOS estudantes) e só
+        é gerada de novo quando as disciplinas inscritas do estudante mudam
+        ou quando muda o nome ou o horário de uma delas (sincronizar_horarios).
+        """
         estudante_id = content.get("estudante_id")
         
         print(f"📋 Consultando horário: {estudante_id}")
         
         estudante = self.buscar_estudante(estudante_id)
         if not estudante:
-            return {
+            return json.dumps({
                 "status": "erro",
                 "mensagem": "Estudante não encontrado"
-            }
+            })
+        
+        self.sincronizar_horarios()
+        turmas = estudante.get("turmas", {})
+        inscritas = tuple((codigo, turmas.get(codigo)) for codigo in estudante.get("disciplinas_inscritas", []))
+        entrada = self.horarios_consultados.get(estudante_id)
+        if entrada and entrada[0] == inscritas:
+            self.horarios_consultados.move_to_end(estudante_id)
+            return entrada[1]
         
+        corpo = json.dumps(self.gerar_horario(inscritas))
+        self.horarios_consultados[estudante_id] = (inscritas, corpo)
+        self.horarios_consultados.move_to_end(estudante_id)
+        if len(self.horarios_consultados) > LIMITE_HORARIOS_CONSULTADOS:
+            self.horarios_consultados.popitem(last=False)
+        return corpo
+    
+    def gerar_horario(self, inscritas):
+        """Resposta de consultar_horario para as disciplinas inscritas dadas ((codigo, turma), ...)"""
         horarios = []
-        for disc_codigo in estudante.get("disciplinas_inscritas", []):
+        for disc_codigo, turma in inscritas:
             curso = self.buscar_curso(disc_codigo)
             if curso:
-                horarios.append({
+                horario = curso.get("horario")
+                for t in curso.get("turmas", []):
+                    if t.get("turma") == turma:
+                        horario = t.get("horario")
+                entrada = {
                     "codigo": disc_codigo,
                     "nome": curso.get("nome"),
-                    "horario": curso.get("horario")
-                })
+                    "horario": horario
+                }
+                if turma:
+                    entrada["turma"] = turma
+                horarios.append(entrada)
         
         if not horarios:
             return {
@@ -142,78 +642,35 @@ class HorariosBehaviour(CyclicBehaviour):
     
     def parsear_horario(self, horario_str):
         """
-        Parseia string de horário para formato estruturado
+        Compila uma string de horário no formato usado por detectar_conflito:
+        tuplo ordenado de (dia, inicio, fim) em minutos
         Exemplo: "Segunda 14:00-16:00, Quarta 14:00-16:00"
         """
-        dias_map = {
-            "Segunda": 1, "Terça": 2, "Quarta": 3,
-            "Quinta": 4, "Sexta": 5, "Sábado": 6
-        }
-        
-        slots = []
-        if not horario_str:
-            return slots
-        
-        partes = horario_str.split(",")
-        for parte in partes:
-            parte = parte.strip()
-            tokens = parte.split()
-            if len(tokens) >= 2:
-                dia_nome = tokens[0]
-                horario_range = tokens[1]
-                
-                if dia_nome in dias_map and "-" in horario_range:
-                    dia = dias_map[dia_nome]
-                    inicio, fim = horario_range.split("-")
-                    slots.append({
-                        "dia": dia,
-                        "inicio": inicio,
-                        "fim": fim
-                    })
-        
-        return slots
+        return compilar_horario(horario_str)
     
     def detectar_conflito(self, horario1, horario2):
-        """Detecta se há sobreposição entre dois horários"""
-        for slot1 in horario1:
-            for slot2 in horario2:
-                # Mesmo dia
-                if slot1["dia"] == slot2["dia"]:
-                    # Verificar sobreposição de horários
-                    inicio1 = self.hora_para_minutos(slot1["inicio"])
-                    fim1 = self.hora_para_minutos(slot1["fim"])
-                    inicio2 = self.hora_para_minutos(slot2["inicio"])
-                    fim2 = self.hora_para_minutos(slot2["fim"])
-                    
-                    # Há conflito se os intervalos se sobrepõem
-                    if not (fim1 <= inicio2 or fim2 <= inicio1):
-                        return True
-        
-        return False
+        """Detecta se há sobreposição entre dois horários compilados ((dia, inicio, fim) ordenados)"""
+        return sobrepostos(horario1, horario2)
     
     def hora_para_minutos(self, hora_str):
         """Converte hora (HH:MM) para minutos desde meia-noite"""
-        try:
-            partes = hora_str.split(":")
-            horas = int(partes[0])
-            minutos = int(partes[1])
-            return horas * 60 + minutos
-        except:
-            return 0
+        return minutos(hora_str)
     
     def buscar_estudante(self, estudante_id):
         """Busca estudante por ID"""
-        for estudante in self.estudantes_data.get("estudantes", []):
-            if estudante.get("id") == estudante_id:
-                return estudante
-        return None
+        return self.repositorio.buscar_estudante(estudante_id)
     
     def buscar_curso(self, codigo):
         """Busca curso por código"""
-        for curso in self.cursos_data.get("cursos", []):
-            if curso.get("codigo") == codigo:
-                return curso
-        return None
+        return self.repositorio.buscar_curso(codigo)
+    
+    def buscar_horario(self, codigo):
+        """Busca o horário compilado de uma disciplina"""
+        return self.repositorio.buscar_horario(codigo)
+    
+    def buscar_mascara(self, codigo):
+        """Busca a máscara de bits do horário de uma disciplina"""
+        return self.repositorio.buscar_mascara(codigo)
 
 
 class AgenteHorarios(Agent):
@@ -3,11 +3,12 @@ Agente Regulamentos - Gestão de Estatutos Especiais
 Este agente processa pedidos de estatutos especiais (estudante-trabalhador, atleta, etc.)
 """
 
+import asyncio
 import json
-import os
 from spade.agent import Agent
 from spade.behaviour import CyclicBehaviour
 from spade.message import Message
+from .repositorio import RepositorioDados, obter_repositorio
 
 
 class RegulamentosBehaviour(CyclicBehaviour):
@@ -17,22 +18,17 @@ class RegulamentosBehaviour(CyclicBehaviour):
         print("✅ Agente Regulamentos iniciado.")
         await self.carregar_dados()
     
-    async def carregar_dados(self):
+    async def carregar_dados(self, diretorio=None):
         """Carrega dados de estatutos e estudantes"""
+        # Concessões de estatuto à espera de serem gravadas
+        self.gravacoes = set()
         try:
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            
-            with open(os.path.join(base_dir, 'data', 'estatutos.json'), 'r', encoding='utf-8') as f:
-                self.estatutos_data = json.load(f)
-            
-            with open(os.path.join(base_dir, 'data', 'estudantes.json'), 'r', encoding='utf-8') as f:
-                self.estudantes_data = json.load(f)
+            self.repositorio = obter_repositorio(diretorio)
             
             print("📜 Dados de regulamentos carregados com sucesso.")
         except Exception as e:
             print(f"❌ Erro ao carregar dados: {e}")
-            self.estatutos_data = {"estatutos": []}
-            self.estudantes_data = {"estudantes": []}
+            self.repositorio = RepositorioDados(diretorio)
     
     async def run(self):
         """Processa pedidos relacionados com estatutos"""
@@ -44,7 +40,12 @@ class RegulamentosBehaviour(CyclicBehaviour):
                 tipo = content.get("tipo")
                 
                 if tipo == "verificar_estatuto":
-                    resposta = await self.verificar_estatuto(content)
+                    # A concessão é gravada numa tarefa à parte, para que os outros
+                    # pedidos continuem a ser atendidos enquanto o commit decorre
+                    tarefa = asyncio.create_task(self.gravar_e_responder(msg, content))
+                    self.gravacoes.add(tarefa)
+                    tarefa.add_done_callback(self.gravacoes.discard)
+                    return
                 elif tipo == "consultar_estatuto":
                     resposta = await self.consultar_estatuto(content)
                 else:
@@ -53,15 +54,36 @@ class RegulamentosBehaviour(CyclicBehaviour):
                         "mensagem": "Tipo de pedido desconhecido"
                     }
                 
-                # Enviar resposta
-                reply = Message(to=str(msg.sender))
-                reply.set_metadata("performative", "inform")
-                reply.body = json.dumps(resposta)
-                await self.send(reply)
+                await self.responder(msg, resposta)
                 
             except Exception as e:
                 print(f"❌ Erro no Agente Regulamentos: {e}")
     
+    async def responder(self, msg, resposta):
+        """Envia a resposta ao remetente do pedido"""
+        reply = Message(to=str(msg.sender))
+        reply.set_metadata("performative", "inform")
+        reply.thread = msg.thread
+        reply.body = json.dumps(resposta)
+        await self.send(reply)
+    
+    async def gravar_e_responder(self, msg, content):
+        """
+        Verifica o pedido de estatuto e responde quando a concessão estiver
+        gravada. A verificação e o registo em memória do estatuto acontecem
+        sem pausas pelo meio, pelo que dois pedidos do mesmo estudante não
+        são aprovados os dois; só o commit é aguardado.
+        """
+        try:
+            resposta = await self.verificar_estatuto(content)
+        except Exception as e:
+            print(f"❌ Erro ao gravar no Agente Regulamentos: {e}")
+            resposta = {
+                "status": "erro",
+                "mensagem": "Não foi possível gravar o estatuto"
+            }
+        await self.responder(msg, resposta)
+    
     async def verificar_estatuto(self, content):
         """Verifica e processa pedido de estatuto especial"""
         estudante_id = content.get("estudante_id")
@@ -117,7 +139,9 @@ class RegulamentosBehaviour(CyclicBehaviour):
                 "requisitos_faltantes": documentos_faltantes
             }
         
-        # Estatuto aprovado
+        # Estatuto aprovado: fica gravado no estudante
+        if self.repositorio.armazenamento:
+            await self.repositorio.armazenamento.conceder_estatuto(estudante_id, tipo_estatuto)
         beneficios = info_estatuto.get("beneficios", [])
         
         return {
@@ -135,7 +159,7 @@ class RegulamentosBehaviour(CyclicBehaviour):
         if not tipo_estatuto:
             # Listar todos os estatutos disponíveis
             estatutos = []
-            for estatuto in self.estatutos_data.get("estatutos", []):
+            for estatuto in self.repositorio.estatutos:
                 estatutos.append({
                     "tipo": estatuto.get("tipo"),
                     "requisitos": estatuto.get("requisitos", []),
@@ -164,17 +188,11 @@ class RegulamentosBehaviour(CyclicBehaviour):
     
     def buscar_estudante(self, estudante_id):
         """Busca estudante por ID"""
-        for estudante in self.estudantes_data.get("estudantes", []):
-            if estudante.get("id") == estudante_id:
-                return estudante
-        return None
+        return self.repositorio.buscar_estudante(estudante_id)
     
     def buscar_estatuto(self, tipo):
         """Busca estatuto por tipo"""
-        for estatuto in self.estatutos_data.get("estatutos", []):
-            if estatuto.get("tipo") == tipo:
-                return estatuto
-        return None
+        return self.repositorio.buscar_estatuto(tipo)
 
 
 class AgenteRegulamentos(Agent):
@@ -0,0 +1,219 @@
+"""
+Armazenamento - Persistência de inscrições, vagas e estatutos em SQLite
+Guarda as alterações feitas pelos agentes sobre os dados dos ficheiros JSON:
+inscrições (e anulações, com a turma atribuída), vagas ocupadas por
+disciplina e por turma e estatutos concedidos.
+As escritas são agrupadas em transações (group commit), pelo que cada
+pedido só é confirmado depois de gravado sem que cada um pague um commit.
+"""
+
+import asyncio
+import sqlite3
+from .turmas import chave_turma
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS inscricoes (
+    estudante_id TEXT NOT NULL,
+    disciplina TEXT NOT NULL,
+    ativa INTEGER NOT NULL,
+    turma TEXT,
+    PRIMARY KEY (estudante_id, disciplina)
+) WITHOUT ROWID;
+
+-- disciplina: código da disciplina ou chave da turma ("CODIGO/TURMA")
+CREATE TABLE IF NOT EXISTS vagas_ocupadas (
+    disciplina TEXT PRIMARY KEY,
+    ocupadas INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS estatutos_concedidos (
+    estudante_id TEXT PRIMARY KEY,
+    tipo TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Instruções fixas: o módulo sqlite3 mantém-nas compiladas em cache
+SQL_INSCRICAO = """
+INSERT INTO inscricoes (estudante_id, disciplina, ativa, turma) VALUES (?, ?, ?, ?)
+ON CONFLICT (estudante_id, disciplina) DO UPDATE SET ativa = excluded.ativa, turma = excluded.turma
+"""
+
+SQL_VAGAS = """
+INSERT INTO vagas_ocupadas (disciplina, ocupadas) VALUES (?, ?)
+ON CONFLICT (disciplina) DO UPDATE SET ocupadas = ocupadas + excluded.ocupadas
+"""
+
+SQL_ESTATUTO = """
+INSERT INTO estatutos_concedidos (estudante_id, tipo) VALUES (?, ?)
+ON CONFLICT (estudante_id) DO UPDATE SET tipo = excluded.tipo
+"""
+
+
+class ArmazenamentoSQLite:
+    """
+    Persistência das alterações aos dados em SQLite (modo WAL).
+    
+    O estado gravado é mantido também em memória, para que as pesquisas dos
+    agentes não precisem de consultar a base de dados. As escritas entram
+    numa fila; uma única tarefa grava tudo o que estiver na fila numa só
+    transação, numa thread à parte, e só então confirma os pedidos.
+    """
+    
+    def __init__(self, caminho, sincrono="FULL"):
+        self.caminho = caminho
+        self.conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute(f"PRAGMA synchronous={sincrono}")
+        self.conexao.executescript(ESQUEMA)
+        # Bases de dados anteriores às turmas
+        colunas = [linha[1] for linha in self.conexao.execute("PRAGMA table_info(inscricoes)")]
+        if "turma" not in colunas:
+            self.conexao.execute("ALTER TABLE inscricoes ADD COLUMN turma TEXT")
+        
+        self.pendentes = []
+        self.tarefa = None
+        # Funções avisadas de cada inscrição e anulação: f(estudante_id, disciplina, ativa)
+        self.observadores = []
+        # Número de vezes que o estado foi lido da base de dados
+        self.leituras = 0
+        self.carregar()
+    
+    def carregar(self):
+        """Lê o estado gravado para memória"""
+        # estudante_id -> {disciplina: ativa}; ativa=False anula uma inscrição dos ficheiros JSON
+        self.inscricoes = {}
+        # estudante_id -> {disciplina: turma} das inscrições gravadas com turma
+        self.turmas = {}
+        self.ocupadas = {}
+        self.estatutos = {}
+        for estudante_id, disciplina, ativa, turma in self.conexao.execute(
+                "SELECT estudante_id, disciplina, ativa, turma FROM inscricoes"):
+            self.inscricoes.setdefault(estudante_id, {})[disciplina] = bool(ativa)
+            if ativa and turma:
+                self.turmas.setdefault(estudante_id, {})[disciplina] = turma
+        for disciplina, ocupadas in self.conexao.execute(
+                "SELECT disciplina, ocupadas FROM vagas_ocupadas"):
+            self.ocupadas[disciplina] = ocupadas
+        for estudante_id, tipo in self.conexao.execute(
+                "SELECT estudante_id, tipo FROM estatutos_concedidos"):
+            self.estatutos[estudante_id] = tipo
+        self.leituras += 1
+    
+    def inscricoes_efetivas(self, estudante):
+        """Disciplinas inscritas do estudante, com as alterações gravadas aplicadas"""
+        base = estudante.get("disciplinas_inscritas", [])
+        alteracoes = self.inscricoes.get(estudante.get("id"))
+        if not alteracoes:
+            return base
+        inscritas = [d for d in base if alteracoes.get(d, True)]
+        inscritas.extend(d for d, ativa in alteracoes.items() if ativa and d not in base)
+        return inscritas
+    
+    def aplicar_estudante(self, estudante):
+        """
+        Devolve o estudante com as inscrições, as turmas ("turmas":
+        {disciplina: turma}) e o estatuto gravados (cópia só se houver alterações)
+        """
+        estudante_id = estudante.get("id")
+        if estudante_id not in self.inscricoes and estudante_id not in self.estatutos:
+            return estudante
+        estudante = dict(estudante)
+        estudante["disciplinas_inscritas"] = self.inscricoes_efetivas(estudante)
+        if estudante_id in self.turmas:
+            estudante["turmas"] = {**estudante.get("turmas", {}), **self.turmas[estudante_id]}
+        if estudante_id in self.estatutos:
+            estudante["estatuto"] = self.estatutos[estudante_id]
+        return estudante
+    
+    def aplicar_curso(self, curso):
+        """
+        Devolve o curso com as vagas já ocupadas descontadas, na disciplina e
+        em cada turma (cópia só se houver alterações)
+        """
+        codigo = curso.get("codigo")
+        ocupadas = self.ocupadas.get(codigo)
+        if not ocupadas:
+            return curso
+        curso = dict(curso)
+        curso["vagas"] = curso.get("vagas", 0) - ocupadas
+        if curso.get("turmas"):
+            curso["turmas"] = [
+                dict(turma, vagas=turma.get("vagas", 0) - self.ocupadas.get(chave_turma(codigo, turma.get("turma")), 0))
+                for turma in curso["turmas"]
+            ]
+        return curso
+    
+    # As alterações abaixo ficam visíveis em memória logo na chamada; devolvem
+    # o que aguardar (await) até estarem gravadas
+    
+    def inscrever(self, estudante_id, disciplina, turma=None):
+        """Regista a inscrição (na turma indicada, se houver) e ocupa uma vaga"""
+        self.inscricoes.setdefault(estudante_id, {})[disciplina] = True
+        operacoes = [(SQL_INSCRICAO, (estudante_id, disciplina, 1, turma))]
+        for chave in self.chaves_vagas(disciplina, turma):
+            self.ocupadas[chave] = self.ocupadas.get(chave, 0) + 1
+            operacoes.append((SQL_VAGAS, (chave, 1)))
+        if turma:
+            self.turmas.setdefault(estudante_id, {})[disciplina] = turma
+        self.avisar(estudante_id, disciplina, True)
+        return self.gravar(operacoes)
+    
+    def anular_inscricao(self, estudante_id, disciplina, turma=None):
+        """Anula a inscrição e liberta a vaga (também na turma, se houver)"""
+        self.inscricoes.setdefault(estudante_id, {})[disciplina] = False
+        operacoes = [(SQL_INSCRICAO, (estudante_id, disciplina, 0, None))]
+        for chave in self.chaves_vagas(disciplina, turma):
+            self.ocupadas[chave] = self.ocupadas.get(chave, 0) - 1
+            operacoes.append((SQL_VAGAS, (chave, -1)))
+        self.turmas.get(estudante_id, {}).pop(disciplina, None)
+        self.avisar(estudante_id, disciplina, False)
+        return self.gravar(operacoes)
+    
+    def avisar(self, estudante_id, disciplina, ativa):
+        for observador in self.observadores:
+            observador(estudante_id, disciplina, ativa)
+    
+    @staticmethod
+    def chaves_vagas(disciplina, turma):
+        """Contadores de vagas ocupadas afetados por uma inscrição"""
+        return [disciplina, chave_turma(disciplina, turma)] if turma else [disciplina]
+    
+    def conceder_estatuto(self, estudante_id, tipo):
+        """Regista o estatuto concedido"""
+        self.estatutos[estudante_id] = tipo
+        return self.gravar([(SQL_ESTATUTO, (estudante_id, tipo))])
+    
+    async def gravar(self, operacoes):
+        """Junta as operações à próxima transação e aguarda que seja gravada"""
+        futuro = asyncio.get_running_loop().create_future()
+        self.pendentes.append((operacoes, futuro))
+        if self.tarefa is None or self.tarefa.done():
+            self.tarefa = asyncio.create_task(self.descarregar())
+        await futuro
+    
+    async def descarregar(self):
+        """Grava as operações pendentes; as que chegam durante um commit seguem no seguinte"""
+        while self.pendentes:
+            lote, self.pendentes = self.pendentes, []
+            try:
+                await asyncio.to_thread(self.escrever, [op for operacoes, _ in lote for op in operacoes])
+            except Exception as e:
+                print(f"❌ Erro ao gravar no armazenamento: {e}")
+                # O estado em memória volta a refletir apenas o que foi gravado
+                self.carregar()
+                for _, futuro in lote:
+                    if not futuro.done():
+                        futuro.set_exception(e)
+                continue
+            for _, futuro in lote:
+                if not futuro.done():
+                    futuro.set_result(None)
+    
+    def escrever(self, operacoes):
+        """Executa as operações numa única transação"""
+        with self.conexao:
+            for sql, parametros in operacoes:
+                self.conexao.execute(sql, parametros)
+    
+    def fechar(self):
+        self.conexao.close()
@@ -0,0 +1,88 @@
+"""
+Barramento Local - Transporte em memória entre agentes
+Substitui o servidor XMPP quando todos os agentes correm no mesmo processo:
+as mensagens (spade.message.Message) são entregues através de filas asyncio,
+o que permite testar e medir a lógica dos agentes sem rede.
+"""
+
+import asyncio
+
+
+class BarramentoLocal:
+    """
+    Transporte em memória para os agentes do sistema.
+    
+    Cada agente registado fica com uma fila de entrada; uma tarefa de entrega
+    retira as mensagens da fila e distribui-as pelos comportamentos do agente,
+    tal como o cliente XMPP faria. Endereços sem agente (por exemplo,
+    estudantes simulados) obtêm uma caixa de correio com caixa_correio().
+    """
+    
+    def __init__(self):
+        self.agentes = {}
+        self.filas = {}
+        self.tarefas = []
+        self.mensagens_entregues = 0
+    
+    def registar(self, agente):
+        """Liga o agente ao barramento em vez do servidor XMPP"""
+        jid = str(agente.jid)
+        self.agentes[jid] = agente
+        self.filas[jid] = asyncio.Queue()
+        # Os comportamentos enviam mensagens através do contentor do agente
+        agente.set_container(self)
+    
+    def caixa_correio(self, jid):
+        """Devolve a fila de entrada de um endereço que não corresponde a um agente"""
+        jid = str(jid)
+        if jid not in self.filas:
+            self.filas[jid] = asyncio.Queue()
+        return self.filas[jid]
+    
+    async def send(self, msg, behaviour=None):
+        """Coloca a mensagem na fila do destinatário (interface do contentor SPADE)"""
+        destinatario = str(msg.to.bare)
+        fila = self.filas.get(destinatario)
+        if fila is None:
+            print(f"⚠️ Destinatário desconhecido no barramento: {destinatario}")
+            return
+        fila.put_nowait(msg)
+    
+    async def enviar(self, msg):
+        """Envia uma mensagem a partir de um endereço externo (ex.: estudante simulado)"""
+        if msg.empty_sender():
+            raise ValueError("A mensagem tem de indicar o remetente")
+        await self.send(msg)
+    
+    async def iniciar(self):
+        """Inicia as tarefas de entrega e os agentes registados, sem ligação XMPP"""
+        for jid, agente in self.agentes.items():
+            self.tarefas.append(asyncio.create_task(self.entregar(jid, agente)))
+        
+        for agente in self.agentes.values():
+            await agente.setup()
+            agente._alive.set()
+            for behaviour in agente.behaviours:
+                if not behaviour.is_running:
+                    behaviour.set_agent(agente)
+                    behaviour.start()
+    
+    async def entregar(self, jid, agente):
+        """Entrega ao agente as mensagens que chegam à sua fila"""
+        fila = self.filas[jid]
+        while True:
+            msg = await fila.get()
+            agente.dispatch(msg)
+            self.mensagens_entregues += 1
+    
+    async def parar(self):
+        """Termina os comportamentos dos agentes e as tarefas de entrega"""
+        for agente in self.agentes.values():
+            for behaviour in agente.behaviours:
+                behaviour.kill()
+            agente._alive.clear()
+        
+        for tarefa in self.tarefas:
+            tarefa.cancel()
+        await asyncio.gather(*self.tarefas, return_exceptions=True)
+        self.tarefas = []
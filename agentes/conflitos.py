@@ -0,0 +1,152 @@
+"""
+Matriz de Conflitos - Conflitos de horário entre todas as disciplinas
+Calculada uma vez a partir dos horários do catálogo, guarda para cada
+disciplina uma linha de bits (int) com as disciplinas com que colide. As
+máscaras de horário só apontam as candidatas: cada colisão é confirmada com
+os horários compilados, porque as máscaras arredondam as horas a 5 minutos.
+Saber se duas disciplinas colidem, ou quais de um conjunto colidem, passa a
+ser uma consulta de bits. Quando o horário de uma disciplina muda, só essa
+disciplina é recalculada.
+"""
+
+from .horario import sobrepostos
+
+
+def bits(n):
+    """Posições dos bits a 1 de n, por ordem crescente"""
+    while n:
+        menor = n & -n
+        yield menor.bit_length() - 1
+        n ^= menor
+
+
+class MatrizConflitos:
+    """
+    Matriz disciplina × disciplina de conflitos de horário, em bits.
+    
+    Cada disciplina tem um índice fixo; a linha de uma disciplina tem o bit j
+    a 1 se colidir com a disciplina de índice j. Para construir as linhas,
+    guarda-se também, para cada intervalo de 5 minutos da semana, o conjunto
+    (em bits) das disciplinas com aula nesse intervalo: as que partilham um
+    intervalo com a disciplina só entram na linha se os horários compilados
+    se sobrepuserem.
+    """
+    
+    def __init__(self):
+        self.indices = {}
+        self.codigos = []
+        self.linhas = []
+        # Todas as disciplinas presentes no catálogo, em bits
+        self.todas = 0
+        # Intervalo da semana (bit da máscara de horário) -> disciplinas com aula nele
+        self.ocupacao = {}
+        # Máscaras e horários compilados (dicionários do repositório) a partir dos quais foi calculada
+        self.mascaras = {}
+        self.horarios = {}
+    
+    def indice(self, codigo):
+        """Índice da disciplina na matriz, atribuído na primeira vez que aparece"""
+        i = self.indices.get(codigo)
+        if i is None:
+            i = self.indices[codigo] = len(self.codigos)
+            self.codigos.append(codigo)
+            self.linhas.append(0)
+        return i
+    
+    def atualizar(self, mascaras, horarios):
+        """
+        Acerta a matriz com as máscaras de horário e os horários compilados
+        dados (codigo -> máscara, codigo -> horário). Só as disciplinas novas,
+        removidas ou com horário diferente são recalculadas; devolve os
+        códigos dessas disciplinas.
+        """
+        alteradas = [c for c in mascaras if self.horarios.get(c) != horarios.get(c)]
+        removidas = [c for c in self.mascaras if c not in mascaras]
+        
+        for codigo in removidas + alteradas:
+            self.remover(codigo)
+        self.horarios = horarios
+        for codigo in alteradas:
+            self.inserir(codigo, mascaras[codigo])
+        
+        self.mascaras = mascaras
+        for codigo in removidas:
+            del self.indices[codigo]
+        return removidas + alteradas
+    
+    def remover(self, codigo):
+        """Retira a disciplina da ocupação e das linhas das disciplinas com que colidia"""
+        i = self.indices.get(codigo)
+        if i is None:
+            return
+        bit = 1 << i
+        for intervalo in bits(self.mascaras.get(codigo, 0)):
+            self.ocupacao[intervalo] &= ~bit
+        for j in bits(self.linhas[i]):
+            self.linhas[j] &= ~bit
+        self.linhas[i] = 0
+        self.todas &= ~bit
+    
+    def inserir(self, codigo, mascara):
+        """
+        Acrescenta a disciplina com o horário dado e atualiza as linhas
+        afetadas. As disciplinas com aula nos mesmos intervalos de 5 minutos
+        são candidatas; colidem as que se sobrepõem nos horários compilados.
+        """
+        i = self.indice(codigo)
+        bit = 1 << i
+        candidatas = 0
+        for intervalo in bits(mascara):
+            ocupadas = self.ocupacao.get(intervalo, 0)
+            candidatas |= ocupadas
+            self.ocupacao[intervalo] = ocupadas | bit
+        candidatas &= ~bit
+        horario = self.horarios.get(codigo, ())
+        linha = 0
+        for j in bits(candidatas):
+            if sobrepostos(horario, self.horarios.get(self.codigos[j], ())):
+                linha |= 1 << j
+        self.linhas[i] = linha
+        self.todas |= bit
+        for j in bits(linha):
+            self.linhas[j] |= bit
+    
+    def linha(self, codigo):
+        """Disciplinas (em bits) que colidem com a disciplina dada"""
+        i = self.indices.get(codigo)
+        return self.linhas[i] if i is not None else 0
+    
+    def colidem(self, codigo1, codigo2):
+        j = self.indices.get(codigo2)
+        return j is not None and bool(self.linha(codigo1) >> j & 1)
+    
+    def conjunto(self, codigos):
+        """Conjunto de disciplinas em bits"""
+        resultado = 0
+        for codigo in codigos:
+            i = self.indices.get(codigo)
+            if i is not None:
+                resultado |= 1 << i
+        return resultado
+    
+    def compativeis(self, codigos):
+        """
+        Disciplinas do catálogo (em bits) que não colidem com nenhuma das
+        disciplinas dadas, excluindo as próprias
+        """
+        ocupadas = 0
+        for codigo in codigos:
+            i = self.indices.get(codigo)
+            if i is not None:
+                ocupadas |= self.linhas[i] | 1 << i
+        return self.todas & ~ocupadas
+    
+    def conflitos_entre(self, codigos):
+        """Pares de disciplinas da lista que colidem, pela ordem da lista"""
+        pares = []
+        for k, codigo in enumerate(codigos):
+            linha = self.linha(codigo)
+            if linha & self.conjunto(codigos[k + 1:]):
+                pares.extend((codigo, outro) for outro in codigos[k + 1:]
+                             if self.colidem(codigo, outro))
+        return pares
@@ -0,0 +1,86 @@
+"""
+Créditos Inscritos - Total de créditos de cada estudante, mantido em memória
+Os totais são calculados uma vez a partir dos dados (com as inscrições
+gravadas) e depois acertados, só para o estudante em causa, a cada inscrição
+e anulação, pelo que o limite de créditos passa a ser uma só comparação. São
+calculados de novo quando os ficheiros de estudantes ou de cursos são
+recarregados.
+"""
+
+# Máximo de créditos inscritos por semestre
+LIMITE_CREDITOS = 30
+
+
+class CreditosInscritos:
+    """
+    Créditos inscritos por estudante (estudante_id -> total).
+    
+    Regista-se no armazenamento para ser avisado de cada inscrição e anulação
+    gravada, venham elas de que agente vierem.
+    """
+    
+    def __init__(self, repositorio):
+        self.repositorio = repositorio
+        self.totais = {}
+        # Dados a partir dos quais os totais foram calculados
+        self.origem = None
+        if repositorio.armazenamento:
+            repositorio.armazenamento.observadores.append(self.alterada)
+        self.reconstruir()
+    
+    def estado(self):
+        """Identifica os dados atuais: instantâneos de estudantes e cursos e leituras do armazenamento"""
+        armazenamento = self.repositorio.armazenamento
+        return (
+            self.repositorio.estudantes_por_id,
+            self.repositorio.cursos_por_codigo,
+            armazenamento.leituras if armazenamento else 0
+        )
+    
+    def atualizado(self):
+        """Indica se os totais foram calculados a partir dos dados atuais (comparação por identidade)"""
+        return self.origem is not None and all(a is b for a, b in zip(self.estado(), self.origem))
+    
+    def reconstruir(self):
+        """Calcula o total de todos os estudantes a partir dos dados"""
+        armazenamento = self.repositorio.armazenamento
+        cursos = self.repositorio.cursos_por_codigo
+        self.totais = {
+            estudante_id: self.somar(estudante, armazenamento, cursos)
+            for estudante_id, estudante in self.repositorio.estudantes_por_id.items()
+        }
+        self.origem = self.estado()
+    
+    @staticmethod
+    def somar(estudante, armazenamento, cursos):
+        """Soma os créditos das disciplinas inscritas (com as inscrições gravadas)"""
+        if armazenamento:
+            estudante = armazenamento.aplicar_estudante(estudante)
+        total = 0
+        for codigo in estudante.get("disciplinas_inscritas", []):
+            curso = cursos.get(codigo)
+            if curso:
+                total += curso.get("creditos", 0)
+        return total
+    
+    def total(self, estudante_id):
+        """Créditos inscritos do estudante"""
+        if not self.atualizado():
+            self.reconstruir()
+        return self.totais.get(estudante_id, 0)
+    
+    def restantes(self, estudante_id):
+        """Créditos que o estudante ainda pode inscrever até ao limite"""
+        return max(0, LIMITE_CREDITOS - self.total(estudante_id))
+    
+    def alterada(self, estudante_id, disciplina, ativa):
+        """
+        Aviso do armazenamento: inscrição (ativa) ou anulação de uma disciplina.
+        Só o total desse estudante é somado de novo, pelo que uma inscrição
+        repetida ou a anulação de uma disciplina não inscrita não o desacertam.
+        """
+        estudante = self.repositorio.estudantes_por_id.get(estudante_id)
+        if estudante is not None and estudante_id in self.totais:
+            self.totais[estudante_id] = self.somar(
+                estudante, self.repositorio.armazenamento, self.repositorio.cursos_por_codigo
+            )
@@ -0,0 +1,80 @@
+"""
+Índice de Dívidas - Estudantes com propinas em atraso
+O índice é calculado uma vez por cada leitura de estudantes.json: os IDs
+numéricos dos estudantes em atraso ficam num array ordenado de inteiros de
+64 bits, pelo que cada verificação é uma pesquisa binária e a verificação de
+um conjunto de estudantes é uma só pesquisa vetorizada (NumPy searchsorted).
+Os IDs não numéricos, raros, ficam num conjunto à parte.
+"""
+
+from array import array
+from bisect import bisect_left
+import numpy as np
+
+# Maior ID representável no array (inteiros de 64 bits com sinal)
+MAIOR_NUMERO = 2**63 - 1
+
+
+def numero(estudante_id):
+    """
+    ID como inteiro, se for a escrita decimal canónica de um inteiro não
+    negativo de 64 bits ("20230001"); None caso contrário ("A1", "0123")
+    """
+    if not isinstance(estudante_id, str) or not estudante_id.isascii() or not estudante_id.isdigit():
+        return None
+    if len(estudante_id) > 1 and estudante_id[0] == "0":
+        return None
+    valor = int(estudante_id)
+    return valor if valor <= MAIOR_NUMERO else None
+
+
+class IndiceDividas:
+    """Estudantes com propinas em atraso (array ordenado de IDs e conjunto dos restantes)"""
+    
+    __slots__ = ("numeros", "outros")
+    
+    def __init__(self, estudantes=()):
+        numeros = set()
+        outros = set()
+        for estudante in estudantes:
+            if not estudante.get("propinas_em_atraso", False):
+                continue
+            estudante_id = estudante.get("id")
+            valor = numero(estudante_id)
+            if valor is None:
+                outros.add(estudante_id)
+            else:
+                numeros.add(valor)
+        self.numeros = array("q", sorted(numeros))
+        self.outros = frozenset(outros)
+    
+    def __len__(self):
+        return len(self.numeros) + len(self.outros)
+    
+    def em_atraso(self, estudante_id):
+        """Indica se o estudante tem propinas em atraso"""
+        valor = numero(estudante_id)
+        if valor is None:
+            return estudante_id in self.outros
+        i = bisect_left(self.numeros, valor)
+        return i < len(self.numeros) and self.numeros[i] == valor
+    
+    def em_atraso_lote(self, estudante_ids):
+        """Para cada ID, se o estudante tem propinas em atraso (array NumPy de booleanos)"""
+        estudante_ids = list(estudante_ids)
+        valores = [numero(estudante_id) for estudante_id in estudante_ids]
+        resultado = np.zeros(len(valores), dtype=bool)
+        if not valores:
+            return resultado
+        
+        numericos = np.array([v is not None for v in valores], dtype=bool)
+        if self.numeros:
+            ordenados = np.frombuffer(self.numeros, dtype=np.int64)
+            procurados = np.array([v for v in valores if v is not None], dtype=np.int64)
+            posicoes = np.searchsorted(ordenados, procurados)
+            encontrados = ordenados[np.minimum(posicoes, len(ordenados) - 1)] == procurados
+            resultado[numericos] = encontrados
+        if self.outros:
+            for i in np.flatnonzero(~numericos):
+                resultado[i] = estudante_ids[i] in self.outros
+        return resultado
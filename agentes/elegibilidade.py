@@ -0,0 +1,123 @@
+"""
+Elegibilidade em Lote - Disciplinas em que cada estudante se pode inscrever
+Calcula de uma só vez, para todos os estudantes e todas as disciplinas, se a
+inscrição seria aprovada pelas regras do Agente Académico (as mesmas de
+verificar_inscricao): disciplina ainda não feita nem inscrita, pré-requisitos
+feitos, vagas livres e limite de créditos. O resultado é uma matriz NumPy
+estudantes × disciplinas de booleanos, calculada por blocos de estudantes.
+"""
+
+import numpy as np
+from .conflitos import bits
+from .creditos import LIMITE_CREDITOS
+
+# Estudantes tratados de cada vez: limita a memória das matrizes intermédias
+ESTUDANTES_POR_BLOCO = 4096
+
+
+class MatrizElegibilidade:
+    """Elegibilidade de cada estudante (linha) em cada disciplina (coluna)"""
+    
+    __slots__ = ("ids", "codigos", "elegivel", "linhas")
+    
+    def __init__(self, ids, codigos, elegivel):
+        self.ids = ids
+        self.codigos = codigos
+        self.elegivel = elegivel
+        # Em caso de ID repetido prevalece a primeira linha, como no repositório
+        self.linhas = {}
+        for i, estudante_id in enumerate(ids):
+            self.linhas.setdefault(estudante_id, i)
+    
+    def disciplinas(self, estudante_id):
+        """Códigos das disciplinas em que o estudante se pode inscrever"""
+        i = self.linhas.get(estudante_id)
+        if i is None:
+            return []
+        return [self.codigos[j] for j in np.flatnonzero(self.elegivel[i])]
+
+
+def calcular_elegibilidade(estudantes, cursos, grafo, livres=None,
+                           limite_creditos=LIMITE_CREDITOS, bloco=ESTUDANTES_POR_BLOCO):
+    """
+    Matriz de elegibilidade dos estudantes nos cursos dados.
+    
+    grafo: GrafoPrerequisitos do catálogo. livres: para cada curso, se ainda
+    tem vagas livres (por omissão, "vagas" > 0). Os pré-requisitos satisfeitos
+    são contados espalhando cada disciplina feita pelas disciplinas que dela
+    dependem, sem percorrer a lista de pré-requisitos de cada par.
+    """
+    codigos = [curso.get("codigo") for curso in cursos]
+    coluna = {codigo: j for j, codigo in enumerate(codigos)}
+    n_cursos = len(cursos)
+    n_grafo = len(grafo.codigos)
+    
+    creditos_curso = [curso.get("creditos", 0) for curso in cursos]
+    creditos = np.array(creditos_curso, dtype=np.int32)
+    if livres is None:
+        livres = [curso.get("vagas", 0) > 0 for curso in cursos]
+    livres = np.array(livres, dtype=bool)
+    
+    # Número de pré-requisitos diretos de cada curso e, para cada disciplina do
+    # grafo, os cursos que a têm como pré-requisito (em formato CSR)
+    n_prerequisitos = np.zeros(n_cursos, dtype=np.int32)
+    dependentes = [[] for _ in range(n_grafo)]
+    for j, codigo in enumerate(codigos):
+        for p in bits(grafo.cadeia_direta(codigo)):
+            dependentes[p].append(j)
+            n_prerequisitos[j] += 1
+    grau = np.array([len(d) for d in dependentes], dtype=np.int64)
+    inicio = np.concatenate(([0], np.cumsum(grau)[:-1])).astype(np.int64)
+    alvos = np.array([j for d in dependentes for j in d], dtype=np.int64)
+    
+    # Coluna de cada curso no grafo, para saber quais os cursos já feitos
+    colunas_grafo = np.array([grafo.indices.get(codigo, -1) for codigo in codigos], dtype=np.int64)
+    no_grafo = colunas_grafo >= 0
+    
+    elegivel = np.zeros((len(estudantes), n_cursos), dtype=bool)
+    for primeiro in range(0, len(estudantes), bloco):
+        parte = estudantes[primeiro:primeiro + bloco]
+        n = len(parte)
+        
+        feitas = np.zeros((n, n_grafo), dtype=bool)
+        inscritas = np.zeros((n, n_cursos), dtype=bool)
+        # Créditos inscritos, somados como em creditos_inscritos
+        creditos_atuais = [0] * n
+        linhas_f, colunas_f, linhas_i, colunas_i = [], [], [], []
+        for i, estudante in enumerate(parte):
+            for codigo in estudante.get("disciplinas_completas", []):
+                g = grafo.indices.get(codigo)
+                if g is not None:
+                    linhas_f.append(i)
+                    colunas_f.append(g)
+            for codigo in estudante.get("disciplinas_inscritas", []):
+                j = coluna.get(codigo)
+                if j is not None:
+                    linhas_i.append(i)
+                    colunas_i.append(j)
+                    creditos_atuais[i] += creditos_curso[j]
+        creditos_atuais = np.array(creditos_atuais, dtype=np.int32)
+        feitas[linhas_f, colunas_f] = True
+        inscritas[linhas_i, colunas_i] = True
+        
+        # Pré-requisitos feitos de cada curso: cada disciplina feita soma 1 aos seus dependentes
+        linhas, feitas_g = np.nonzero(feitas)
+        quantos = grau[feitas_g]
+        total = int(quantos.sum())
+        deslocamento = np.arange(total) - np.repeat(np.cumsum(quantos) - quantos, quantos)
+        destinos = alvos[np.repeat(inicio[feitas_g], quantos) + deslocamento]
+        satisfeitos = np.zeros((n, n_cursos), dtype=np.int32)
+        np.add.at(satisfeitos, (np.repeat(linhas, quantos), destinos), 1)
+        
+        completas = np.zeros((n, n_cursos), dtype=bool)
+        completas[:, no_grafo] = feitas[:, colunas_grafo[no_grafo]]
+        
+        elegivel[primeiro:primeiro + n] = (
+            ~inscritas
+            & ~completas
+            & (satisfeitos == n_prerequisitos)
+            & livres
+            & (creditos_atuais[:, None] + creditos <= limite_creditos)
+        )
+    
+    return MatrizElegibilidade([e.get("id") for e in estudantes], codigos, elegivel)
@@ -0,0 +1,79 @@
+"""
+Tabela de Equivalências - Regras de equivalência entre disciplinas
+As regras do ficheiro equivalencias.json indicam, para uma disciplina de
+origem (do catálogo ou de outra instituição) e uma disciplina de destino do
+catálogo, se a equivalência é aprovada ou recusada. São indexadas por origem
+e por destino, para que o percurso de um estudante transferido seja
+comparado com as regras de uma só vez, sem percorrer a lista toda.
+Os pares sem regra seguem a regra geral dos créditos (ver decidir).
+"""
+
+# Fração dos créditos do destino que a origem tem de ter, nos pares sem regra
+FRACAO_CREDITOS = 0.8
+
+
+class TabelaEquivalencias:
+    """Regras de equivalência por origem (origem -> {destino: regra}) e por destino"""
+    
+    def __init__(self, regras):
+        self.por_origem = {}
+        self.por_destino = {}
+        for regra in regras:
+            origem, destino = regra.get("origem"), regra.get("destino")
+            destinos = self.por_origem.setdefault(origem, {})
+            # Em caso de par repetido prevalece a primeira regra, como nos outros índices
+            if destino not in destinos:
+                destinos[destino] = regra
+                self.por_destino.setdefault(destino, []).append(origem)
+    
+    def regra(self, origem, destino):
+        """Regra do par, ou None se não houver"""
+        return self.por_origem.get(origem, {}).get(destino)
+    
+    def destinos(self, origem):
+        """Disciplinas de destino com regra para a origem dada"""
+        return list(self.por_origem.get(origem, ()))
+    
+    def origens(self, destino):
+        """Disciplinas de origem com regra para o destino dado"""
+        return self.por_destino.get(destino, [])
+
+
+def decidir(regra, curso_origem, curso_destino):
+    """
+    Decisão sobre um par de disciplinas, independente do estudante:
+    {"status": "aprovado" | "recusado", "mensagem": ...}. Com regra, vale a
+    regra; sem regra, a origem tem de ter pelo menos 80% dos créditos do destino.
+    """
+    if regra:
+        nome_origem = curso_origem.get("nome") if curso_origem else regra.get("origem")
+        if regra.get("decisao", "aprovada") == "aprovada":
+            return {
+                "status": "aprovado",
+                "mensagem": f"Equivalência aprovada: {nome_origem} ≈ {curso_destino.get('nome')}"
+            }
+        return {
+            "status": "recusado",
+            "mensagem": regra.get("motivo") or f"Equivalência recusada pela tabela: {nome_origem} -> {curso_destino.get('nome')}"
+        }
+    
+    if not curso_origem:
+        return {
+            "status": "recusado",
+            "mensagem": "Uma das disciplinas não foi encontrada"
+        }
+    
+    # Verificar créditos (deve ter pelo menos 80% dos créditos)
+    creditos_origem = curso_origem.get("creditos", 0)
+    creditos_destino = curso_destino.get("creditos", 0)
+    
+    if creditos_origem < creditos_destino * FRACAO_CREDITOS:
+        return {
+            "status": "recusado",
+            "mensagem": f"Créditos insuficientes (origem: {creditos_origem}, necessário: {creditos_destino * FRACAO_CREDITOS})"
+        }
+    
+    return {
+        "status": "aprovado",
+        "mensagem": f"Equivalência aprovada: {curso_origem.get('nome')} ≈ {curso_destino.get('nome')}"
+    }
@@ -0,0 +1,103 @@
+"""
+Horários Compilados - Representação numérica dos horários das disciplinas
+O texto do horário ("Segunda 14:00-16:00, Quarta 14:00-16:00") é convertido
+uma única vez, ao carregar os dados, num tuplo ordenado de aulas
+(dia, inicio, fim), com o dia de 1 (Segunda) a 6 (Sábado) e as horas em
+minutos desde a meia-noite. As verificações de conflito trabalham só
+sobre estes tuplos, sem tratar texto durante os pedidos.
+"""
+
+DIAS = {
+    "Segunda": 1, "Terça": 2, "Quarta": 3,
+    "Quinta": 4, "Sexta": 5, "Sábado": 6
+}
+NOMES_DIAS = {numero: nome for nome, numero in DIAS.items()}
+
+
+def minutos(hora_str):
+    """Converte hora (HH:MM) para minutos desde meia-noite; 0 se for inválida"""
+    try:
+        horas, mins = hora_str.split(":")[:2]
+        return int(horas) * 60 + int(mins)
+    except (ValueError, AttributeError):
+        return 0
+
+
+def formatar_hora(minutos_dia):
+    """Converte minutos desde meia-noite em "H:MM", como nos ficheiros de dados"""
+    return f"{minutos_dia // 60}:{minutos_dia % 60:02d}"
+
+
+def compilar_horario(horario_str):
+    """
+    Converte o texto do horário num tuplo de (dia, inicio, fim) ordenado.
+    Partes mal formadas ou com dia desconhecido são ignoradas.
+    """
+    aulas = []
+    for parte in (horario_str or "").split(","):
+        tokens = parte.split()
+        if len(tokens) >= 2 and tokens[0] in DIAS and "-" in tokens[1]:
+            inicio, fim = tokens[1].split("-", 1)
+            aulas.append((DIAS[tokens[0]], minutos(inicio), minutos(fim)))
+    return tuple(sorted(aulas))
+
+
+def sobrepostos(horario1, horario2):
+    """
+    Indica se dois horários compilados têm aulas sobrepostas.
+    Percorre os dois tuplos ordenados em simultâneo (como numa fusão),
+    avançando sempre a aula que termina primeiro.
+    """
+    i = j = 0
+    while i < len(horario1) and j < len(horario2):
+        dia1, inicio1, fim1 = horario1[i]
+        dia2, inicio2, fim2 = horario2[j]
+        if dia1 == dia2 and inicio1 < fim2 and inicio2 < fim1:
+            return True
+        if (dia1, fim1) <= (dia2, fim2):
+            i += 1
+        else:
+            j += 1
+    return False
+
+
+def sobreposicoes(horario1, horario2):
+    """
+    Intervalos (dia, inicio, fim) em que dois horários compilados se
+    sobrepõem, obtidos com a mesma passagem que sobrepostos().
+    """
+    intervalos = []
+    i = j = 0
+    while i < len(horario1) and j < len(horario2):
+        dia1, inicio1, fim1 = horario1[i]
+        dia2, inicio2, fim2 = horario2[j]
+        if dia1 == dia2 and inicio1 < fim2 and inicio2 < fim1:
+            intervalos.append((dia1, max(inicio1, inicio2), min(fim1, fim2)))
+        if (dia1, fim1) <= (dia2, fim2):
+            i += 1
+        else:
+            j += 1
+    return intervalos
+
+
+# Máscaras semanais: um bit por intervalo de 5 minutos, de Segunda a Sábado
+MINUTOS_POR_BIT = 5
+BITS_POR_DIA = 24 * 60 // MINUTOS_POR_BIT
+
+
+def mascara_horario(horario):
+    """
+    Converte um horário compilado numa máscara de bits (int) da semana.
+    As horas que não caiam em múltiplos de 5 minutos são arredondadas para
+    fora, pelo que aulas sobrepostas dão sempre máscaras que se intersectam
+    (a & b != 0), mas o inverso não é garantido (Segunda 09:00-10:02 e
+    Segunda 10:03-11:00 partilham o intervalo das 10:00). A máscara serve só
+    de pré-filtro: uma interseção confirma-se com sobrepostos().
+    """
+    mascara = 0
+    for dia, inicio, fim in horario:
+        primeiro = max(0, inicio) // MINUTOS_POR_BIT
+        ultimo = min(-(-fim // MINUTOS_POR_BIT), BITS_POR_DIA)
+        if ultimo > primeiro:
+            mascara |= ((1 << (ultimo - primeiro)) - 1) << ((dia - 1) * BITS_POR_DIA + primeiro)
+    return mascara
@@ -0,0 +1,149 @@
+"""
+Lista de Espera - Estudantes à espera de vaga em cada disciplina
+Quando uma disciplina não tem vagas, o estudante pode ficar em lista de
+espera em vez de repetir o pedido. Cada disciplina tem uma heap ordenada
+pela prioridade do estudante (estatuto com prioridade nas inscrições e ano)
+e, em caso de empate, pela ordem de chegada. Quando um lugar fica livre, o
+Agente Académico retira da heap o primeiro estudante e inscreve-o.
+O número de estudantes em espera de cada disciplina é mantido à parte; a
+posição exata de um estudante só é calculada quando é consultada.
+"""
+
+import heapq
+import itertools
+
+# Início dos benefícios de estatuto que dão prioridade nas inscrições
+BENEFICIO_PRIORIDADE = "Prioridade em inscrições"
+
+# Hora (em minutos) a partir da qual uma aula conta como noturna
+INICIO_NOTURNO = 18 * 60
+
+# Entradas antigas toleradas numa heap antes de ser compactada
+MINIMO_COMPACTAR = 64
+
+
+def prioridade(estudante, estatuto=None, horario=()):
+    """
+    Prioridade do estudante na lista de espera de uma disciplina (menor é
+    melhor): primeiro os estudantes cujo estatuto dá prioridade nas inscrições
+    ("Prioridade em inscrições noturnas" só nas disciplinas com aulas a partir
+    das 18:00), depois os dos anos mais avançados.
+    estatuto: registo do estatuto do estudante; horario: tuplo de (dia, inicio, fim).
+    """
+    prioritario = False
+    for beneficio in (estatuto or {}).get("beneficios", []):
+        if beneficio.startswith(BENEFICIO_PRIORIDADE):
+            if beneficio.endswith("noturnas"):
+                prioritario = prioritario or any(inicio >= INICIO_NOTURNO for _, inicio, _ in horario)
+            else:
+                prioritario = True
+    return (0 if prioritario else 1, -estudante.get("ano", 0))
+
+
+class ListaEspera:
+    """
+    Listas de espera de todas as disciplinas.
+    
+    As saídas da lista são marcadas em entradas e as respetivas linhas da heap
+    só são descartadas quando chegam ao topo (ou quando as linhas antigas
+    passam a ser mais do que as ativas e a heap é compactada), pelo que
+    entrar, sair e retirar o primeiro custam O(log n) amortizado e o número
+    de estudantes em espera O(1).
+    """
+    
+    def __init__(self):
+        # disciplina -> heap de (prioridade, sequencia, estudante_id); pode conter entradas antigas
+        self.filas = {}
+        # (estudante_id, disciplina) -> (prioridade, sequencia) das entradas ativas
+        self.entradas = {}
+        # disciplina -> número de entradas ativas na heap
+        self.ativas = {}
+        # estudante_id -> disciplinas em que está em espera
+        self.por_estudante = {}
+        # estudante_id -> disciplinas em que foi inscrito a partir da lista
+        self.promovidas = {}
+        self.sequencia = itertools.count()
+    
+    def entrar(self, estudante_id, disciplina, prioridade):
+        """Coloca o estudante na lista; devolve False se já estava"""
+        if (estudante_id, disciplina) in self.entradas:
+            return False
+        self.repor(estudante_id, disciplina, (prioridade, next(self.sequencia)))
+        return True
+    
+    def repor(self, estudante_id, disciplina, ordem):
+        """Volta a colocar o estudante na lista com a ordem (prioridade, sequencia) que tinha"""
+        self.entradas[(estudante_id, disciplina)] = ordem
+        self.ativas[disciplina] = self.ativas.get(disciplina, 0) + 1
+        self.por_estudante.setdefault(estudante_id, set()).add(disciplina)
+        heapq.heappush(self.filas.setdefault(disciplina, []), (*ordem, estudante_id))
+    
+    def sair(self, estudante_id, disciplina):
+        """Retira o estudante da lista; devolve False se não estava"""
+        if self.entradas.pop((estudante_id, disciplina), None) is None:
+            return False
+        self.ativas[disciplina] -= 1
+        disciplinas = self.por_estudante[estudante_id]
+        disciplinas.discard(disciplina)
+        if not disciplinas:
+            del self.por_estudante[estudante_id]
+        self.compactar(disciplina)
+        return True
+    
+    def compactar(self, disciplina):
+        """Descarta as linhas antigas da heap quando já são mais do que as ativas"""
+        fila = self.filas.get(disciplina)
+        ativas = self.ativas[disciplina]
+        if fila is None or len(fila) - ativas <= max(ativas, MINIMO_COMPACTAR):
+            return
+        fila[:] = [linha for linha in fila if self.ativa(linha, disciplina)]
+        heapq.heapify(fila)
+    
+    def ativa(self, linha, disciplina):
+        """Indica se a linha da heap corresponde a uma entrada ainda na lista"""
+        prioridade, sequencia, estudante_id = linha
+        return self.entradas.get((estudante_id, disciplina)) == (prioridade, sequencia)
+    
+    def retirar(self, disciplina):
+        """
+        Retira o primeiro estudante da lista da disciplina; devolve
+        (estudante_id, ordem) ou None se a lista estiver vazia
+        """
+        fila = self.filas.get(disciplina)
+        while fila:
+            linha = heapq.heappop(fila)
+            if self.ativa(linha, disciplina):
+                estudante_id = linha[2]
+                self.sair(estudante_id, disciplina)
+                return estudante_id, linha[:2]
+        if fila is not None:
+            del self.filas[disciplina]
+            self.ativas.pop(disciplina, None)
+        return None
+    
+    def posicao(self, estudante_id, disciplina):
+        """
+        Posição do estudante na lista (1 é o próximo), ou None se não estiver.
+        Percorre a heap da disciplina: só é usada nas consultas.
+        """
+        ordem = self.entradas.get((estudante_id, disciplina))
+        if ordem is None:
+            return None
+        return 1 + sum(1 for linha in self.filas.get(disciplina, [])
+                       if linha[:2] < ordem and self.ativa(linha, disciplina))
+    
+    def em_espera(self, disciplina):
+        """Número de estudantes na lista da disciplina"""
+        return self.ativas.get(disciplina, 0)
+    
+    def disciplinas(self):
+        """Disciplinas com estudantes (ou entradas antigas) em lista de espera"""
+        return list(self.filas)
+    
+    def do_estudante(self, estudante_id):
+        """Disciplinas em que o estudante está em espera, com a posição em cada uma"""
+        return {d: self.posicao(estudante_id, d) for d in sorted(self.por_estudante.get(estudante_id, ()))}
+    
+    def promovida(self, estudante_id, disciplina):
+        """Regista que o estudante foi inscrito na disciplina a partir da lista"""
+        self.promovidas.setdefault(estudante_id, []).append(disciplina)
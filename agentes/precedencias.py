@@ -0,0 +1,140 @@
+"""
+Grafo de Pré-requisitos - Precedências entre disciplinas do catálogo
+Os pré-requisitos de todas as disciplinas são compilados ao carregar os dados
+num grafo com uma ordem topológica e o fecho transitivo de cada disciplina,
+guardados em bits (int). Saber se um estudante já fez os pré-requisitos de
+uma disciplina, ou qual a cadeia completa de pré-requisitos, passa a ser uma
+operação de bits. Os ciclos (A exige B e B exige A) são detetados e indicados.
+"""
+
+from collections import deque
+from .conflitos import bits
+
+
+class GrafoPrerequisitos:
+    """
+    Pré-requisitos diretos e transitivos de cada disciplina, em bits.
+    
+    Cada disciplina (e cada pré-requisito que não exista no catálogo) tem um
+    índice fixo; o bit j de diretos[i] indica que a disciplina j é pré-requisito
+    direto da disciplina i, e fecho[i] inclui também os pré-requisitos dos
+    pré-requisitos, até ao fim da cadeia.
+    """
+    
+    def __init__(self, cursos):
+        self.indices = {}
+        self.codigos = []
+        for curso in cursos:
+            self.indice(curso.get("codigo"))
+        for curso in cursos:
+            for p in curso.get("prerequisitos", []):
+                self.indice(p)
+        self.diretos = [0] * len(self.codigos)
+        for curso in cursos:
+            i = self.indices[curso.get("codigo")]
+            for p in curso.get("prerequisitos", []):
+                self.diretos[i] |= 1 << self.indices[p]
+        
+        self.ordem = self.ordenar()
+        # Posição de cada disciplina na ordem topológica (as dos ciclos no fim)
+        self.posicao = [len(self.ordem) + i for i in range(len(self.codigos))]
+        for k, i in enumerate(self.ordem):
+            self.posicao[i] = k
+        self.fecho = self.fechar()
+        # Disciplinas que fazem parte de um ciclo (são pré-requisito de si próprias)
+        self.ciclos = [c for i, c in enumerate(self.codigos) if self.fecho[i] >> i & 1]
+        # Disciplinas feitas de cada estudante: estudante_id -> (lista, bits)
+        self.feitas_por_estudante = {}
+    
+    def indice(self, codigo):
+        i = self.indices.get(codigo)
+        if i is None:
+            i = self.indices[codigo] = len(self.codigos)
+            self.codigos.append(codigo)
+        return i
+    
+    def ordenar(self):
+        """
+        Ordem topológica (algoritmo de Kahn): cada disciplina depois dos seus
+        pré-requisitos, pela ordem do catálogo em caso de escolha. As
+        disciplinas em ciclos, ou que dependem de um, ficam de fora.
+        """
+        dependentes = [[] for _ in self.codigos]
+        em_falta = [0] * len(self.codigos)
+        for i, diretos in enumerate(self.diretos):
+            for p in bits(diretos):
+                dependentes[p].append(i)
+                em_falta[i] += 1
+        
+        prontas = deque(i for i, n in enumerate(em_falta) if n == 0)
+        ordem = []
+        while prontas:
+            i = prontas.popleft()
+            ordem.append(i)
+            for d in dependentes[i]:
+                em_falta[d] -= 1
+                if em_falta[d] == 0:
+                    prontas.append(d)
+        return ordem
+    
+    def fechar(self):
+        """Fecho transitivo de cada disciplina, pela ordem topológica"""
+        fecho = [0] * len(self.codigos)
+        for i in self.ordem:
+            for p in bits(self.diretos[i]):
+                fecho[i] |= fecho[p] | 1 << p
+        
+        # Disciplinas fora da ordem (ciclos): repete-se até o fecho estabilizar
+        restantes = set(range(len(self.codigos))) - set(self.ordem)
+        alterado = bool(restantes)
+        while alterado:
+            alterado = False
+            for i in restantes:
+                novo = self.diretos[i]
+                for p in bits(self.diretos[i]):
+                    novo |= fecho[p]
+                if novo != fecho[i]:
+                    fecho[i] = novo
+                    alterado = True
+        return fecho
+    
+    def conjunto(self, codigos):
+        """Conjunto de disciplinas em bits (as desconhecidas são ignoradas)"""
+        resultado = 0
+        for codigo in codigos:
+            i = self.indices.get(codigo)
+            if i is not None:
+                resultado |= 1 << i
+        return resultado
+    
+    def feitas(self, estudante):
+        """
+        Disciplinas completas do estudante em bits. O resultado fica em memória
+        enquanto a lista do estudante for a mesma (até os dados serem recarregados).
+        """
+        completas = estudante.get("disciplinas_completas", [])
+        entrada = self.feitas_por_estudante.get(estudante.get("id"))
+        if entrada and entrada[0] is completas:
+            return entrada[1]
+        feitas = self.conjunto(completas)
+        self.feitas_por_estudante[estudante.get("id")] = (completas, feitas)
+        return feitas
+    
+    def faltam(self, codigo, feitas):
+        """Pré-requisitos diretos da disciplina (em bits) que não estão em feitas (bits)"""
+        i = self.indices.get(codigo)
+        return self.diretos[i] & ~feitas if i is not None else 0
+    
+    def cadeia_direta(self, codigo):
+        """Pré-requisitos diretos da disciplina, em bits"""
+        i = self.indices.get(codigo)
+        return self.diretos[i] if i is not None else 0
+    
+    def codigos_de(self, conjunto):
+        """Códigos das disciplinas de um conjunto em bits, pela ordem topológica"""
+        return [self.codigos[i] for i in sorted(bits(conjunto), key=self.posicao.__getitem__)]
+    
+    def cadeia(self, codigo):
+        """Todos os pré-requisitos da disciplina (diretos e indiretos), em bits"""
+        i = self.indices.get(codigo)
+        return self.fecho[i] if i is not None else 0
@@ -0,0 +1,354 @@
+"""
+Repositório de Dados - Acesso partilhado aos dados da secretaria
+Carrega estudantes, cursos e estatutos e mantém índices por ID de estudante,
+código de disciplina e tipo de estatuto, usados por todos os agentes, bem
+como os horários das disciplinas e das turmas já compilados (tuplos e
+máscaras de bits), o grafo de pré-requisitos do catálogo, o índice dos
+estudantes com propinas em atraso e a tabela de equivalências (ficheiro
+opcional).
+Os dados são carregados uma única vez por processo (obter_repositorio) e
+recarregados automaticamente quando um dos ficheiros JSON é alterado.
+As inscrições, vagas e estatutos alterados pelos agentes ficam gravados no
+armazenamento SQLite e são aplicados por cima dos dados dos ficheiros.
+"""
+
+import json
+import os
+import time
+from .armazenamento import ArmazenamentoSQLite
+from .dividas import IndiceDividas
+from .equivalencias import TabelaEquivalencias
+from .horario import compilar_horario, mascara_horario, sobrepostos
+from .precedencias import GrafoPrerequisitos
+from .turmas import chave_turma
+
+# Diretório de dados por omissão; pode ser substituído pela variável ASM_DADOS
+DIRETORIO_DADOS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+# Nome de cada ficheiro e campo usado como chave do respetivo índice
+FICHEIROS = {
+    "estudantes": "id",
+    "cursos": "codigo",
+    "estatutos": "tipo",
+    "equivalencias": "origem"
+}
+
+# Ficheiros que podem não existir (equivalem a uma lista vazia)
+FICHEIROS_OPCIONAIS = {"equivalencias"}
+
+# Repositórios partilhados, um por diretório de dados
+_repositorios = {}
+
+
+class Instantaneo:
+    """Registos e índices de um dado momento; nunca é alterado depois de criado"""
+
+    __slots__ = ("estudantes", "cursos", "estatutos",
+                 "estudantes_por_id", "cursos_por_codigo", "estatutos_por_tipo",
+                 "horarios_por_codigo", "mascaras_por_codigo", "turmas_por_codigo",
+                 "grafo_prerequisitos", "equivalencias", "tabela_equivalencias",
+                 "indice_dividas")
+
+    def __init__(self, anterior=None):
+        for atributo in self.__slots__:
+            if anterior:
+                valor = getattr(anterior, atributo)
+            elif atributo in FICHEIROS:
+                valor = []
+            elif atributo == "grafo_prerequisitos":
+                valor = GrafoPrerequisitos([])
+            elif atributo == "tabela_equivalencias":
+                valor = TabelaEquivalencias([])
+            elif atributo == "indice_dividas":
+                valor = IndiceDividas()
+            else:
+                valor = {}
+            setattr(self, atributo, valor)
+
+
+class RepositorioDados:
+    """
+    Dados da secretaria com índices em memória.
+    As pesquisas por ID de estudante, código de disciplina e tipo de estatuto
+    são feitas em dicionários, em tempo constante, em vez de percorrerem as
+    listas lidas dos ficheiros JSON.
+
+    Os leitores usam sempre um instantâneo completo dos dados. Quando a data
+    de modificação de um ficheiro muda, só esse ficheiro é lido de novo e o
+    novo instantâneo substitui o anterior de uma só vez.
+    """
+
+    def __init__(self, diretorio=None, intervalo_verificacao=1.0):
+        self.diretorio = diretorio or os.environ.get("ASM_DADOS") or DIRETORIO_DADOS
+        # Segundos entre verificações das datas de modificação (0: em cada pesquisa)
+        self.intervalo_verificacao = intervalo_verificacao
+        self.instantaneo = Instantaneo()
+        # Alterações gravadas pelos agentes (ArmazenamentoSQLite), se existir
+        self.armazenamento = None
+        # Créditos inscritos por estudante (CreditosInscritos), criados pelo Agente Académico
+        self.creditos = None
+        self.versoes = {}
+        self.ultima_verificacao = time.monotonic()
+
+    @property
+    def estudantes(self):
+        return self.instantaneo.estudantes
+
+    @property
+    def cursos(self):
+        return self.instantaneo.cursos
+
+    @property
+    def estatutos(self):
+        return self.instantaneo.estatutos
+
+    @property
+    def equivalencias(self):
+        return self.instantaneo.equivalencias
+
+    @property
+    def estudantes_por_id(self):
+        return self.instantaneo.estudantes_por_id
+
+    @property
+    def cursos_por_codigo(self):
+        return self.instantaneo.cursos_por_codigo
+
+    @property
+    def estatutos_por_tipo(self):
+        return self.instantaneo.estatutos_por_tipo
+
+    @property
+    def horarios_por_codigo(self):
+        return self.instantaneo.horarios_por_codigo
+
+    @property
+    def mascaras_por_codigo(self):
+        return self.instantaneo.mascaras_por_codigo
+
+    @property
+    def turmas_por_codigo(self):
+        return self.instantaneo.turmas_por_codigo
+
+    @property
+    def grafo_prerequisitos(self):
+        return self.instantaneo.grafo_prerequisitos
+
+    @property
+    def tabela_equivalencias(self):
+        return self.instantaneo.tabela_equivalencias
+
+    @property
+    def indice_dividas(self):
+        return self.instantaneo.indice_dividas
+
+    def caminho(self, nome):
+        return os.path.join(self.diretorio, f'{nome}.json')
+
+    def versao(self, nome):
+        """
+        Identifica a versão de um ficheiro pela data de modificação e tamanho
+        (None se for um ficheiro opcional que não existe)
+        """
+        try:
+            estado = os.stat(self.caminho(nome))
+        except FileNotFoundError:
+            if nome in FICHEIROS_OPCIONAIS:
+                return None
+            raise
+        return (estado.st_mtime_ns, estado.st_size)
+
+    def carregar(self, *nomes):
+        """
+        Lê os ficheiros indicados ("estudantes", "cursos", "estatutos",
+        "equivalencias"); sem argumentos lê todos
+        """
+        novo = Instantaneo(self.instantaneo)
+        versoes = {}
+        for nome in nomes or FICHEIROS:
+            versoes[nome] = self.versao(nome)
+            if versoes[nome] is None:
+                registos = []
+            else:
+                with open(self.caminho(nome), 'r', encoding='utf-8') as f:
+                    registos = json.load(f).get(nome, [])
+            self.indexar(novo, nome, registos)
+
+        # Troca atómica: os leitores veem o instantâneo anterior ou o novo, nunca uma mistura
+        self.instantaneo = novo
+        self.versoes.update(versoes)
+        return list(versoes)
+
+    @staticmethod
+    def indexar(instantaneo, nome, registos):
+        """Coloca no instantâneo os registos de um ficheiro e o respetivo índice"""
+        if nome == "equivalencias":
+            # Várias regras por origem: índice por origem e por destino
+            instantaneo.equivalencias = registos
+            instantaneo.tabela_equivalencias = TabelaEquivalencias(registos)
+            return
+        chave = FICHEIROS[nome]
+        indice = {}
+        for registo in registos:
+            # Em caso de chave repetida prevalece o primeiro registo, como na pesquisa linear
+            indice.setdefault(registo.get(chave), registo)
+        setattr(instantaneo, nome, registos)
+        setattr(instantaneo, f"{nome}_por_{chave}", indice)
+
+        if nome == "estudantes":
+            # Propinas em atraso num array ordenado de IDs (um registo por ID, como no índice)
+            instantaneo.indice_dividas = IndiceDividas(indice.values())
+
+        if nome == "cursos":
+            # Horários compilados uma só vez, para os pedidos não tratarem texto.
+            # As disciplinas com turmas têm um horário por turma ("CODIGO/TURMA")
+            # e as suas vagas são a soma das vagas das turmas
+            instantaneo.horarios_por_codigo = {}
+            instantaneo.turmas_por_codigo = {}
+            for codigo, curso in indice.items():
+                turmas = curso.get("turmas")
+                if not turmas:
+                    instantaneo.horarios_por_codigo[codigo] = compilar_horario(curso.get("horario", ""))
+                    continue
+                chaves = instantaneo.turmas_por_codigo[codigo] = {}
+                for turma in turmas:
+                    chave = chaves[turma.get("turma")] = chave_turma(codigo, turma.get("turma"))
+                    instantaneo.horarios_por_codigo[chave] = compilar_horario(turma.get("horario", ""))
+                curso["vagas"] = sum(turma.get("vagas", 0) for turma in turmas)
+
+            # Pré-requisitos compilados num grafo (ordem topológica e fecho transitivo)
+            instantaneo.grafo_prerequisitos = GrafoPrerequisitos(indice.values())
+            if instantaneo.grafo_prerequisitos.ciclos:
+                print(f"⚠️ Pré-requisitos em ciclo: {', '.join(instantaneo.grafo_prerequisitos.ciclos)}")
+            instantaneo.mascaras_por_codigo = {
+                codigo: mascara_horario(horario)
+                for codigo, horario in instantaneo.horarios_por_codigo.items()
+            }
+
+    def recarregar_se_alterado(self):
+        """Volta a ler os ficheiros carregados cuja data de modificação mudou; devolve os recarregados"""
+        self.ultima_verificacao = time.monotonic()
+        alterados = []
+        for nome, versao in self.versoes.items():
+            try:
+                if self.versao(nome) != versao:
+                    alterados.append(nome)
+            except OSError:
+                continue
+
+        if not alterados:
+            return []
+
+        try:
+            self.carregar(*alterados)
+            print(f"🔄 Dados recarregados: {', '.join(alterados)}")
+        except (OSError, ValueError) as e:
+            # Ficheiro a meio de ser escrito: mantém-se o instantâneo atual e tenta-se de novo depois
+            print(f"⚠️ Não foi possível recarregar {', '.join(alterados)}: {e}")
+            return []
+        return alterados
+
+    def verificar_alteracoes(self):
+        """Verifica os ficheiros, no máximo uma vez por intervalo_verificacao"""
+        if time.monotonic() - self.ultima_verificacao >= self.intervalo_verificacao:
+            self.recarregar_se_alterado()
+
+    def buscar_estudante(self, estudante_id):
+        """Busca estudante por ID, com as inscrições e o estatuto gravados"""
+        self.verificar_alteracoes()
+        estudante = self.instantaneo.estudantes_por_id.get(estudante_id)
+        if estudante and self.armazenamento:
+            return self.armazenamento.aplicar_estudante(estudante)
+        return estudante
+
+    def buscar_curso(self, codigo):
+        """Busca curso por código, com as vagas ocupadas descontadas"""
+        self.verificar_alteracoes()
+        curso = self.instantaneo.cursos_por_codigo.get(codigo)
+        if curso and self.armazenamento:
+            return self.armazenamento.aplicar_curso(curso)
+        return curso
+
+    def chaves_horario(self, codigo, turma=None):
+        """
+        Chaves dos horários da disciplina: o próprio código ou, se tiver
+        turmas, as chaves das turmas (só a da turma indicada, se existir).
+        Lista vazia se a disciplina não existir.
+        """
+        self.verificar_alteracoes()
+        turmas = self.instantaneo.turmas_por_codigo.get(codigo)
+        if turmas:
+            return [turmas[turma]] if turma in turmas else list(turmas.values())
+        return [codigo] if codigo in self.instantaneo.horarios_por_codigo else []
+
+    def buscar_horario(self, codigo):
+        """
+        Horário compilado da disciplina ou turma (chave de chaves_horario):
+        tuplo ordenado de (dia, inicio, fim) em minutos
+        """
+        self.verificar_alteracoes()
+        return self.instantaneo.horarios_por_codigo.get(codigo)
+
+    def buscar_mascara(self, codigo):
+        """Horário semanal da disciplina ou turma como máscara de bits (ver horario.mascara_horario)"""
+        self.verificar_alteracoes()
+        return self.instantaneo.mascaras_por_codigo.get(codigo)
+
+    def colidem(self, codigo1, codigo2):
+        """
+        Indica se duas disciplinas ou turmas (chaves de chaves_horario) têm aulas
+        sobrepostas: a interseção das máscaras é só um pré-filtro, confirmado
+        com os horários compilados
+        """
+        self.verificar_alteracoes()
+        instantaneo = self.instantaneo
+        mascaras = instantaneo.mascaras_por_codigo
+        if not mascaras.get(codigo1, 0) & mascaras.get(codigo2, 0):
+            return False
+        return sobrepostos(instantaneo.horarios_por_codigo[codigo1], instantaneo.horarios_por_codigo[codigo2])
+
+    def propinas_em_atraso(self, estudante_id):
+        """Indica se o estudante tem propinas em atraso (None se não existir)"""
+        self.verificar_alteracoes()
+        instantaneo = self.instantaneo
+        if estudante_id not in instantaneo.estudantes_por_id:
+            return None
+        return instantaneo.indice_dividas.em_atraso(estudante_id)
+
+    def propinas_em_atraso_lote(self, estudante_ids):
+        """
+        propinas_em_atraso de vários estudantes com uma só pesquisa no índice:
+        lista de True, False ou None (estudante não existe), pela ordem dada
+        """
+        self.verificar_alteracoes()
+        instantaneo = self.instantaneo
+        estudante_ids = list(estudante_ids)
+        em_atraso = instantaneo.indice_dividas.em_atraso_lote(estudante_ids).tolist()
+        return [
+            atraso if estudante_id in instantaneo.estudantes_por_id else None
+            for estudante_id, atraso in zip(estudante_ids, em_atraso)
+        ]
+
+    def buscar_estatuto(self, tipo):
+        """Busca estatuto por tipo"""
+        self.verificar_alteracoes()
+        return self.instantaneo.estatutos_por_tipo.get(tipo)
+
+
+def obter_repositorio(diretorio=None):
+    """
+    Devolve o repositório partilhado do diretório de dados, carregando-o na
+    primeira chamada. Todos os agentes do processo usam a mesma cópia dos dados.
+    As alterações são gravadas na base de dados indicada em ASM_BD
+    (por omissão, secretaria.db no diretório de dados).
+    """
+    diretorio = os.path.abspath(diretorio or os.environ.get("ASM_DADOS") or DIRETORIO_DADOS)
+    repositorio = _repositorios.get(diretorio)
+    if repositorio is None:
+        repositorio = RepositorioDados(diretorio)
+        repositorio.carregar()
+        repositorio.armazenamento = ArmazenamentoSQLite(
+            os.environ.get("ASM_BD") or os.path.join(diretorio, "secretaria.db")
+        )
+        _repositorios[diretorio] = repositorio
+    return repositorio
@@ -0,0 +1,91 @@
+"""
+Reservas de Vagas - Registo de lugares reservados pelo Agente Académico
+Uma inscrição aprovada reserva um lugar na disciplina até ser confirmada
+(gravada) ou libertada. As reservas expiram sozinhas se o pedido não
+chegar ao fim, para que os lugares não fiquem presos.
+"""
+
+import heapq
+import time
+
+
+class RegistoVagas:
+    """
+    Lugares reservados por disciplina, com reservar, confirmar e libertar.
+    
+    As operações são síncronas: no ciclo asyncio do agente nenhuma outra
+    operação se intercala a meio de uma delas, pelo que verificar as vagas
+    e reservar o lugar acontece de forma atómica. O número de reservas de
+    cada disciplina é mantido num contador e as expirações numa heap, pelo
+    que cada operação custa O(log n), mesmo com milhares de pedidos para
+    a mesma disciplina.
+    """
+    
+    def __init__(self, validade=30.0, relogio=time.monotonic):
+        # Segundos que uma reserva dura sem ser confirmada
+        self.validade = validade
+        self.relogio = relogio
+        # (estudante_id, disciplina) -> instante em que a reserva expira
+        self.reservas = {}
+        # disciplina -> número de reservas ativas
+        self.reservadas = {}
+        # Heap de (expira, (estudante_id, disciplina)); pode conter entradas antigas
+        self.expiracoes = []
+    
+    def expirar(self):
+        """Remove as reservas cujo prazo já passou"""
+        agora = self.relogio()
+        while self.expiracoes and self.expiracoes[0][0] <= agora:
+            expira, chave = heapq.heappop(self.expiracoes)
+            # Entradas de reservas renovadas, confirmadas ou libertadas são ignoradas
+            if self.reservas.get(chave) == expira:
+                self.remover(chave)
+    
+    def remover(self, chave):
+        if self.reservas.pop(chave, None) is None:
+            return False
+        self.reservadas[chave[1]] -= 1
+        return True
+    
+    def disponiveis(self, disciplina, vagas, estudante_id=None):
+        """
+        Lugares livres da disciplina descontadas as reservas, sendo vagas os
+        lugares ainda não ocupados. A reserva do próprio estudante conta como livre.
+        """
+        self.expirar()
+        livres = vagas - self.reservadas.get(disciplina, 0)
+        if (estudante_id, disciplina) in self.reservas:
+            livres += 1
+        return livres
+    
+    def reservar(self, estudante_id, disciplina, vagas):
+        """
+        Reserva um lugar se houver vagas livres; devolve False se não houver.
+        Se o estudante já tiver a reserva, o prazo é renovado.
+        """
+        if self.disponiveis(disciplina, vagas, estudante_id) <= 0:
+            return False
+        
+        chave = (estudante_id, disciplina)
+        if chave not in self.reservas:
+            self.reservadas[disciplina] = self.reservadas.get(disciplina, 0) + 1
+        expira = self.relogio() + self.validade
+        self.reservas[chave] = expira
+        heapq.heappush(self.expiracoes, (expira, chave))
+        return True
+    
+    def confirmar(self, estudante_id, disciplina, vagas):
+        """
+        Converte a reserva num lugar ocupado; quem confirma tem de registar a
+        ocupação antes de ceder o controlo. Sem reserva válida (por exemplo,
+        expirada), ocupa um lugar livre se ainda houver. Devolve True se ficou com o lugar.
+        """
+        self.expirar()
+        if self.remover((estudante_id, disciplina)):
+            return True
+        return self.disponiveis(disciplina, vagas) > 0
+    
+    def libertar(self, estudante_id, disciplina):
+        """Liberta a reserva; devolve False se não existia"""
+        self.expirar()
+        return self.remover((estudante_id, disciplina))
@@ -0,0 +1,102 @@
+"""
+Solucionador de Horários - Maior conjunto de disciplinas sem conflitos
+Dada uma lista de disciplinas desejadas (cada uma com alternativas
+opcionais), procura os horários sem conflitos com mais disciplinas.
+A pesquisa é feita em profundidade sobre a matriz de conflitos, com os
+conflitos acumulados num único inteiro de bits e cortes pelo limite
+superior do número de disciplinas que ainda é possível acrescentar.
+"""
+
+import bisect
+
+# Número máximo de nós visitados por pesquisa; acima disto devolve o melhor encontrado
+LIMITE_NOS = 200000
+
+
+class Solucao:
+    """Um horário encontrado: as escolhas por item e a chave de ordenação"""
+    
+    __slots__ = ("escolhas", "chave")
+    
+    def __init__(self, escolhas, n_alternativas):
+        # escolhas[k]: índice da alternativa escolhida para o item k, ou None
+        self.escolhas = escolhas
+        # Mais disciplinas primeiro; depois os itens e alternativas mais cedo na lista
+        self.chave = (
+            -sum(1 for e in escolhas if e is not None),
+            tuple(n_alternativas[k] if e is None else e for k, e in enumerate(escolhas))
+        )
+    
+    def __lt__(self, outra):
+        return self.chave < outra.chave
+
+
+def resolver_horario(matriz, itens, bloqueadas=0, max_horarios=5, limite_nos=LIMITE_NOS):
+    """
+    Procura os horários sem conflitos com mais itens da lista.
+    
+    itens: lista de itens; cada item é uma lista de códigos alternativos
+    (basta um deles). bloqueadas: disciplinas (em bits da matriz) que não
+    podem ser escolhidas, por exemplo as que colidem com as já inscritas.
+    
+    Devolve (horarios, completo): os até max_horarios melhores horários
+    maximais (a que não se pode juntar mais nenhum item), cada um como
+    lista de (item, código) ordenada pelo item, e se a pesquisa
+    terminou sem atingir o limite de nós. Os horários vêm ordenados por
+    número de disciplinas e, em caso de empate, pela ordem de preferência
+    da lista (itens e alternativas que aparecem primeiro).
+    """
+    # Bits e linhas da matriz de cada alternativa, já sem as bloqueadas
+    opcoes = []
+    for alternativas in itens:
+        opcoes.append([
+            (j, 1 << matriz.indices[codigo], matriz.linha(codigo))
+            for j, codigo in enumerate(alternativas)
+            if codigo in matriz.indices and not bloqueadas >> matriz.indices[codigo] & 1
+        ])
+    # Todas as alternativas de cada item num só inteiro, para o limite superior
+    bits_itens = [sum(bit for _, bit, _ in opcoes_item) for opcoes_item in opcoes]
+    n_alternativas = [len(alternativas) for alternativas in itens]
+    n = len(itens)
+    
+    melhores = []
+    escolhas = [None] * n
+    nos = 0
+    
+    def possiveis(k, bloqueio):
+        """Limite superior: itens a partir de k com alguma alternativa ainda livre"""
+        return sum(1 for bits_item in bits_itens[k:] if bits_item & ~bloqueio)
+    
+    def pesquisar(k, escolhidas, bloqueio):
+        nonlocal nos
+        nos += 1
+        if nos > limite_nos:
+            return False
+        
+        # A pesquisa visita os horários pela ordem de preferência, pelo que
+        # um ramo que não ultrapasse o pior dos melhores não os pode melhorar
+        if len(melhores) == max_horarios and escolhidas + possiveis(k, bloqueio) <= -melhores[-1].chave[0]:
+            return True
+        
+        if k == n:
+            # Só contam horários a que não se pode juntar mais nenhum item
+            if all(e is not None or not bits_itens[i] & ~bloqueio for i, e in enumerate(escolhas)):
+                bisect.insort(melhores, Solucao(list(escolhas), n_alternativas))
+                del melhores[max_horarios:]
+            return True
+        
+        for j, bit, linha in opcoes[k]:
+            if not bloqueio & bit:
+                escolhas[k] = j
+                # A própria disciplina também fica bloqueada (pode surgir noutro item)
+                if not pesquisar(k + 1, escolhidas + 1, bloqueio | linha | bit):
+                    return False
+        escolhas[k] = None
+        return pesquisar(k + 1, escolhidas, bloqueio)
+    
+    completo = pesquisar(0, 0, 0)
+    horarios = [
+        [(k, itens[k][e]) for k, e in enumerate(solucao.escolhas) if e is not None]
+        for solucao in melhores
+    ]
+    return horarios, completo
@@ -0,0 +1,36 @@
+"""
+Turmas - Disciplinas com várias turmas em paralelo
+Uma disciplina pode ter uma lista de turmas ("turmas"), cada uma com o seu
+horário e as suas vagas; as vagas da disciplina são então a soma das vagas
+das turmas. Nos horários cada turma conta como uma unidade própria, com a
+chave "CODIGO/TURMA"; as disciplinas sem turmas usam o próprio código.
+"""
+
+SEPARADOR = "/"
+
+
+def chave_turma(codigo, turma):
+    """Chave do horário de uma turma (por exemplo, "ASM101/T2")"""
+    return f"{codigo}{SEPARADOR}{turma}"
+
+
+def separar_chave(chave):
+    """Devolve (codigo, turma) de uma chave de horário; turma é None se a disciplina não tiver turmas"""
+    codigo, _, turma = chave.partition(SEPARADOR)
+    return codigo, turma or None
+
+
+def escolher_turma(curso, candidatas=None):
+    """
+    Turma menos ocupada (com mais lugares livres) do curso, de entre as
+    candidatas (por omissão, todas); em caso de empate, a primeira da lista.
+    O curso deve vir com as vagas ocupadas já descontadas em cada turma.
+    Devolve None se nenhuma candidata tiver lugares livres.
+    """
+    melhor = None
+    for turma in curso.get("turmas", []):
+        if candidatas is not None and turma.get("turma") not in candidatas:
+            continue
+        if turma.get("vagas", 0) > 0 and (melhor is None or turma["vagas"] > melhor["vagas"]):
+            melhor = turma
+    return melhor.get("turma") if melhor else None
@@ -0,0 +1,244 @@
+"""
+Gerador de Dados Sintéticos - Secretaria Universitária Virtual
+
+Gera cursos.json, estudantes.json e estatutos.json com a dimensão de uma
+universidade real (por exemplo, 50 000 estudantes e 2 000 disciplinas),
+para testar e medir os agentes à escala. Com a mesma semente os ficheiros
+gerados são idênticos, o que torna os testes de desempenho comparáveis.
+
+Uso:
+    python gerar_dados.py --estudantes 50000 --cursos 2000 --semente 42 --destino data_sintetico
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+
+# Áreas científicas: sigla usada no código das disciplinas e nome do curso associado
+AREAS = [
+    ("INF", "Engenharia Informática"), ("MAT", "Matemática Aplicada"),
+    ("FIS", "Engenharia Física"), ("GES", "Gestão"),
+    ("ECO", "Economia"), ("QUI", "Química"),
+    ("BIO", "Biologia"), ("ELE", "Engenharia Eletrotécnica"),
+    ("CIV", "Engenharia Civil"), ("MEC", "Engenharia Mecânica"),
+    ("BMD", "Engenharia Biomédica"), ("EST", "Estatística"),
+    ("DIR", "Direito"), ("PSI", "Psicologia"),
+    ("ARQ", "Arquitetura"), ("COM", "Ciências da Comunicação"),
+    ("HIS", "História"), ("LIN", "Línguas Aplicadas"),
+    ("AMB", "Engenharia do Ambiente"), ("MAR", "Ciências do Mar")
+]
+
+TEMAS = [
+    "Fundamentos de", "Introdução a", "Tópicos Avançados em", "Laboratório de",
+    "Projeto de", "Métodos de", "Análise de", "Sistemas de", "Modelação em",
+    "Seminário de"
+]
+
+DIAS = ["Segunda", "Terça", "Quarta", "Quinta", "Sexta", "Sábado"]
+
+NIVEIS = 5
+
+
+def formatar_horario(slots):
+    """Converte [(dia, inicio, fim)] em minutos para o formato "Segunda 14:00-16:00, ..." """
+    partes = []
+    for dia, inicio, fim in slots:
+        partes.append(f"{DIAS[dia - 1]} {inicio // 60}:{inicio % 60:02d}-{fim // 60}:{fim % 60:02d}")
+    return ", ".join(partes)
+
+
+def gerar_horario(aleatorio):
+    """Sorteia 1 a 3 aulas semanais em dias diferentes, entre as 8:00 e as 21:00"""
+    n_aulas = aleatorio.choices([1, 2, 3], weights=[15, 70, 15])[0]
+    # Sábado só ocasionalmente
+    dias = aleatorio.sample(range(1, 6), n_aulas) if aleatorio.random() > 0.02 else [6]
+    slots = []
+    for dia in sorted(dias):
+        duracao = aleatorio.choice([90, 120, 120, 120, 180])
+        inicio = aleatorio.randrange(8 * 60, 21 * 60 - duracao + 1, 30)
+        slots.append((dia, inicio, inicio + duracao))
+    return slots
+
+
+def gerar_cursos(n_cursos, aleatorio):
+    """
+    Gera n_cursos disciplinas repartidas por áreas e níveis (1.º a 5.º ano).
+    Os pré-requisitos de uma disciplina são sempre disciplinas da mesma área
+    de nível inferior, o que forma cadeias de precedência sem ciclos.
+    Devolve os cursos, os horários (em minutos) de cada código, os códigos
+    por (área, nível) e as áreas usadas.
+    """
+    n_areas = min(len(AREAS), max(1, n_cursos // 100))
+    areas = AREAS[:n_areas]
+    cursos = []
+    horarios = {}
+    por_area_nivel = {}
+    
+    for i in range(n_cursos):
+        sigla, nome_area = areas[i % n_areas]
+        # Mais disciplinas nos primeiros anos
+        nivel = aleatorio.choices(range(1, NIVEIS + 1), weights=[30, 25, 20, 15, 10])[0]
+        seq = len(por_area_nivel.setdefault((sigla, nivel), [])) + 1
+        codigo = f"{sigla}{nivel}{seq:03d}"
+        
+        prerequisitos = []
+        if nivel > 1 and aleatorio.random() < 0.7:
+            anteriores = [c for n in range(1, nivel) for c in por_area_nivel.get((sigla, n), [])]
+            if anteriores:
+                k = min(len(anteriores), aleatorio.choice([1, 1, 2, 2, 3]))
+                prerequisitos = aleatorio.sample(anteriores, k)
+        
+        slots = gerar_horario(aleatorio)
+        horarios[codigo] = slots
+        cursos.append({
+            "codigo": codigo,
+            "nome": f"{aleatorio.choice(TEMAS)} {nome_area} {nivel}.{seq}",
+            "creditos": aleatorio.choice([3, 4, 5, 6, 6, 6, 7, 8]),
+            "horario": formatar_horario(slots),
+            "vagas": aleatorio.randint(60, 250) if nivel == 1 else aleatorio.randint(15, 80),
+            "prerequisitos": prerequisitos
+        })
+        por_area_nivel[(sigla, nivel)].append(codigo)
+    
+    return cursos, horarios, por_area_nivel, areas
+
+
+def sobrepoe(slots1, slots2):
+    """Indica se dois horários (listas de (dia, inicio, fim)) se sobrepõem"""
+    return any(
+        d1 == d2 and i1 < f2 and i2 < f1
+        for d1, i1, f1 in slots1
+        for d2, i2, f2 in slots2
+    )
+
+
+def gerar_estudantes(n_estudantes, cursos, horarios, por_area_nivel, areas, aleatorio,
+                     taxa_atraso=0.07, taxa_estatuto=0.08):
+    """
+    Gera n_estudantes estudantes do 1.º ao 5.º ano. O histórico respeita os
+    pré-requisitos, e as inscrições atuais não têm conflitos de horário nem
+    excedem 30 créditos.
+    """
+    por_codigo = {c["codigo"]: c for c in cursos}
+    ano_atual = 2025
+    por_ano = {}
+    largura = max(4, len(str(n_estudantes)))
+    tipos_estatuto = ["estudante-trabalhador", "atleta", "dirigente-associativo", "necessidades-especiais"]
+    
+    estudantes = []
+    for _ in range(n_estudantes):
+        ano = aleatorio.choices(range(1, NIVEIS + 1), weights=[26, 22, 20, 17, 15])[0]
+        sigla, nome_curso = aleatorio.choice(areas)
+        ano_entrada = ano_atual - ano + 1
+        seq = por_ano.get(ano_entrada, 0) + 1
+        por_ano[ano_entrada] = seq
+        
+        # Histórico: disciplinas dos anos anteriores cujos pré-requisitos já estavam feitos
+        completas = []
+        feitas = set()
+        for nivel in range(1, ano):
+            candidatas = por_area_nivel.get((sigla, nivel), [])
+            candidatas = aleatorio.sample(candidatas, min(len(candidatas), aleatorio.randint(6, 10)))
+            for codigo in candidatas:
+                if aleatorio.random() < 0.85 and all(p in feitas for p in por_codigo[codigo]["prerequisitos"]):
+                    completas.append(codigo)
+                    feitas.add(codigo)
+        
+        # Inscrições do semestre: até 6 disciplinas compatíveis entre si
+        inscritas = []
+        creditos = 0
+        candidatas = [
+            c for n in range(1, ano + 1) for c in por_area_nivel.get((sigla, n), [])
+            if c not in feitas
+        ]
+        aleatorio.shuffle(candidatas)
+        for codigo in candidatas:
+            if len(inscritas) >= 6:
+                break
+            curso = por_codigo[codigo]
+            if not all(p in feitas for p in curso["prerequisitos"]):
+                continue
+            if creditos + curso["creditos"] > 30:
+                continue
+            if any(sobrepoe(horarios[codigo], horarios[i]) for i in inscritas):
+                continue
+            inscritas.append(codigo)
+            creditos += curso["creditos"]
+        
+        estatuto = None
+        if aleatorio.random() < taxa_estatuto:
+            estatuto = aleatorio.choices(tipos_estatuto, weights=[50, 25, 15, 10])[0]
+        
+        estudantes.append({
+            "id": f"{ano_entrada}{seq:0{largura}d}",
+            "nome": f"Estudante {ano_entrada}-{seq}",
+            "curso": nome_curso,
+            "ano": ano,
+            "disciplinas_completas": completas,
+            "disciplinas_inscritas": inscritas,
+            "estatuto": estatuto,
+            "propinas_em_atraso": aleatorio.random() < taxa_atraso
+        })
+    
+    return estudantes
+
+
+def carregar_estatutos():
+    """Os tipos de estatuto são os mesmos do conjunto de dados de demonstração"""
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(base_dir, 'data', 'estatutos.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def gerar_dados(destino, n_estudantes=50000, n_cursos=2000, semente=42,
+                taxa_atraso=0.07, taxa_estatuto=0.08):
+    """Gera os três ficheiros JSON no diretório destino"""
+    aleatorio = random.Random(semente)
+    cursos, horarios, por_area_nivel, areas = gerar_cursos(n_cursos, aleatorio)
+    estudantes = gerar_estudantes(n_estudantes, cursos, horarios, por_area_nivel, areas,
+                                  aleatorio, taxa_atraso, taxa_estatuto)
+    
+    os.makedirs(destino, exist_ok=True)
+    ficheiros = {
+        "cursos.json": {"cursos": cursos},
+        "estudantes.json": {"estudantes": estudantes},
+        "estatutos.json": carregar_estatutos()
+    }
+    for nome, conteudo in ficheiros.items():
+        with open(os.path.join(destino, nome), 'w', encoding='utf-8') as f:
+            json.dump(conteudo, f, ensure_ascii=False, indent=1)
+    
+    return cursos, estudantes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos da universidade")
+    parser.add_argument("--estudantes", type=int, default=50000, help="número de estudantes (default: 50000)")
+    parser.add_argument("--cursos", type=int, default=2000, help="número de disciplinas (default: 2000)")
+    parser.add_argument("--semente", type=int, default=42, help="semente do gerador (default: 42)")
+    parser.add_argument("--atraso", type=float, default=0.07,
+                        help="fração de estudantes com propinas em atraso (default: 0.07)")
+    parser.add_argument("--estatuto", type=float, default=0.08,
+                        help="fração de estudantes com estatuto especial (default: 0.08)")
+    parser.add_argument("--destino", default="data_sintetico",
+                        help="diretório onde escrever os ficheiros (default: data_sintetico)")
+    args = parser.parse_args()
+    
+    print(f"🏗️  A gerar {args.estudantes} estudantes e {args.cursos} disciplinas (semente {args.semente})...")
+    inicio = time.perf_counter()
+    cursos, estudantes = gerar_dados(args.destino, args.estudantes, args.cursos, args.semente,
+                                     args.atraso, args.estatuto)
+    
+    com_prerequisitos = sum(1 for c in cursos if c["prerequisitos"])
+    inscricoes = sum(len(e["disciplinas_inscritas"]) for e in estudantes)
+    em_atraso = sum(1 for e in estudantes if e["propinas_em_atraso"])
+    print(f"✅ Dados escritos em {args.destino}/ ({time.perf_counter() - inicio:.1f} s)")
+    print(f"   • {com_prerequisitos} disciplinas com pré-requisitos")
+    print(f"   • {inscricoes} inscrições ({inscricoes / max(1, len(estudantes)):.1f} por estudante)")
+    print(f"   • {em_atraso} estudantes com propinas em atraso")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,21 @@ Sistema de Agentes - Secretaria Universitária Virtual
 Ponto de entrada principal do sistema
 """
 
+import argparse
 import asyncio
+import contextlib
 import json
+import math
+import os
+import random
+import tempfile
+from collections import defaultdict
 from spade.message import Message
+from agentes.admissao import AdmissaoInscricoes
+from agentes.barramento import BarramentoLocal
+from agentes.repositorio import obter_repositorio
 from agentes.agente_assistente import AgenteAssistente
-from agentes.agente_academico import AgenteAcademico
+from agentes.agente_academico import AgenteAcademico, AcademicoBehaviour
 from agentes.agente_horarios import AgenteHorarios
 from agentes.agente_regulamentos import AgenteRegulamentos
 from agentes.agente_financeiro import AgenteFinanceiro
@@ -21,11 +31,21 @@ init()
 class SimuladorEstudante:
     """Simula um estudante fazendo pedidos ao sistema"""
     
-    def __init__(self, assistente_jid):
+    def __init__(self, assistente_jid, barramento=None, jid="estudante@localhost"):
         self.assistente_jid = assistente_jid
+        self.barramento = barramento
+        self.jid = jid
+        self.contador = 0
+        # Pedidos em curso, indexados pelo thread, à espera de resposta
+        self.pendentes = {}
+        self.leitor = None
     
     async def fazer_pedido(self, tipo, estudante_id, **kwargs):
-        """Envia um pedido ao agente assistente"""
+        """
+        Envia um pedido ao agente assistente.
+        Com barramento local devolve a resposta do assistente;
+        sem barramento apenas mostra e devolve o pedido.
+        """
         pedido = {
             "tipo": tipo,
             "estudante_id": estudante_id,
@@ -40,11 +60,287 @@ class SimuladorEstudante:
             print(f"{key}: {value}")
         print(f"{Fore.CYAN}{'='*70}{Style.RESET_ALL}\n")
         
+        if not self.barramento:
+            return pedido
+        
+        resposta = await self.enviar(pedido)
+        print(f"{Fore.CYAN}📨 Resposta: {json.dumps(resposta, ensure_ascii=False)}{Style.RESET_ALL}\n")
+        return resposta
+    
+    async def enviar(self, pedido, timeout=10):
+        """Envia o pedido pelo barramento local e aguarda a resposta no mesmo thread"""
+        if self.leitor is None:
+            self.leitor = asyncio.create_task(self.receber_respostas())
+        
+        self.contador += 1
+        thread = f"{self.jid}#{self.contador}"
+        futuro = asyncio.get_running_loop().create_future()
+        self.pendentes[thread] = futuro
+        
+        msg = Message(to=self.assistente_jid, sender=self.jid, thread=thread)
+        msg.set_metadata("performative", "request")
+        msg.body = json.dumps(pedido)
+        
+        try:
+            await self.barramento.enviar(msg)
+            resposta = await asyncio.wait_for(futuro, timeout)
+            return json.loads(resposta.body)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self.pendentes.pop(thread, None)
+    
+    def parar(self):
+        """Deixa de receber respostas do barramento"""
+        if self.leitor:
+            self.leitor.cancel()
+            self.leitor = None
+    
+    async def receber_respostas(self):
+        """Entrega cada resposta do assistente ao pedido com o mesmo thread"""
+        caixa = self.barramento.caixa_correio(self.jid)
+        while True:
+            resposta = await caixa.get()
+            futuro = self.pendentes.pop(resposta.thread, None)
+            if futuro and not futuro.done():
+                futuro.set_result(resposta)
+
+
+class RelatorioCarga:
+    """Regista as latências de um teste de carga e calcula débito e percentis por tipo de pedido"""
+    
+    def __init__(self):
+        self.latencias = defaultdict(list)
+        self.sem_resposta = defaultdict(int)
+        self.inicio = None
+        self.fim = None
+    
+    def registar(self, tipo, latencia, respondido=True):
+        """Regista a latência (em segundos) de um pedido"""
+        if respondido:
+            self.latencias[tipo].append(latencia)
+        else:
+            self.sem_resposta[tipo] += 1
+    
+    @staticmethod
+    def percentil(valores_ordenados, p):
+        """Percentil p (0-100) pelo método nearest-rank"""
+        if not valores_ordenados:
+            return 0.0
+        k = max(0, math.ceil(p / 100 * len(valores_ordenados)) - 1)
+        return valores_ordenados[k]
+    
+    def resumo(self):
+        """Devolve, por tipo de pedido e no total, o débito e os percentis de latência (ms)"""
+        duracao = max((self.fim or 0) - (self.inicio or 0), 1e-9)
+        grupos = dict(self.latencias)
+        grupos["total"] = [l for valores in self.latencias.values() for l in valores]
+        
+        resumo = {}
+        for tipo, valores in grupos.items():
+            valores = sorted(valores)
+            sem_resposta = (sum(self.sem_resposta.values()) if tipo == "total"
+                            else self.sem_resposta.get(tipo, 0))
+            resumo[tipo] = {
+                "pedidos": len(valores),
+                "sem_resposta": sem_resposta,
+                "debito": len(valores) / duracao,
+                "p50": self.percentil(valores, 50) * 1000,
+                "p95": self.percentil(valores, 95) * 1000,
+                "p99": self.percentil(valores, 99) * 1000
+            }
+        return resumo
+    
+    def imprimir(self):
+        """Mostra o resumo em forma de tabela"""
+        print(f"\n{Fore.GREEN}{'='*70}")
+        print(f"📊 RESULTADOS DO TESTE DE CARGA ({(self.fim - self.inicio):.2f} s)")
+        print(f"{'='*70}{Style.RESET_ALL}")
+        print(f"{'Tipo':<18}{'Pedidos':>9}{'Sem resp.':>10}{'Pedidos/s':>11}{'p50 ms':>8}{'p95 ms':>8}{'p99 ms':>8}")
+        for tipo, linha in self.resumo().items():
+            print(f"{tipo:<18}{linha['pedidos']:>9}{linha['sem_resposta']:>10}{linha['debito']:>11.1f}"
+                  f"{linha['p50']:>8.2f}{linha['p95']:>8.2f}{linha['p99']:>8.2f}")
+
+
+class GeradorCarga:
+    """
+    Gera carga sobre o sistema com vários estudantes simulados em simultâneo.
+    Em ciclo aberto os pedidos chegam a uma taxa fixa (pedidos/s), sem esperar
+    pelas respostas; em ciclo fechado cada estudante envia o pedido seguinte
+    assim que recebe a resposta ao anterior.
+    """
+    
+    MISTURA_PADRAO = {
+        "inscricao": 0.5,
+        "consulta_horario": 0.3,
+        "equivalencia": 0.1,
+        "estatuto": 0.1
+    }
+    
+    def __init__(self, assistente_jid, barramento, estudantes, cursos, estatutos,
+                 mistura=None, semente=None):
+        self.assistente_jid = assistente_jid
+        self.barramento = barramento
+        self.estudantes = estudantes
+        self.cursos = cursos
+        self.estatutos = estatutos
+        self.mistura = mistura or self.MISTURA_PADRAO
+        self.aleatorio = random.Random(semente)
+    
+    def gerar_pedido(self):
+        """Sorteia um pedido de acordo com a mistura de tipos configurada"""
+        tipo = self.aleatorio.choices(list(self.mistura), weights=list(self.mistura.values()))[0]
+        estudante = self.aleatorio.choice(self.estudantes)
+        pedido = {"tipo": tipo, "estudante_id": estudante["id"]}
+        
+        if tipo == "inscricao":
+            pedido["disciplina"] = self.aleatorio.choice(self.cursos)["codigo"]
+        elif tipo == "equivalencia":
+            completas = estudante.get("disciplinas_completas") or [c["codigo"] for c in self.cursos]
+            pedido["disciplina_origem"] = self.aleatorio.choice(completas)
+            pedido["disciplina_destino"] = self.aleatorio.choice(self.cursos)["codigo"]
+        elif tipo == "propor_horario":
+            pedido["disciplinas"] = [c["codigo"] for c in self.aleatorio.sample(self.cursos, min(8, len(self.cursos)))]
+        elif tipo == "estatuto":
+            estatuto = self.aleatorio.choice(self.estatutos)
+            pedido["tipo_estatuto"] = estatuto["tipo"]
+            pedido["documentos"] = estatuto.get("requisitos", [])
+        
         return pedido
+    
+    async def executar(self, total, estudantes=10, taxa=None, timeout=10):
+        """
+        Envia `total` pedidos a partir de `estudantes` estudantes simulados.
+        Com `taxa` (pedidos/s) usa ciclo aberto; sem taxa, ciclo fechado.
+        """
+        simuladores = [
+            SimuladorEstudante(self.assistente_jid, self.barramento, jid=f"estudante{i}@localhost")
+            for i in range(estudantes)
+        ]
+        relatorio = RelatorioCarga()
+        loop = asyncio.get_running_loop()
+        
+        async def medir(simulador, pedido):
+            inicio = loop.time()
+            resposta = await simulador.enviar(pedido, timeout)
+            relatorio.registar(pedido["tipo"], loop.time() - inicio, resposta is not None)
+        
+        relatorio.inicio = loop.time()
+        if taxa:
+            tarefas = []
+            for i in range(total):
+                # Chegadas a intervalos fixos, medidos a partir do início do teste
+                atraso = relatorio.inicio + i / taxa - loop.time()
+                if atraso > 0:
+                    await asyncio.sleep(atraso)
+                tarefas.append(asyncio.create_task(
+                    medir(simuladores[i % estudantes], self.gerar_pedido())
+                ))
+            await asyncio.gather(*tarefas)
+        else:
+            restantes = iter(range(total))
+            
+            async def estudante(simulador):
+                for _ in restantes:
+                    await medir(simulador, self.gerar_pedido())
+            
+            await asyncio.gather(*(estudante(s) for s in simuladores))
+        relatorio.fim = loop.time()
+        
+        for simulador in simuladores:
+            simulador.parar()
+        return relatorio
+
+
+async def executar_carga(total, estudantes=10, taxa=None, mistura=None,
+                         inscricao_paralela=False, semente=None, taxa_admissao=None, janelas=0.0):
+    """
+    Arranca os agentes no barramento local e corre um teste de carga. Com
+    taxa_admissao, as inscrições passam pela fila de admissão do Assistente
+    (no máximo taxa_admissao por segundo, janelas de escalão a janelas segundos)
+    """
+    repositorio = obter_repositorio()
+    
+    print(f"{Fore.BLUE}📦 A arrancar agentes no barramento local...{Style.RESET_ALL}")
+    modo = f"ciclo aberto a {taxa} pedidos/s" if taxa else "ciclo fechado"
+    print(f"   {total} pedidos, {estudantes} estudantes em simultâneo, {modo}")
+    admissao = None
+    if taxa_admissao:
+        # Um pedido não espera pela admissão mais do que o estudante espera pela resposta
+        admissao = AdmissaoInscricoes(taxa_admissao, intervalo_janelas=janelas, espera_maxima=10)
+        print(f"   Admissão de inscrições: {taxa_admissao} por segundo, janelas de {janelas} s por escalão")
+    
+    barramento = BarramentoLocal()
+    # Os agentes escrevem uma linha por mensagem; durante a carga esse output é descartado
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        for agente in (
+            AgenteFinanceiro("financeiro@localhost", "password"),
+            AgenteRegulamentos("regulamentos@localhost", "password"),
+            AgenteHorarios("horarios@localhost", "password"),
+            AgenteAcademico("academico@localhost", "password"),
+            AgenteAssistente("assistente@localhost", "password", "academico@localhost",
+                             "horarios@localhost", "regulamentos@localhost", "financeiro@localhost",
+                             inscricao_paralela=inscricao_paralela, admissao=admissao)
+        ):
+            barramento.registar(agente)
+        await barramento.iniciar()
+        
+        gerador = GeradorCarga("assistente@localhost", barramento, repositorio.estudantes,
+                               repositorio.cursos, repositorio.estatutos, mistura, semente)
+        try:
+            relatorio = await gerador.executar(total, estudantes, taxa)
+        finally:
+            await barramento.parar()
+    
+    relatorio.imprimir()
+    return relatorio
 
 
-async def main():
-    """Função principal que inicia e coordena o sistema"""
+async def executar_elegibilidade(saida=None):
+    """
+    Modo em lote do Agente Académico: calcula a elegibilidade de todos os
+    estudantes em todas as disciplinas e, com saida, grava as opções de cada
+    estudante num ficheiro JSON ({estudante_id: [disciplinas]})
+    """
+    academico = AcademicoBehaviour()
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        await academico.carregar_dados()
+    
+    inicio = time.perf_counter()
+    matriz = academico.calcular_elegibilidade()
+    duracao = time.perf_counter() - inicio
+    
+    n_estudantes, n_cursos = matriz.elegivel.shape
+    por_estudante = matriz.elegivel.sum(axis=1)
+    print(f"{Fore.GREEN}🎓 Elegibilidade de {n_estudantes} estudantes × {n_cursos} disciplinas "
+          f"calculada em {duracao:.2f} s{Style.RESET_ALL}")
+    print(f"   • {int(por_estudante.sum())} pares elegíveis "
+          f"({por_estudante.mean() if n_estudantes else 0:.1f} disciplinas por estudante)")
+    print(f"   • {int((por_estudante == 0).sum())} estudantes sem nenhuma disciplina elegível")
+    
+    if saida:
+        with open(saida, 'w', encoding='utf-8') as f:
+            json.dump({estudante_id: matriz.disciplinas(estudante_id) for estudante_id in matriz.linhas},
+                      f, ensure_ascii=False)
+        print(f"   • Opções de cada estudante gravadas em {saida}")
+    return matriz
+
+
+def ler_mistura(texto):
+    """Converte 'inscricao=5,consulta_horario=3' num dicionário de pesos"""
+    mistura = {}
+    for parte in texto.split(","):
+        tipo, peso = parte.split("=")
+        mistura[tipo.strip()] = float(peso)
+    return mistura
+
+
+async def main(local=False):
+    """
+    Função principal que inicia e coordena o sistema.
+    Com local=True os agentes trocam mensagens pelo barramento em memória,
+    sem servidor XMPP, e os cenários são executados de facto.
+    """
     
     print(f"\n{Fore.GREEN}{'='*70}")
     print("🏛️  SISTEMA DE SECRETARIA UNIVERSITÁRIA VIRTUAL")
@@ -62,9 +358,13 @@ async def main():
     financeiro_jid = "financeiro@localhost"
     password = "password"
     
-    print(f"{Fore.YELLOW}⚠️  MODO DEMONSTRAÇÃO")
-    print(f"   Este sistema demonstra a arquitetura e lógica dos agentes.")
-    print(f"   Para execução completa, configure um servidor XMPP (ex: Prosody).{Style.RESET_ALL}\n")
+    if local:
+        print(f"{Fore.YELLOW}⚠️  MODO LOCAL")
+        print(f"   Os agentes comunicam por um barramento em memória, sem servidor XMPP.{Style.RESET_ALL}\n")
+    else:
+        print(f"{Fore.YELLOW}⚠️  MODO DEMONSTRAÇÃO")
+        print(f"   Este sistema demonstra a arquitetura e lógica dos agentes.")
+        print(f"   Para execução completa, configure um servidor XMPP (ex: Prosody).{Style.RESET_ALL}\n")
     
     # Criar agentes
     print(f"{Fore.BLUE}📦 Criando agentes...{Style.RESET_ALL}")
@@ -84,6 +384,14 @@ async def main():
     
     print(f"{Fore.GREEN}✅ Todos os agentes criados!{Style.RESET_ALL}\n")
     
+    barramento = None
+    if local:
+        barramento = BarramentoLocal()
+        for agente in (agente_financeiro, agente_regulamentos, agente_horarios,
+                       agente_academico, agente_assistente):
+            barramento.registar(agente)
+        await barramento.iniciar()
+    
     # Demonstrar a arquitetura do sistema
     print(f"{Fore.MAGENTA}{'='*70}")
     print("📋 ARQUITETURA DO SISTEMA")
@@ -120,7 +428,7 @@ async def main():
     print("🎬 CENÁRIOS DE DEMONSTRAÇÃO")
     print(f"{'='*70}{Style.RESET_ALL}\n")
     
-    simulador = SimuladorEstudante(assistente_jid)
+    simulador = SimuladorEstudante(assistente_jid, barramento)
     
     # Cenário 1: Inscrição bem-sucedida
     print(f"{Fore.GREEN}📝 CENÁRIO 1: Inscrição com sucesso{Style.RESET_ALL}")
@@ -206,6 +514,9 @@ async def main():
     print("   1. Agente Horários: Lista disciplinas inscritas")
     print(f"   2. Resultado: Horário completo do estudante{Style.RESET_ALL}\n")
     
+    if barramento:
+        await barramento.parar()
+    
     # Sumário final
     print(f"\n{Fore.GREEN}{'='*70}")
     print("✨ DEMONSTRAÇÃO CONCLUÍDA")
@@ -246,9 +557,56 @@ Para executar com servidor XMPP real:
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Secretaria Universitária Virtual")
+    parser.add_argument("--local", action="store_true",
+                        help="ligar os agentes por um barramento em memória, sem servidor XMPP")
+    parser.add_argument("--carga", type=int, metavar="N",
+                        help="executar um teste de carga com N pedidos no barramento local")
+    parser.add_argument("--estudantes", type=int, default=10,
+                        help="número de estudantes simulados em simultâneo (default: 10)")
+    parser.add_argument("--taxa", type=float,
+                        help="pedidos por segundo em ciclo aberto (sem taxa: ciclo fechado)")
+    parser.add_argument("--mistura", type=ler_mistura,
+                        help="pesos dos tipos de pedido, ex.: inscricao=5,consulta_horario=3")
+    parser.add_argument("--paralelo", action="store_true",
+                        help="verificações de inscrição em paralelo")
+    parser.add_argument("--semente", type=int, help="semente para os pedidos gerados")
+    parser.add_argument("--admissao", type=float, metavar="TAXA",
+                        help="admitir no máximo TAXA inscrições por segundo (fila de admissão)")
+    parser.add_argument("--janelas", type=float, default=0.0, metavar="SEGUNDOS",
+                        help="intervalo entre as janelas de inscrição de cada escalão (default: 0)")
+    parser.add_argument("--elegibilidade", nargs="?", const="", metavar="FICHEIRO",
+                        help="calcular em lote as disciplinas elegíveis de todos os estudantes "
+                             "(opcionalmente gravadas em FICHEIRO)")
+    parser.add_argument("--dados", help="diretório dos ficheiros JSON (ex.: data_sintetico)")
+    parser.add_argument("--bd", help="base de dados SQLite onde gravar inscrições e estatutos "
+                                     "(default: secretaria.db no diretório dos dados; na demonstração "
+                                     "e no teste de carga, uma base de dados temporária)")
+    args = parser.parse_args()
+    
+    if args.dados:
+        os.environ["ASM_DADOS"] = args.dados
+    temporario = None
+    if args.bd:
+        os.environ["ASM_BD"] = args.bd
+    elif (args.local or args.carga) and not os.environ.get("ASM_BD"):
+        # Sem --bd, a demonstração e o teste de carga começam sempre dos dados dos
+        # ficheiros: as inscrições ficam numa base de dados temporária, apagada no fim
+        temporario = tempfile.TemporaryDirectory(prefix="asm_")
+        os.environ["ASM_BD"] = os.path.join(temporario.name, "secretaria.db")
+    
     try:
-        asyncio.run(main())
+        if args.elegibilidade is not None:
+            asyncio.run(executar_elegibilidade(args.elegibilidade))
+        elif args.carga:
+            asyncio.run(executar_carga(args.carga, args.estudantes, args.taxa, args.mistura,
+                                       args.paralelo, args.semente, args.admissao, args.janelas))
+        else:
+            asyncio.run(main(local=args.local))
     except KeyboardInterrupt:
         print(f"\n{Fore.YELLOW}⚠️  Sistema interrompido pelo usuário{Style.RESET_ALL}")
     except Exception as e:
         print(f"\n{Fore.RED}❌ Erro: {e}{Style.RESET_ALL}")
+    finally:
+        if temporario:
+            temporario.cleanup()
@@ -2,7 +2,12 @@
 Teste simples para verificar o sistema
 """
 
+import atexit
 import json
+import os
+import shutil
+import tempfile
+from unittest import mock
 import asyncio
 
 
@@ -96,6 +101,1453 @@ def test_logic():
     return True
 
 
+def copiar_dados(cursos_extra=()):
+    """
+    Copia os dados de demonstração para um diretório temporário, com disciplinas
+    adicionais. A base de dados gravada pelos agentes (secretaria.db) fica nesse
+    diretório, apagado no fim dos testes.
+    """
+    destino = tempfile.mkdtemp(prefix="asm_teste_")
+    atexit.register(shutil.rmtree, destino, ignore_errors=True)
+    for nome in ("cursos", "estudantes", "estatutos", "equivalencias"):
+        with open(f'data/{nome}.json', 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+        if nome == "cursos":
+            dados["cursos"].extend(cursos_extra)
+        with open(os.path.join(destino, f'{nome}.json'), 'w', encoding='utf-8') as f:
+            json.dump(dados, f, ensure_ascii=False)
+    return destino
+
+
+def test_inscricao_lote():
+    """Testa a verificação de inscrições em lote (conflitos e limite de créditos)"""
+    print("\n🧪 Testando inscrição em lote...\n")
+    
+    from agentes.agente_academico import AcademicoBehaviour
+    from agentes.agente_horarios import HorariosBehaviour
+    
+    horarios = HorariosBehaviour()
+    asyncio.run(horarios.carregar_dados(copiar_dados()))
+    resposta = asyncio.run(horarios.verificar_conflito_lote({
+        "estudante_id": "20230001",
+        "disciplinas": ["IA201", "BD101", "ASM101", "POO202"]
+    }))
+    sem_conflito = {r["disciplina"]: r["sem_conflito"] for r in resposta["resultados"]}
+    print(f"   Conflitos no lote: {sem_conflito}")
+    # ASM101 colide com BD101 e POO202 com IA201, pedidas antes no mesmo lote
+    assert sem_conflito == {"IA201": True, "BD101": True, "ASM101": False, "POO202": False}
+    
+    academico = AcademicoBehaviour()
+    asyncio.run(academico.carregar_dados(copiar_dados(cursos_extra=[
+        {"codigo": codigo, "nome": codigo, "creditos": 6, "vagas": 10, "prerequisitos": []}
+        for codigo in ("X1", "X2")
+    ])))
+    armazenamento = academico.repositorio.armazenamento
+    for codigo in ("IA201", "POO202", "RC301"):
+        asyncio.run(armazenamento.inscrever("20230003", codigo))
+    resposta = asyncio.run(academico.verificar_inscricao_lote({
+        "estudante_id": "20230003",
+        "disciplinas": ["X1", "X2"]
+    }))
+    aprovado = {r["disciplina"]: r["aprovado"] for r in resposta["resultados"]}
+    print(f"   Limite de créditos no lote: {aprovado}")
+    # 18 créditos inscritos: X1 e X2 levam o total a 30, ainda dentro do limite
+    assert aprovado == {"X1": True, "X2": True}
+    # Com 24 créditos inscritos, X1 chega aos 30 e X2 já excede o limite
+    asyncio.run(armazenamento.inscrever("20230003", "ASM101"))
+    resposta = asyncio.run(academico.verificar_inscricao_lote({
+        "estudante_id": "20230003",
+        "disciplinas": ["X1", "X2"]
+    }))
+    assert [r["aprovado"] for r in resposta["resultados"]] == [True, False]
+    
+    return True
+
+
+def test_barramento_local():
+    """Testa a troca de mensagens entre os cinco agentes pelo barramento em memória"""
+    print("\n🧪 Testando barramento local...\n")
+    
+    from main import SimuladorEstudante
+    from agentes import (
+        BarramentoLocal,
+        AgenteAssistente,
+        AgenteAcademico,
+        AgenteHorarios,
+        AgenteRegulamentos,
+        AgenteFinanceiro
+    )
+    
+    async def executar():
+        barramento = BarramentoLocal()
+        for agente in (
+            AgenteFinanceiro("financeiro@localhost", "password"),
+            AgenteRegulamentos("regulamentos@localhost", "password"),
+            AgenteHorarios("horarios@localhost", "password"),
+            AgenteAcademico("academico@localhost", "password"),
+            AgenteAssistente("assistente@localhost", "password", "academico@localhost",
+                             "horarios@localhost", "regulamentos@localhost", "financeiro@localhost")
+        ):
+            barramento.registar(agente)
+        await barramento.iniciar()
+        
+        simulador = SimuladorEstudante("assistente@localhost", barramento)
+        try:
+            # Pedidos em simultâneo: cada resposta tem de chegar ao pedido certo
+            return await asyncio.gather(
+                simulador.enviar({"tipo": "inscricao", "estudante_id": "20230001", "disciplina": "IA201"}),
+                simulador.enviar({"tipo": "inscricao", "estudante_id": "20230002", "disciplina": "ASM101"}),
+                simulador.enviar({"tipo": "consulta_horario", "estudante_id": "20230001"})
+            )
+        finally:
+            await barramento.parar()
+    
+    # As inscrições aprovadas ficam gravadas: usa-se uma cópia dos dados
+    diretorio = copiar_dados()
+    with mock.patch.dict(os.environ, {"ASM_DADOS": diretorio}):
+        aprovada, recusada, horario = asyncio.run(executar())
+    print(f"   Inscrição 20230001 -> IA201: {aprovada['status']}")
+    print(f"   Inscrição 20230002 -> ASM101: {recusada['status']}")
+    assert aprovada["status"] == "aprovado"
+    assert recusada["status"] == "recusado"
+    assert "Propinas em atraso" in recusada["mensagem"]
+    assert horario["status"] == "sucesso"
+    
+    from agentes.repositorio import obter_repositorio
+    assert "IA201" in obter_repositorio(diretorio).buscar_estudante("20230001")["disciplinas_inscritas"]
+    
+    return True
+
+
+def test_gerador_carga():
+    """Testa o relatório de latências e um teste de carga curto em ciclo fechado"""
+    print("\n🧪 Testando gerador de carga...\n")
+    
+    from main import RelatorioCarga, executar_carga
+    
+    relatorio = RelatorioCarga()
+    relatorio.inicio, relatorio.fim = 0.0, 2.0
+    for ms in range(1, 101):
+        relatorio.registar("inscricao", ms / 1000)
+    relatorio.registar("inscricao", 0, respondido=False)
+    resumo = relatorio.resumo()["inscricao"]
+    print(f"   p50={resumo['p50']:.0f} ms, p95={resumo['p95']:.0f} ms, p99={resumo['p99']:.0f} ms")
+    assert (round(resumo["p50"]), round(resumo["p95"]), round(resumo["p99"])) == (50, 95, 99)
+    assert resumo["debito"] == 50 and resumo["sem_resposta"] == 1
+    
+    with mock.patch.dict(os.environ, {"ASM_DADOS": copiar_dados()}):
+        relatorio = asyncio.run(executar_carga(40, estudantes=4, semente=7))
+    total = relatorio.resumo()["total"]
+    assert total["pedidos"] == 40 and total["sem_resposta"] == 0
+    
+    return True
+
+
+def test_gerar_dados():
+    """Testa o gerador de dados sintéticos (reprodutibilidade e coerência)"""
+    print("\n🧪 Testando gerador de dados sintéticos...\n")
+    
+    from gerar_dados import gerar_dados, sobrepoe
+    from agentes.agente_horarios import HorariosBehaviour
+    
+    with tempfile.TemporaryDirectory() as destino:
+        cursos, estudantes = gerar_dados(destino, n_estudantes=300, n_cursos=120, semente=3)
+        with open(os.path.join(destino, 'estudantes.json'), 'r', encoding='utf-8') as f:
+            assert json.load(f)["estudantes"] == estudantes
+    
+    assert (cursos, estudantes) == gerar_dados(tempfile.mkdtemp(), 300, 120, semente=3)
+    print(f"   {len(cursos)} disciplinas e {len(estudantes)} estudantes, reprodutíveis com a mesma semente")
+    
+    por_codigo = {c["codigo"]: c for c in cursos}
+    for curso in cursos:
+        assert all(p in por_codigo for p in curso["prerequisitos"])
+    
+    horarios = HorariosBehaviour()
+    for estudante in estudantes:
+        inscritas = estudante["disciplinas_inscritas"]
+        assert sum(por_codigo[c]["creditos"] for c in inscritas) <= 30
+        slots = {c: horarios.parsear_horario(por_codigo[c]["horario"]) for c in inscritas}
+        assert not any(sobrepoe(slots[a], slots[b]) for a in inscritas for b in inscritas if a < b)
+        assert not any(horarios.detectar_conflito(slots[a], slots[b]) for a in inscritas for b in inscritas if a < b)
+    
+    # A API antiga continua a dar respostas certas
+    aula = horarios.parsear_horario("Segunda 14:00-16:00")
+    assert aula == ((1, 14 * 60, 16 * 60),) and horarios.hora_para_minutos("14:30") == 870
+    assert horarios.detectar_conflito(aula, aula)
+    assert not horarios.detectar_conflito(aula, horarios.parsear_horario("Segunda 16:00-18:00"))
+    
+    return True
+
+
+def test_repositorio_dados():
+    """Testa os índices do repositório de dados partilhado"""
+    print("\n🧪 Testando repositório de dados...\n")
+    
+    from agentes.repositorio import RepositorioDados
+    
+    repositorio = RepositorioDados()
+    repositorio.carregar()
+    print(f"   {len(repositorio.estudantes_por_id)} estudantes, {len(repositorio.cursos_por_codigo)} "
+          f"disciplinas, {len(repositorio.estatutos_por_tipo)} estatutos indexados")
+    assert repositorio.buscar_estudante("20230002")["nome"] == "Maria Santos"
+    assert repositorio.buscar_curso("RC301")["prerequisitos"] == ["BD101"]
+    assert repositorio.buscar_estatuto("atleta")["tipo"] == "atleta"
+    assert repositorio.buscar_estudante("00000000") is None
+    assert repositorio.buscar_curso("XX999") is None
+    
+    return True
+
+
+def test_recarregar_dados():
+    """Testa a partilha do repositório e a recarga quando um ficheiro muda"""
+    print("\n🧪 Testando recarga de dados...\n")
+    
+    from agentes.repositorio import obter_repositorio
+    from agentes.agente_financeiro import FinanceiroBehaviour
+    from agentes.agente_horarios import HorariosBehaviour
+    
+    diretorio = copiar_dados()
+    financeiro = FinanceiroBehaviour()
+    horarios = HorariosBehaviour()
+    asyncio.run(financeiro.carregar_dados(diretorio))
+    asyncio.run(horarios.carregar_dados(diretorio))
+    assert financeiro.repositorio is horarios.repositorio is obter_repositorio(diretorio)
+    
+    repositorio = financeiro.repositorio
+    repositorio.intervalo_verificacao = 0
+    cursos_antes = repositorio.cursos_por_codigo
+    
+    caminho = os.path.join(diretorio, 'estudantes.json')
+    with open(caminho, 'r', encoding='utf-8') as f:
+        dados = json.load(f)
+    dados["estudantes"][1]["propinas_em_atraso"] = False
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(dados, f)
+    os.utime(caminho, ns=(0, os.stat(caminho).st_mtime_ns + 10**9))
+    
+    resposta = asyncio.run(financeiro.verificar_propinas({"estudante_id": "20230002"}))
+    print(f"   Após alterar estudantes.json: {resposta['mensagem']}")
+    assert resposta["aprovado"]
+    # Só o ficheiro alterado é lido de novo
+    assert repositorio.cursos_por_codigo is cursos_antes
+    
+    return True
+
+
+def test_armazenamento():
+    """Testa a gravação de inscrições, vagas e estatutos em SQLite"""
+    print("\n🧪 Testando armazenamento SQLite...\n")
+    
+    from agentes.armazenamento import ArmazenamentoSQLite
+    from agentes.repositorio import RepositorioDados
+    
+    caminho = os.path.join(tempfile.mkdtemp(), 'secretaria.db')
+    armazenamento = ArmazenamentoSQLite(caminho)
+    transacoes = []
+    escrever = armazenamento.escrever
+    armazenamento.escrever = lambda operacoes: (transacoes.append(len(operacoes)), escrever(operacoes))
+    
+    async def gravar():
+        # Pedidos em simultâneo são gravados juntos
+        await asyncio.gather(*(armazenamento.inscrever(f"E{i}", "IA201") for i in range(20)))
+        await armazenamento.inscrever("20230001", "IA201")
+        await armazenamento.inscrever("20230001", "RC301")
+        await armazenamento.anular_inscricao("20230001", "IA201")
+        await armazenamento.conceder_estatuto("20230001", "atleta")
+    
+    asyncio.run(gravar())
+    armazenamento.fechar()
+    print(f"   {sum(transacoes)} operações gravadas em {len(transacoes)} transações")
+    assert len(transacoes) < 20
+    
+    # Depois de reabrir, as alterações aparecem nas pesquisas do repositório
+    repositorio = RepositorioDados()
+    repositorio.carregar()
+    repositorio.armazenamento = ArmazenamentoSQLite(caminho)
+    estudante = repositorio.buscar_estudante("20230001")
+    assert estudante["disciplinas_inscritas"] == ["RC301"]
+    assert estudante["estatuto"] == "atleta"
+    assert repositorio.buscar_curso("IA201")["vagas"] == repositorio.cursos_por_codigo["IA201"]["vagas"] - 20
+    # Os dados dos ficheiros não são alterados
+    assert repositorio.estudantes_por_id["20230001"]["disciplinas_inscritas"] == []
+    repositorio.armazenamento.fechar()
+    
+    return True
+
+
+def test_reservas_vagas():
+    """Testa a reserva de vagas (reservar, confirmar, libertar e expirar)"""
+    print("\n🧪 Testando reservas de vagas...\n")
+    
+    from agentes.reservas import RegistoVagas
+    from agentes.agente_academico import AcademicoBehaviour
+    
+    agora = [0.0]
+    registo = RegistoVagas(validade=30, relogio=lambda: agora[0])
+    assert registo.reservar("A", "RC301", 2) and registo.reservar("B", "RC301", 2)
+    assert not registo.reservar("C", "RC301", 2)
+    # Renovar a própria reserva não ocupa outro lugar
+    assert registo.reservar("A", "RC301", 2)
+    assert registo.libertar("B", "RC301") and registo.reservar("C", "RC301", 2)
+    agora[0] = 31
+    assert registo.disponiveis("RC301", 2) == 2
+    assert not registo.libertar("A", "RC301")
+    
+    # Três estudantes para uma disciplina com 2 vagas
+    academico = AcademicoBehaviour()
+    asyncio.run(academico.carregar_dados(copiar_dados(cursos_extra=[
+        {"codigo": "X1", "nome": "X1", "creditos": 6, "vagas": 2, "prerequisitos": []}
+    ])))
+    
+    async def inscrever_todos():
+        respostas = []
+        for estudante_id in ("20230001", "20230002", "20230003"):
+            resposta = await academico.verificar_inscricao({"estudante_id": estudante_id, "disciplina": "X1"})
+            respostas.append(resposta)
+        registos = await asyncio.gather(*(
+            academico.registar_inscricao({"estudante_id": e, "disciplinas": ["X1"]})
+            for e in ("20230001", "20230002", "20230003")
+        ))
+        return respostas, registos
+    
+    respostas, registos = asyncio.run(inscrever_todos())
+    print(f"   Verificações: {[r['aprovado'] for r in respostas]}, registos: {[r['status'] for r in registos]}")
+    assert [r["aprovado"] for r in respostas] == [True, True, False]
+    assert respostas[2]["mensagem"] == "Não há vagas disponíveis"
+    assert [r["status"] for r in registos] == ["sucesso", "sucesso", "recusado"]
+    assert academico.buscar_curso("X1")["vagas"] == 0
+    
+    # Anular uma inscrição liberta a vaga
+    asyncio.run(academico.anular_inscricao({"estudante_id": "20230001", "disciplina": "X1"}))
+    assert asyncio.run(academico.verificar_inscricao({"estudante_id": "20230003", "disciplina": "X1"}))["aprovado"]
+    
+    return True
+
+
+def test_horarios_compilados():
+    """Testa a compilação dos horários e a deteção de conflitos sobre os tuplos"""
+    print("\n🧪 Testando horários compilados...\n")
+    
+    import random
+    from gerar_dados import gerar_dados, sobrepoe
+    from agentes.horario import compilar_horario, sobrepostos
+    from agentes.repositorio import RepositorioDados
+    
+    assert compilar_horario("Quarta 14:00-16:00, Segunda 9:30-11:00, Domingo 8:00-9:00") == (
+        (1, 570, 660), (3, 840, 960)
+    )
+    assert compilar_horario("") == ()
+    
+    repositorio = RepositorioDados()
+    repositorio.carregar()
+    assert repositorio.buscar_horario("IA201") == compilar_horario(repositorio.buscar_curso("IA201")["horario"])
+    assert repositorio.buscar_horario("XX999") is None
+    
+    # Mesmo resultado que a comparação de todas as aulas duas a duas
+    cursos, _ = gerar_dados(tempfile.mkdtemp(), n_estudantes=10, n_cursos=300, semente=5)
+    horarios = [compilar_horario(c["horario"]) for c in cursos]
+    aleatorio = random.Random(5)
+    conflitos = 0
+    for _ in range(5000):
+        a, b = aleatorio.sample(horarios, 2)
+        assert sobrepostos(a, b) == sobrepoe(a, b)
+        conflitos += sobrepostos(a, b)
+    print(f"   {conflitos} conflitos em 5000 pares, iguais à comparação aula a aula")
+    
+    return True
+
+
+def test_mascaras_horario():
+    """Testa as máscaras de bits dos horários e a sua atualização com inscrições"""
+    print("\n🧪 Testando máscaras de horário...\n")
+    
+    import random
+    from gerar_dados import gerar_dados
+    from agentes.horario import compilar_horario, mascara_horario, sobrepostos
+    from agentes.agente_horarios import HorariosBehaviour
+    
+    cursos, _ = gerar_dados(tempfile.mkdtemp(), n_estudantes=10, n_cursos=300, semente=6)
+    horarios = [compilar_horario(c["horario"]) for c in cursos]
+    aleatorio = random.Random(6)
+    for _ in range(5000):
+        a, b = aleatorio.sample(horarios, 2)
+        assert bool(mascara_horario(a) & mascara_horario(b)) == sobrepostos(a, b)
+    
+    horarios = HorariosBehaviour()
+    asyncio.run(horarios.carregar_dados(copiar_dados()))
+    armazenamento = horarios.repositorio.armazenamento
+    
+    def verificar(disciplina):
+        return asyncio.run(horarios.verificar_conflito({"estudante_id": "20230001", "disciplina": disciplina}))
+    
+    assert verificar("ASM101")["sem_conflito"]
+    # Depois de inscrito em BD101, ASM101 (mesma hora) passa a colidir
+    asyncio.run(armazenamento.inscrever("20230001", "BD101"))
+    resposta = verificar("ASM101")
+    print(f"   Após inscrição em BD101: {resposta['mensagem']}")
+    assert not resposta["sem_conflito"] and "(BD101)" in resposta["mensagem"]
+    assert horarios.mascaras_estudantes["20230001"][1] == horarios.buscar_mascara("BD101")
+    asyncio.run(armazenamento.anular_inscricao("20230001", "BD101"))
+    assert verificar("ASM101")["sem_conflito"]
+    assert horarios.mascaras_estudantes["20230001"] == ((), 0)
+    
+    return True
+
+
+def test_horas_fora_da_grelha():
+    """Testa conflitos com horas que não são múltiplos de 5 minutos (máscaras como pré-filtro)"""
+    print("\n🧪 Testando horas fora da grelha de 5 minutos...\n")
+    
+    from agentes.agente_academico import AcademicoBehaviour
+    from agentes.agente_horarios import HorariosBehaviour
+    
+    turmas = [
+        {"turma": "T1", "horario": "Segunda 10:03-11:00", "vagas": 5},
+        {"turma": "T2", "horario": "Segunda 09:30-10:00", "vagas": 5}
+    ]
+    diretorio = copiar_dados([
+        {"codigo": "X1", "nome": "X1", "creditos": 6, "vagas": 5, "prerequisitos": [], "horario": "Segunda 09:00-10:02"},
+        {"codigo": "X2", "nome": "X2", "creditos": 6, "vagas": 5, "prerequisitos": [], "horario": "Segunda 10:03-11:00"},
+        {"codigo": "X3", "nome": "X3", "creditos": 6, "prerequisitos": [], "turmas": turmas}
+    ])
+    horarios = HorariosBehaviour()
+    academico = AcademicoBehaviour()
+    asyncio.run(horarios.carregar_dados(diretorio))
+    asyncio.run(academico.carregar_dados(diretorio))
+    repositorio = horarios.repositorio
+    asyncio.run(repositorio.armazenamento.inscrever("20230001", "X1"))
+    
+    # As máscaras intersectam-se (intervalo das 10:00), mas as aulas não se sobrepõem
+    assert repositorio.buscar_mascara("X1") & repositorio.buscar_mascara("X2")
+    assert not repositorio.colidem("X1", "X2") and repositorio.colidem("X1", "X3/T2")
+    
+    resposta = asyncio.run(horarios.verificar_conflito({"estudante_id": "20230001", "disciplina": "X2"}))
+    print(f"   X2 (10:03) depois de X1 (até às 10:02): {resposta['mensagem']}")
+    assert resposta["sem_conflito"]
+    resposta = asyncio.run(horarios.verificar_conflito({"estudante_id": "20230001", "disciplina": "X3"}))
+    assert resposta["sem_conflito"] and resposta["turmas"] == ["T1"]
+    resposta = asyncio.run(horarios.verificar_conflito_lote({"estudante_id": "20230001", "disciplinas": ["X3", "X2"]}))
+    assert [r["sem_conflito"] for r in resposta["resultados"]] == [True, False]
+    
+    estudante = academico.buscar_estudante("20230001")
+    assert academico.turmas_sem_conflito(estudante, "X2") == []
+    assert academico.turmas_sem_conflito(estudante, "X3") == ["T1"]
+    
+    # A matriz de conflitos e o relatório também não contam a interseção das máscaras
+    pedido = {"estudante_id": "20230001", "disciplina": "X2", "relatorio": True}
+    assert asyncio.run(horarios.verificar_conflito(pedido))["sem_conflito"]
+    assert not horarios.matriz.colidem("X1", "X2") and horarios.matriz.colidem("X1", "X3/T2")
+    resposta = asyncio.run(horarios.conflitos_disciplinas({"disciplinas": ["X1", "X2", "X3"]}))
+    assert resposta["conflitos"] == []
+    resposta = asyncio.run(horarios.propor_horario({"estudante_id": "20230001", "disciplinas": ["X2"]}))
+    assert resposta["disciplinas"] == ["X2"] and resposta["fora"] == []
+    resposta = asyncio.run(horarios.disciplinas_compativeis({"estudante_id": "20230001"}))
+    print(f"   Compatíveis com X1: {resposta['disciplinas']}")
+    assert "X2" in resposta["disciplinas"] and "X3" in resposta["disciplinas"]
+    
+    return True
+
+
+def test_matriz_conflitos():
+    """Testa a matriz de conflitos e a sua atualização quando muda um horário"""
+    print("\n🧪 Testando matriz de conflitos...\n")
+    
+    import random
+    from gerar_dados import gerar_dados
+    from agentes.conflitos import MatrizConflitos
+    from agentes.horario import compilar_horario, mascara_horario, sobrepostos
+    from agentes.agente_horarios import HorariosBehaviour
+    
+    cursos, _ = gerar_dados(tempfile.mkdtemp(), n_estudantes=10, n_cursos=300, semente=8)
+    horarios = {c["codigo"]: compilar_horario(c["horario"]) for c in cursos}
+    matriz = MatrizConflitos()
+    matriz.atualizar({codigo: mascara_horario(h) for codigo, h in horarios.items()}, horarios)
+    aleatorio = random.Random(8)
+    for _ in range(5000):
+        a, b = aleatorio.sample(list(horarios), 2)
+        assert matriz.colidem(a, b) == sobrepostos(horarios[a], horarios[b])
+    
+    horarios = HorariosBehaviour()
+    diretorio = copiar_dados()
+    asyncio.run(horarios.carregar_dados(diretorio))
+    resposta = asyncio.run(horarios.conflitos_disciplinas({"disciplinas": ["ASM101", "IA201", "BD101", "POO202"]}))
+    print(f"   Conflitos: {resposta['conflitos']}")
+    assert resposta["conflitos"] == [["ASM101", "BD101"], ["IA201", "POO202"]]
+    
+    # RC301 passa para a hora de IA201: só RC301 é recalculada
+    caminho = os.path.join(diretorio, 'cursos.json')
+    with open(caminho, 'r', encoding='utf-8') as f:
+        dados = json.load(f)
+    dados["cursos"][4]["horario"] = "Terça 11:00-13:00"
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(dados, f)
+    os.utime(caminho, ns=(0, os.stat(caminho).st_mtime_ns + 10**9))
+    horarios.repositorio.intervalo_verificacao = 0
+    horarios.repositorio.verificar_alteracoes()
+    repositorio = horarios.repositorio
+    assert horarios.matriz.atualizar(repositorio.mascaras_por_codigo, repositorio.horarios_por_codigo) == ["RC301"]
+    assert horarios.matriz.colidem("IA201", "RC301") and horarios.matriz.colidem("POO202", "RC301")
+    assert not horarios.matriz.colidem("BD101", "RC301")
+    
+    return True
+
+
+def test_relatorio_conflitos():
+    """Testa o relatório com todos os conflitos de horário de uma inscrição"""
+    print("\n🧪 Testando relatório de conflitos...\n")
+    
+    from agentes.horario import compilar_horario, sobreposicoes
+    from agentes.agente_horarios import HorariosBehaviour
+    
+    assert sobreposicoes(compilar_horario("Segunda 9:00-11:00, Terça 10:00-12:00"),
+                         compilar_horario("Segunda 10:00-12:00, Terça 8:00-10:30")) == [
+        (1, 600, 660), (2, 600, 630)
+    ]
+    
+    horarios = HorariosBehaviour()
+    asyncio.run(horarios.carregar_dados(copiar_dados(cursos_extra=[
+        {"codigo": "X1", "nome": "X1", "creditos": 6, "vagas": 10, "prerequisitos": [],
+         "horario": "Segunda 15:00-17:00, Terça 11:00-12:00"}
+    ])))
+    armazenamento = horarios.repositorio.armazenamento
+    asyncio.run(armazenamento.inscrever("20230001", "BD101"))
+    asyncio.run(armazenamento.inscrever("20230001", "IA201"))
+    
+    pedido = {"estudante_id": "20230001", "disciplina": "X1"}
+    resposta = asyncio.run(horarios.verificar_conflito(pedido))
+    assert "conflitos" not in resposta and resposta["mensagem"].endswith("(BD101)")
+    
+    resposta = asyncio.run(horarios.verificar_conflito({**pedido, "relatorio": True}))
+    print(f"   {resposta['mensagem']}")
+    assert not resposta["sem_conflito"]
+    assert [(c["codigo"], c["sobreposicoes"]) for c in resposta["conflitos"]] == [
+        ("BD101", [{"dia": "Segunda", "inicio": "15:00", "fim": "16:00"}]),
+        ("IA201", [{"dia": "Terça", "inicio": "11:00", "fim": "12:00"}])
+    ]
+    
+    resposta = asyncio.run(horarios.verificar_conflito_lote({
+        "estudante_id": "20230001",
+        "disciplinas": ["RC301", "X1"],
+        "relatorio": True
+    }))
+    assert [c["codigo"] for c in resposta["resultados"][1]["conflitos"]] == ["BD101", "IA201"]
+    
+    return True
+
+
+def test_propor_horario():
+    """Testa o solucionador de horários sem conflitos"""
+    print("\n🧪 Testando proposta de horário...\n")
+    
+    import itertools
+    import random
+    import time
+    from gerar_dados import gerar_dados
+    from agentes.conflitos import MatrizConflitos
+    from agentes.horario import compilar_horario, mascara_horario
+    from agentes.solucionador import resolver_horario
+    from agentes.agente_horarios import HorariosBehaviour
+    
+    # O maior conjunto encontrado é o mesmo da pesquisa exaustiva
+    cursos, _ = gerar_dados(tempfile.mkdtemp(), n_estudantes=10, n_cursos=300, semente=9)
+    compilados = {c["codigo"]: compilar_horario(c["horario"]) for c in cursos}
+    matriz = MatrizConflitos()
+    matriz.atualizar({codigo: mascara_horario(h) for codigo, h in compilados.items()}, compilados)
+    aleatorio = random.Random(9)
+    for _ in range(20):
+        codigos = [c["codigo"] for c in aleatorio.sample(cursos, 10)]
+        inicio = time.perf_counter()
+        horarios, completo = resolver_horario(matriz, [[c] for c in codigos])
+        assert completo and time.perf_counter() - inicio < 0.5
+        maior = max(
+            len(escolha) for r in range(len(codigos) + 1)
+            for escolha in itertools.combinations(codigos, r)
+            if not any(matriz.colidem(a, b) for a, b in itertools.combinations(escolha, 2))
+        )
+        assert len(horarios[0]) == maior
+        assert all(len(a) >= len(b) for a, b in zip(horarios, horarios[1:]))
+    
+    horarios = HorariosBehaviour()
+    asyncio.run(horarios.carregar_dados(copiar_dados()))
+    asyncio.run(horarios.repositorio.armazenamento.inscrever("20230001", "IA201"))
+    resposta = asyncio.run(horarios.propor_horario({
+        "estudante_id": "20230001",
+        "disciplinas": ["POO202", ["ASM101", "RC301"], "BD101"]
+    }))
+    print(f"   {resposta['mensagem']}: {resposta['disciplinas']}, fora: {resposta['fora']}")
+    # POO202 colide com IA201 (inscrita); ASM101 e BD101 colidem entre si
+    assert resposta["disciplinas"] == ["RC301", "BD101"]
+    assert resposta["fora"] == ["POO202"]
+    # Alternativas: só horários a que não se pode juntar mais nenhuma disciplina pedida
+    assert resposta["horarios"] == [["RC301", "BD101"], ["ASM101"]]
+    
+    return True
+
+
+def test_disciplinas_compativeis():
+    """Testa a lista de disciplinas que cabem no horário do estudante"""
+    print("\n🧪 Testando disciplinas compatíveis...\n")
+    
+    from agentes.agente_horarios import HorariosBehaviour
+    
+    horarios = HorariosBehaviour()
+    asyncio.run(horarios.carregar_dados(copiar_dados()))
+    asyncio.run(horarios.repositorio.armazenamento.inscrever("20230001", "IA201"))
+    
+    resposta = asyncio.run(horarios.disciplinas_compativeis({"estudante_id": "20230001"}))
+    print(f"   {resposta['mensagem']}: {resposta['disciplinas']}")
+    # IA201 inscrita, POO202 colide com IA201 e ASM101 já está feita
+    assert resposta["disciplinas"] == ["BD101", "RC301"]
+    for codigo in resposta["disciplinas"]:
+        pedido = {"estudante_id": "20230001", "disciplina": codigo}
+        assert asyncio.run(horarios.verificar_conflito(pedido))["sem_conflito"]
+    
+    # RC301 exige BD101, que ainda não foi feita
+    resposta = asyncio.run(horarios.disciplinas_compativeis({"estudante_id": "20230001", "prerequisitos": True}))
+    assert resposta["disciplinas"] == ["BD101"]
+    
+    # Turma acrescentada numa recarga: a disciplina continua a aparecer uma só vez
+    turmas = [{"turma": "T1", "horario": "Sábado 9:00-11:00", "vagas": 5}]
+    diretorio = copiar_dados([
+        {"codigo": "MAT1", "nome": "Matemática", "creditos": 6, "prerequisitos": [], "turmas": turmas},
+        {"codigo": "ZZ9", "nome": "Outra", "creditos": 6, "prerequisitos": [], "horario": "Sábado 14:00-16:00", "vagas": 5}
+    ])
+    horarios = HorariosBehaviour()
+    asyncio.run(horarios.carregar_dados(diretorio))
+    horarios.repositorio.intervalo_verificacao = 0
+    assert asyncio.run(horarios.disciplinas_compativeis({"estudante_id": "20230001"}))["disciplinas"][-2:] == ["MAT1", "ZZ9"]
+    
+    caminho = os.path.join(diretorio, 'cursos.json')
+    with open(caminho, 'r', encoding='utf-8') as f:
+        dados = json.load(f)
+    dados["cursos"][-2]["turmas"].append({"turma": "T2", "horario": "Sábado 16:00-18:00", "vagas": 5})
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(dados, f)
+    os.utime(caminho, ns=(0, os.stat(caminho).st_mtime_ns + 10**9))
+    resposta = asyncio.run(horarios.disciplinas_compativeis({"estudante_id": "20230001"}))
+    print(f"   Após acrescentar a turma MAT1/T2: {resposta['disciplinas']}")
+    assert horarios.matriz.codigos[-1] == "MAT1/T2"
+    assert resposta["disciplinas"].count("MAT1") == 1 and "ZZ9" in resposta["disciplinas"]
+    
+    return True
+
+
+def test_horario_consultado():
+    """Testa a cache das respostas de consultar_horario e a sua invalidação"""
+    print("\n🧪 Testando cache do horário consultado...\n")
+    
+    from agentes import agente_horarios
+    from agentes.agente_horarios import HorariosBehaviour
+    
+    diretorio = copiar_dados()
+    horarios = HorariosBehaviour()
+    asyncio.run(horarios.carregar_dados(diretorio))
+    repositorio = horarios.repositorio
+    repositorio.intervalo_verificacao = 0
+    
+    pedido = {"estudante_id": "20230001"}
+    vazio = horarios.horario_serializado(pedido)
+    assert json.loads(vazio)["horarios"] == []
+    assert horarios.horario_serializado(pedido) is vazio
+    
+    # Uma inscrição nova gera outra resposta
+    asyncio.run(repositorio.armazenamento.inscrever("20230001", "IA201"))
+    corpo = horarios.horario_serializado(pedido)
+    assert [h["codigo"] for h in json.loads(corpo)["horarios"]] == ["IA201"]
+    assert horarios.horario_serializado(pedido) is corpo
+    
+    # Alterar outra disciplina mantém a resposta; alterar IA201 descarta-a
+    caminho = os.path.join(diretorio, 'cursos.json')
+    with open(caminho, 'r', encoding='utf-8') as f:
+        dados = json.load(f)
+    for curso in dados["cursos"]:
+        if curso["codigo"] == "RC301":
+            curso["nome"] = "Redes"
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(dados, f)
+    os.utime(caminho, ns=(0, os.stat(caminho).st_mtime_ns + 10**9))
+    assert horarios.horario_serializado(pedido) is corpo
+    
+    for curso in dados["cursos"]:
+        if curso["codigo"] == "IA201":
+            curso["horario"] = "Terça 8:00-10:00"
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(dados, f)
+    os.utime(caminho, ns=(0, os.stat(caminho).st_mtime_ns + 2 * 10**9))
+    resposta = asyncio.run(horarios.consultar_horario(pedido))
+    print(f"   Após alterar IA201: {resposta['horarios']}")
+    assert resposta["horarios"][0]["horario"] == "Terça 8:00-10:00"
+    
+    # Só os estudantes usados mais recentemente ficam em memória
+    with mock.patch.object(agente_horarios, "LIMITE_HORARIOS_CONSULTADOS", 2):
+        for estudante_id in ("20230002", "20230003"):
+            horarios.horario_serializado({"estudante_id": estudante_id})
+    assert list(horarios.horarios_consultados) == ["20230002", "20230003"]
+    
+    return True
+
+
+def test_turmas():
+    """Testa as disciplinas com várias turmas: escolha da turma, horário e vagas"""
+    print("\n🧪 Testando turmas...\n")
+    
+    from main import SimuladorEstudante
+    from agentes import (
+        BarramentoLocal,
+        AgenteAssistente,
+        AgenteAcademico,
+        AgenteHorarios,
+        AgenteRegulamentos,
+        AgenteFinanceiro
+    )
+    from agentes.agente_academico import AcademicoBehaviour
+    from agentes.agente_horarios import HorariosBehaviour
+    from agentes.armazenamento import ArmazenamentoSQLite
+    
+    cursos_extra = [
+        {
+            "codigo": "CAL101",
+            "nome": "Cálculo",
+            "creditos": 6,
+            "prerequisitos": [],
+            "turmas": [
+                {"turma": "T1", "horario": "Segunda 14:00-16:00", "vagas": 1},
+                {"turma": "T2", "horario": "Terça 10:00-12:00", "vagas": 3},
+                {"turma": "T3", "horario": "Sexta 16:00-18:00", "vagas": 2}
+            ]
+        },
+        {
+            "codigo": "EST101",
+            "nome": "Estatística",
+            "creditos": 6,
+            "prerequisitos": [],
+            "turmas": [
+                {"turma": "T1", "horario": "Terça 10:00-12:00", "vagas": 5},
+                {"turma": "T2", "horario": "Sexta 17:00-19:00", "vagas": 5}
+            ]
+        }
+    ]
+    
+    async def executar():
+        barramento = BarramentoLocal()
+        for agente in (
+            AgenteFinanceiro("financeiro@localhost", "password"),
+            AgenteRegulamentos("regulamentos@localhost", "password"),
+            AgenteHorarios("horarios@localhost", "password"),
+            AgenteAcademico("academico@localhost", "password"),
+            AgenteAssistente("assistente@localhost", "password", "academico@localhost",
+                             "horarios@localhost", "regulamentos@localhost", "financeiro@localhost")
+        ):
+            barramento.registar(agente)
+        await barramento.iniciar()
+        
+        simulador = SimuladorEstudante("assistente@localhost", barramento)
+        try:
+            respostas = []
+            for pedido in (
+                {"tipo": "inscricao", "estudante_id": "20230001", "disciplina": "IA201"},
+                # T2 colide com IA201; entre T1 e T3 fica a que tem mais lugares livres
+                {"tipo": "inscricao", "estudante_id": "20230001", "disciplina": "CAL101"},
+                {"tipo": "inscricao", "estudante_id": "20230003", "disciplina": "CAL101"},
+                {"tipo": "consulta_horario", "estudante_id": "20230001"}
+            ):
+                respostas.append(await simulador.enviar(pedido))
+            return respostas
+        finally:
+            await barramento.parar()
+    
+    diretorio = copiar_dados(cursos_extra)
+    with mock.patch.dict(os.environ, {"ASM_DADOS": diretorio}):
+        ia, cal1, cal3, horario = asyncio.run(executar())
+    print(f"   20230001 -> CAL101: {cal1['mensagem']}")
+    print(f"   20230003 -> CAL101: {cal3['mensagem']}")
+    assert ia["status"] == cal1["status"] == cal3["status"] == "aprovado"
+    assert cal1["turma"] == "T3"
+    assert cal3["turma"] == "T2"
+    assert {"codigo": "CAL101", "nome": "Cálculo", "horario": "Sexta 16:00-18:00", "turma": "T3"} in horario["horarios"]
+    
+    horarios = HorariosBehaviour()
+    academico = AcademicoBehaviour()
+    asyncio.run(horarios.carregar_dados(diretorio))
+    asyncio.run(academico.carregar_dados(diretorio))
+    curso = academico.buscar_curso("CAL101")
+    assert curso["vagas"] == 4
+    assert [t["vagas"] for t in curso["turmas"]] == [1, 2, 1]
+    
+    # Só a turma atribuída (T3) conta no horário: BD101 (Segunda, como T1) cabe
+    resposta = asyncio.run(horarios.verificar_conflito({"estudante_id": "20230001", "disciplina": "BD101"}))
+    assert resposta["sem_conflito"]
+    
+    # EST101: T1 colide com IA201 e T2 com CAL101 (T3)
+    resposta = asyncio.run(horarios.verificar_conflito(
+        {"estudante_id": "20230001", "disciplina": "EST101", "relatorio": True}
+    ))
+    print(f"   20230001 -> EST101: {resposta['mensagem']}")
+    assert not resposta["sem_conflito"]
+    assert [(c["turma_pedida"], c["codigo"]) for c in resposta["conflitos"]] == [("T1", "IA201"), ("T2", "CAL101")]
+    resposta = asyncio.run(horarios.verificar_conflito({"estudante_id": "20230002", "disciplina": "EST101"}))
+    assert resposta["turmas"] == ["T1", "T2"]
+    
+    # No lote, as turmas sem conflito de CAL101 ficam reservadas para as seguintes
+    resposta = asyncio.run(horarios.verificar_conflito_lote(
+        {"estudante_id": "20230002", "disciplinas": ["IA201", "CAL101", "EST101"]}
+    ))
+    assert [r.get("turmas") for r in resposta["resultados"]] == [None, ["T1", "T3"], None]
+    assert not resposta["resultados"][2]["sem_conflito"]
+    
+    # A anulação liberta o lugar na turma
+    resposta = asyncio.run(academico.anular_inscricao({"estudante_id": "20230001", "disciplina": "CAL101"}))
+    assert resposta["status"] == "sucesso"
+    assert [t["vagas"] for t in academico.buscar_curso("CAL101")["turmas"]] == [1, 2, 2]
+    
+    gravado = ArmazenamentoSQLite(academico.repositorio.armazenamento.caminho)
+    assert gravado.turmas == {"20230003": {"CAL101": "T2"}}
+    assert gravado.ocupadas["CAL101/T3"] == 0
+    gravado.fechar()
+    
+    return True
+
+
+def test_grafo_prerequisitos():
+    """Testa o grafo de pré-requisitos: ordem topológica, fecho transitivo e ciclos"""
+    print("\n🧪 Testando grafo de pré-requisitos...\n")
+    
+    from agentes.agente_academico import AcademicoBehaviour
+    from agentes.precedencias import GrafoPrerequisitos
+    
+    cursos_extra = [
+        {"codigo": "IA301", "nome": "Aprendizagem Automática", "creditos": 6,
+         "horario": "Sábado 9:00-11:00", "vagas": 20, "prerequisitos": ["IA201", "BD101"]},
+        {"codigo": "X1", "nome": "Ciclo 1", "creditos": 6, "horario": "", "vagas": 5, "prerequisitos": ["X2"]},
+        {"codigo": "X2", "nome": "Ciclo 2", "creditos": 6, "horario": "", "vagas": 5, "prerequisitos": ["X1"]}
+    ]
+    academico = AcademicoBehaviour()
+    asyncio.run(academico.carregar_dados(copiar_dados(cursos_extra)))
+    grafo = academico.repositorio.grafo_prerequisitos
+    
+    ordem = [grafo.codigos[i] for i in grafo.ordem]
+    assert ordem.index("ASM101") < ordem.index("IA201") < ordem.index("IA301")
+    assert "X1" not in ordem and grafo.ciclos == ["X1", "X2"]
+    
+    resposta = asyncio.run(academico.cadeia_prerequisitos({"disciplina": "IA301", "estudante_id": "20230001"}))
+    print(f"   {resposta['mensagem']}: {resposta['cadeia']}")
+    assert resposta["cadeia"] == ["ASM101", "BD101", "IA201"]
+    assert resposta["em_falta"] == ["BD101", "IA201"]
+    assert not resposta["pode_inscrever"]
+    
+    resposta = asyncio.run(academico.cadeia_prerequisitos({"disciplina": "X1"}))
+    assert resposta["ciclo"] and resposta["cadeia"] == ["X2"]
+    
+    # A verificação de inscrição usa o grafo e mantém as mensagens
+    resposta = asyncio.run(academico.verificar_inscricao({"estudante_id": "20230002", "disciplina": "IA201"}))
+    assert resposta["mensagem"] == "Faltam pré-requisitos: ASM101"
+    resposta = asyncio.run(academico.verificar_inscricao({"estudante_id": "20230003", "disciplina": "RC301"}))
+    assert resposta["aprovado"]
+    
+    # Pré-requisitos fora do catálogo também contam
+    grafo = GrafoPrerequisitos([{"codigo": "A", "prerequisitos": ["Z"]}])
+    assert grafo.codigos_de(grafo.faltam("A", 0)) == ["Z"]
+    assert not grafo.faltam("A", grafo.conjunto(["Z"]))
+    
+    return True
+
+
+def test_elegibilidade_lote():
+    """Testa a matriz de elegibilidade em lote contra verificar_inscricao"""
+    print("\n🧪 Testando elegibilidade em lote...\n")
+    
+    from agentes.agente_academico import AcademicoBehaviour
+    
+    cursos_extra = [
+        {"codigo": "IA301", "nome": "Aprendizagem Automática", "creditos": 6,
+         "horario": "Sábado 9:00-11:00", "vagas": 20, "prerequisitos": ["IA201", "BD101"]},
+        {"codigo": "PROJ", "nome": "Projeto", "creditos": 30,
+         "horario": "Sábado 14:00-18:00", "vagas": 5, "prerequisitos": []},
+        {"codigo": "CHEIA", "nome": "Sem Vagas", "creditos": 3,
+         "horario": "Sábado 18:00-19:00", "vagas": 0, "prerequisitos": []}
+    ]
+    academico = AcademicoBehaviour()
+    asyncio.run(academico.carregar_dados(copiar_dados(cursos_extra)))
+    asyncio.run(academico.repositorio.armazenamento.inscrever("20230003", "RC301"))
+    
+    matriz = academico.calcular_elegibilidade()
+    print(f"   {int(matriz.elegivel.sum())} pares elegíveis em {matriz.elegivel.shape}")
+    assert matriz.elegivel.shape == (3, 8)
+    for estudante_id in matriz.ids:
+        for codigo in matriz.codigos:
+            estudante = academico.buscar_estudante(estudante_id)
+            resposta = academico.avaliar_inscricao(estudante, codigo, academico.creditos_inscritos(estudante))
+            academico.registo_vagas.libertar(estudante_id, codigo)
+            assert resposta["aprovado"] == (codigo in matriz.disciplinas(estudante_id)), (estudante_id, codigo)
+    
+    assert matriz.disciplinas("20230001") == ["IA201", "BD101", "POO202", "PROJ"]
+    # 20230003 já tem 6 créditos inscritos (RC301): PROJ excede o limite
+    assert "PROJ" not in matriz.disciplinas("20230003")
+    
+    return True
+
+
+def test_creditos_inscritos():
+    """Testa os totais de créditos mantidos em memória a cada inscrição, anulação e recarga"""
+    print("\n🧪 Testando créditos inscritos...\n")
+    
+    from agentes.agente_academico import AcademicoBehaviour
+    
+    diretorio = copiar_dados()
+    academico = AcademicoBehaviour()
+    asyncio.run(academico.carregar_dados(diretorio))
+    repositorio = academico.repositorio
+    repositorio.intervalo_verificacao = 0
+    creditos = repositorio.creditos
+    
+    def total(estudante_id):
+        # O total em memória tem de coincidir com a soma feita a partir dos dados
+        estudante = academico.buscar_estudante(estudante_id)
+        soma = sum(academico.buscar_curso(d)["creditos"] for d in estudante["disciplinas_inscritas"])
+        assert academico.creditos_inscritos(estudante) == soma, (estudante_id, soma)
+        return soma
+    
+    assert total("20230001") == 0
+    resposta = asyncio.run(academico.registar_inscricao({"estudante_id": "20230001", "disciplinas": ["IA201", "BD101"]}))
+    assert resposta["status"] == "sucesso", resposta
+    assert total("20230001") == 12
+    
+    # Alterações feitas diretamente no armazenamento (por outro agente) também contam
+    asyncio.run(repositorio.armazenamento.inscrever("20230003", "RC301"))
+    asyncio.run(repositorio.armazenamento.inscrever("20230003", "RC301"))
+    assert total("20230003") == 6
+    asyncio.run(academico.anular_inscricao({"estudante_id": "20230001", "disciplina": "BD101"}))
+    asyncio.run(repositorio.armazenamento.anular_inscricao("20230001", "BD101"))
+    assert total("20230001") == 6
+    
+    # Um segundo agente usa o mesmo registo de créditos
+    outro = AcademicoBehaviour()
+    asyncio.run(outro.carregar_dados(diretorio))
+    assert outro.repositorio.creditos is creditos
+    assert len(repositorio.armazenamento.observadores) == 1
+    
+    # Ao recarregar o ficheiro de estudantes os totais são calculados de novo
+    caminho = os.path.join(diretorio, "estudantes.json")
+    with open(caminho, encoding="utf-8") as f:
+        dados = json.load(f)
+    for estudante in dados["estudantes"]:
+        if estudante["id"] == "20230002":
+            estudante["disciplinas_inscritas"] = ["ASM101", "POO202"]
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(dados, f)
+    os.utime(caminho, ns=(0, os.stat(caminho).st_mtime_ns + 10**9))
+    assert total("20230002") == 12
+    assert total("20230001") == 6
+    
+    resposta = asyncio.run(academico.creditos_restantes({"estudante_id": "20230002"}))
+    print(f"   {resposta['mensagem']}")
+    assert resposta["status"] == "sucesso"
+    assert (resposta["creditos_inscritos"], resposta["creditos_restantes"], resposta["limite"]) == (12, 18, 30)
+    resposta = asyncio.run(academico.creditos_restantes({"estudante_id": "99999999"}))
+    assert resposta["status"] == "erro"
+    
+    return True
+
+
+def test_equivalencias_lote():
+    """Testa a tabela de equivalências e as equivalências em lote de um estudante transferido"""
+    print("\n🧪 Testando equivalências em lote...\n")
+    
+    from agentes.agente_academico import AcademicoBehaviour
+    from agentes.repositorio import RepositorioDados
+    
+    diretorio = copiar_dados()
+    caminho = os.path.join(diretorio, "estudantes.json")
+    with open(caminho, encoding="utf-8") as f:
+        dados = json.load(f)
+    dados["estudantes"].append({
+        "id": "20239999", "nome": "Estudante Transferido", "curso": "Engenharia Informática", "ano": 2,
+        "disciplinas_completas": ["UP-PROG1", "UP-BDADOS", "UP-REDES", "ASM101", "UP-OUTRA"],
+        "disciplinas_inscritas": [], "estatuto": None, "propinas_em_atraso": False
+    })
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(dados, f)
+    
+    academico = AcademicoBehaviour()
+    asyncio.run(academico.carregar_dados(diretorio))
+    repositorio = academico.repositorio
+    repositorio.intervalo_verificacao = 0
+    
+    def equivalencia(origem, destino):
+        return asyncio.run(academico.verificar_equivalencia({
+            "estudante_id": "20239999", "disciplina_origem": origem, "disciplina_destino": destino
+        }))["status"]
+    
+    # Regras da tabela (mesmo com origem de outra instituição) e regra geral dos créditos
+    assert equivalencia("UP-PROG1", "POO202") == "aprovado"
+    assert equivalencia("UP-REDES", "RC301") == "recusado"
+    assert equivalencia("ASM101", "IA201") == "recusado"
+    assert equivalencia("ASM101", "RC301") == "aprovado"
+    assert equivalencia("UP-OUTRA", "RC301") == "recusado"
+    
+    resposta = asyncio.run(academico.verificar_equivalencia_lote({
+        "estudante_id": "20239999", "disciplinas_destino": ["RC301", "ASM101"]
+    }))
+    print(f"   {resposta['mensagem']}")
+    pares = {(r["disciplina_origem"], r["disciplina_destino"]): r["status"] for r in resposta["resultados"]}
+    # ASM101 já está feita: não é destino de nenhum par
+    assert not any(destino == "ASM101" for _, destino in pares)
+    assert pares[("UP-PROG1", "POO202")] == pares[("UP-BDADOS", "BD101")] == "aprovado"
+    assert pares[("UP-REDES", "RC301")] == pares[("ASM101", "IA201")] == "recusado"
+    assert resposta["concedidas"] == {"POO202": "UP-PROG1", "BD101": "UP-BDADOS", "RC301": "ASM101"}
+    
+    # Cada par é decidido uma só vez; a decisão é reaproveitada no pedido seguinte
+    decisoes = dict(academico.decisoes_equivalencia)
+    assert ("UP-PROG1", "POO202") in decisoes
+    asyncio.run(academico.verificar_equivalencia_lote({"estudante_id": "20239999"}))
+    assert academico.decisoes_equivalencia[("UP-PROG1", "POO202")] is decisoes[("UP-PROG1", "POO202")]
+    
+    resposta = asyncio.run(academico.verificar_equivalencia_lote({
+        "estudante_id": "20239999", "disciplinas_origem": ["BD101"]
+    }))
+    assert resposta["status"] == "recusado" and resposta["resultados"][0]["mensagem"] == "Não completou a disciplina BD101"
+    
+    # Ao recarregar a tabela as decisões anteriores deixam de valer
+    caminho = os.path.join(diretorio, "equivalencias.json")
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump({"equivalencias": [{"origem": "UP-PROG1", "destino": "POO202", "decisao": "recusada"}]}, f)
+    os.utime(caminho, ns=(0, os.stat(caminho).st_mtime_ns + 10**9))
+    assert equivalencia("UP-PROG1", "POO202") == "recusado"
+    assert equivalencia("UP-BDADOS", "BD101") == "recusado"
+    
+    # O ficheiro de equivalências é opcional
+    os.remove(caminho)
+    repositorio = RepositorioDados(diretorio)
+    repositorio.carregar()
+    assert repositorio.equivalencias == [] and repositorio.tabela_equivalencias.regra("UP-PROG1", "POO202") is None
+    
+    return True
+
+
+def test_lista_espera():
+    """Testa a lista de espera com prioridades e a inscrição automática quando um lugar fica livre"""
+    print("\n🧪 Testando lista de espera...\n")
+    
+    from main import SimuladorEstudante
+    from agentes import BarramentoLocal, AgenteAssistente, AgenteAcademico, AgenteHorarios, AgenteFinanceiro
+    from agentes.agente_academico import AcademicoBehaviour
+    from agentes.lista_espera import ListaEspera, prioridade
+    
+    trabalhador = {"beneficios": ["Prioridade em inscrições noturnas"]}
+    noturno, diurno = ((0, 20 * 60, 22 * 60),), ((0, 9 * 60, 11 * 60),)
+    assert prioridade({"ano": 1}, trabalhador, noturno) < prioridade({"ano": 3}, None, noturno)
+    assert prioridade({"ano": 1}, trabalhador, diurno) > prioridade({"ano": 3}, None, diurno)
+    lista = ListaEspera()
+    for estudante_id, ano in (("A", 1), ("B", 3), ("C", 3)):
+        assert lista.entrar(estudante_id, "X", prioridade({"ano": ano}))
+    assert not lista.entrar("A", "X", prioridade({"ano": 1})) and lista.em_espera("X") == 3
+    assert [lista.posicao(e, "X") for e in "ABC"] == [3, 1, 2]
+    assert lista.sair("B", "X") and lista.posicao("C", "X") == 1 and lista.em_espera("X") == 2
+    assert lista.retirar("X")[0] == "C" and lista.retirar("X")[0] == "A" and lista.retirar("X") is None
+    assert lista.em_espera("X") == 0
+    
+    # Entradas e saídas repetidas não fazem crescer a heap nem tornam a entrada O(n)
+    lista = ListaEspera()
+    for i in range(5000):
+        lista.entrar(i, "Y", (1, 0))
+        if i % 2:
+            lista.sair(i - 1, "Y")
+    assert lista.em_espera("Y") == 2500 and len(lista.filas["Y"]) <= 2 * 2500 + 64
+    assert lista.posicao(1, "Y") == 1 and lista.retirar("Y")[0] == 1 and lista.em_espera("Y") == 2499
+    
+    cursos_extra = [
+        {"codigo": "X1", "nome": "Noturna", "creditos": 6, "horario": "Segunda 20:00-22:00", "vagas": 1, "prerequisitos": []},
+        {"codigo": "N2", "nome": "Também Noturna", "creditos": 6, "horario": "Segunda 20:00-21:00", "vagas": 5, "prerequisitos": []}
+    ]
+    academico = AcademicoBehaviour()
+    
+    async def executar():
+        await academico.carregar_dados(copiar_dados(cursos_extra))
+        armazenamento = academico.repositorio.armazenamento
+        await armazenamento.inscrever("20230001", "X1")
+        await armazenamento.inscrever("20230002", "N2")
+        assert (await academico.verificar_inscricao({"estudante_id": "20230003", "disciplina": "X1"}))["sem_vaga"]
+        
+        em_espera = [
+            (await academico.entrar_lista_espera({"estudante_id": e, "disciplina": "X1"}))["em_espera"]
+            for e in ("20230003", "20230002")
+        ]
+        assert em_espera == [1, 2]
+        # Estudante-trabalhador tem prioridade numa disciplina noturna
+        assert academico.lista_espera.do_estudante("20230002") == {"X1": 1}
+        assert academico.lista_espera.do_estudante("20230003") == {"X1": 2}
+        assert (await academico.entrar_lista_espera({"estudante_id": "20230001", "disciplina": "X1"}))["status"] == "erro"
+        
+        # O lugar libertado vai para o primeiro estudante sem conflito de horário
+        await academico.anular_inscricao({"estudante_id": "20230001", "disciplina": "X1"})
+        await academico.promocao
+        assert "X1" in academico.buscar_estudante("20230003")["disciplinas_inscritas"]
+        consulta = await academico.consultar_lista_espera({"estudante_id": "20230003"})
+        assert consulta["promovidas"] == ["X1"] and consulta["lista_espera"] == {}
+        assert academico.lista_espera.do_estudante("20230002") == {"X1": 1}
+        
+        await academico.anular_inscricao({"estudante_id": "20230002", "disciplina": "N2"})
+        await academico.anular_inscricao({"estudante_id": "20230003", "disciplina": "X1"})
+        await academico.promocao
+        assert "X1" in academico.buscar_estudante("20230002")["disciplinas_inscritas"]
+        assert academico.lista_espera.em_espera("X1") == 0
+    
+    asyncio.run(executar())
+    
+    # Pelo Assistente: a inscrição recusada por falta de vagas deixa o estudante em espera
+    async def pelo_barramento():
+        barramento = BarramentoLocal()
+        for agente in (
+            AgenteFinanceiro("financeiro@localhost", "password"),
+            AgenteHorarios("horarios@localhost", "password"),
+            AgenteAcademico("academico@localhost", "password"),
+            AgenteAssistente("assistente@localhost", "password", "academico@localhost",
+                             "horarios@localhost", "regulamentos@localhost", "financeiro@localhost")
+        ):
+            barramento.registar(agente)
+        await barramento.iniciar()
+        simulador = SimuladorEstudante("assistente@localhost", barramento)
+        try:
+            primeira = await simulador.enviar({"tipo": "inscricao", "estudante_id": "20230001", "disciplina": "X1"})
+            segunda = await simulador.enviar({"tipo": "inscricao", "estudante_id": "20230003", "disciplina": "X1"})
+            consulta = await simulador.enviar({"tipo": "lista_espera", "estudante_id": "20230003"})
+            return primeira, segunda, consulta
+        finally:
+            await barramento.parar()
+    
+    with mock.patch.dict(os.environ, {"ASM_DADOS": copiar_dados(cursos_extra)}):
+        primeira, segunda, consulta = asyncio.run(pelo_barramento())
+    print(f"   {segunda['mensagem']}")
+    assert primeira["status"] == "aprovado"
+    assert segunda["status"] == "recusado" and segunda["em_espera"] == 1
+    assert "sem_vaga" not in segunda
+    assert consulta["lista_espera"] == {"X1": 1}
+    
+    return True
+
+
+def test_admissao_inscricoes():
+    """Testa as janelas por escalão, a fila justa e o débito da admissão de inscrições"""
+    print("\n🧪 Testando admissão de inscrições...\n")
+    
+    import time
+    from main import executar_carga
+    from agentes.admissao import AdmissaoInscricoes, BaldeFichas, escalao
+    
+    assert escalao({"estatuto": "atleta", "ano": 1}) == 0
+    assert [escalao({"ano": ano}) for ano in (5, 3, 1, 9)] == [1, 3, 5, 1]
+    
+    agora = [0.0]
+    balde = BaldeFichas(10, 2, relogio=lambda: agora[0])
+    assert balde.tirar() and balde.tirar() and not balde.tirar()
+    assert abs(balde.espera() - 0.1) < 1e-9
+    agora[0] = 0.1
+    assert balde.tirar()
+    
+    async def admitir_todos(admissao, pedidos):
+        ordem = []
+        
+        async def pedir(nome, estudante_id, nivel, prioridade=()):
+            await admissao.admitir(estudante_id, nivel, prioridade)
+            ordem.append(nome)
+        
+        await asyncio.gather(*(pedir(*pedido) for pedido in pedidos))
+        return ordem
+    
+    # Janelas: cada escalão só entra quando abre; na abertura, a prioridade decide
+    admissao = AdmissaoInscricoes(1000, intervalo_janelas=0.05)
+    ordem = asyncio.run(admitir_todos(admissao, [
+        ("ano1", "A", 2), ("estatuto", "B", 0), ("ano2", "C", 1, (1,)), ("ano2-prioritario", "D", 1, (0,))
+    ]))
+    print(f"   Ordem por janelas: {ordem}")
+    assert ordem == ["estatuto", "ano2-prioritario", "ano2", "ano1"]
+    
+    # Fila justa: cinco pedidos do mesmo estudante não atrasam o de outro
+    admissao = AdmissaoInscricoes(50, rajada=1)
+    ordem = asyncio.run(admitir_todos(admissao, [(f"S{i}", "S", 0) for i in range(1, 6)] + [("T1", "T", 0)]))
+    assert ordem == ["S1", "S2", "T1", "S3", "S4", "S5"]
+    
+    # Quem chegou antes da abertura da janela não é ultrapassado por quem chega depois
+    async def janela_aberta():
+        agora = [0.0]
+        admissao = AdmissaoInscricoes(1000, intervalo_janelas=10, relogio=lambda: agora[0])
+        ordem = []
+        
+        async def pedir(nome, nivel):
+            await admissao.admitir(nome, nivel)
+            ordem.append(nome)
+        
+        cedo = asyncio.create_task(pedir("cedo", 1))
+        # O despacho fica a dormir até à abertura da janela de "cedo"
+        await asyncio.sleep(0.01)
+        agora[0] = 10.0
+        await pedir("tarde", 0)
+        await cedo
+        return ordem
+    
+    assert asyncio.run(janela_aberta()) == ["cedo", "tarde"]
+    
+    # Espera máxima: o pedido desiste, sai da fila e não gasta uma ficha
+    async def desistir():
+        admissao = AdmissaoInscricoes(5, rajada=1, espera_maxima=0.05)
+        primeiro = await admissao.admitir("A")
+        segundo = await admissao.admitir("B")
+        em_fila = admissao.em_fila()
+        await admissao.despacho
+        return primeiro, segundo, em_fila, admissao.admitidos, len(admissao.fila)
+    
+    assert asyncio.run(desistir()) == (True, False, 0, 1, 0)
+    
+    # Débito: 20 pedidos a 100 por segundo demoram pelo menos ~0,19 s
+    admissao = AdmissaoInscricoes(100, rajada=1)
+    inicio = time.monotonic()
+    asyncio.run(admitir_todos(admissao, [(i, i, 0) for i in range(20)]))
+    assert time.monotonic() - inicio >= 0.18 and admissao.admitidos == 20 and admissao.em_fila() == 0
+    
+    with mock.patch.dict(os.environ, {"ASM_DADOS": copiar_dados()}):
+        relatorio = asyncio.run(executar_carga(30, estudantes=4, mistura={"inscricao": 1}, semente=7,
+                                               taxa_admissao=200))
+    total = relatorio.resumo()["total"]
+    assert total["pedidos"] == 30 and total["sem_resposta"] == 0
+    
+    return True
+
+
+def test_indice_dividas():
+    """Testa o índice de propinas em atraso e a verificação de propinas em lote"""
+    print("\n🧪 Testando índice de dívidas...\n")
+    
+    from agentes.dividas import IndiceDividas
+    from agentes.agente_financeiro import FinanceiroBehaviour
+    
+    estudantes = [
+        {"id": "20230002", "propinas_em_atraso": True},
+        {"id": "20230001", "propinas_em_atraso": False},
+        {"id": "19990007", "propinas_em_atraso": True},
+        {"id": "E-17", "propinas_em_atraso": True},
+        {"id": "0042", "propinas_em_atraso": True}
+    ]
+    indice = IndiceDividas(estudantes)
+    assert list(indice.numeros) == [19990007, 20230002] and len(indice) == 4
+    ids = ["20230002", "20230001", "19990007", "E-17", "0042", "42", "99999999999999999999", "X"]
+    esperado = [True, False, True, True, True, False, False, False]
+    assert [indice.em_atraso(i) for i in ids] == esperado
+    assert indice.em_atraso_lote(ids).tolist() == esperado
+    assert IndiceDividas().em_atraso_lote(ids).tolist() == [False] * len(ids)
+    
+    financeiro = FinanceiroBehaviour()
+    asyncio.run(financeiro.carregar_dados(copiar_dados()))
+    resposta = asyncio.run(financeiro.verificar_propinas_lote({
+        "estudante_ids": ["20230001", "20230002", "20230003", "20239999"]
+    }))
+    print(f"   {resposta['mensagem']}")
+    assert resposta["em_atraso"] == ["20230002"]
+    assert resposta["aprovados"] == ["20230001", "20230003"]
+    assert resposta["nao_encontrados"] == ["20239999"]
+    assert not asyncio.run(financeiro.verificar_propinas({"estudante_id": "20230002"}))["aprovado"]
+    assert asyncio.run(financeiro.consultar_dividas({"estudante_id": "20239999"}))["status"] == "erro"
+    
+    return True
+
+
+def test_inscricao_paralela():
+    """Testa as verificações em paralelo: recusa igual ao modo sequencial, cancelamento e reserva libertada"""
+    print("\n🧪 Testando inscrição com verificações em paralelo...\n")
+    
+    from main import SimuladorEstudante
+    from agentes import BarramentoLocal, AgenteAssistente, AgenteAcademico, AgenteHorarios, AgenteFinanceiro
+    from agentes.agente_financeiro import FinanceiroBehaviour
+    from agentes.agente_horarios import HorariosBehaviour
+    
+    cursos_extra = [
+        {"codigo": "X1", "nome": "Lugar Único", "creditos": 6, "horario": "Sábado 9:00-11:00", "vagas": 1, "prerequisitos": []}
+    ]
+    
+    def atrasar(metodo, segundos):
+        async def atrasado(self, content):
+            await asyncio.sleep(segundos)
+            return await metodo(self, content)
+        return atrasado
+    
+    async def executar(paralela):
+        barramento = BarramentoLocal()
+        assistente = AgenteAssistente("assistente@localhost", "password", "academico@localhost",
+                                      "horarios@localhost", "regulamentos@localhost", "financeiro@localhost",
+                                      inscricao_paralela=paralela)
+        academico = AgenteAcademico("academico@localhost", "password")
+        for agente in (
+            AgenteFinanceiro("financeiro@localhost", "password"),
+            AgenteHorarios("horarios@localhost", "password"),
+            academico,
+            assistente
+        ):
+            barramento.registar(agente)
+        await barramento.iniciar()
+        simulador = SimuladorEstudante("assistente@localhost", barramento)
+        try:
+            # 20230002 tem propinas em atraso
+            pedido = {"tipo": "inscricao", "estudante_id": "20230002", "disciplina": "X1"}
+            # Financeiro lento: o Académico já aprovou (e reservou o lugar) quando chega a recusa
+            with mock.patch.object(FinanceiroBehaviour, "verificar_propinas",
+                                   atrasar(FinanceiroBehaviour.verificar_propinas, 0.2)):
+                depois_reserva = await simulador.enviar(dict(pedido))
+            comportamento, vagas = assistente.behaviours[0], academico.behaviours[0].registo_vagas
+            for _ in range(100):
+                if not vagas.reservas:
+                    break
+                await asyncio.sleep(0.01)
+            reservas = dict(vagas.reservas)
+            
+            # Horários lento: a verificação em curso é cancelada assim que o Financeiro recusa
+            with mock.patch.object(HorariosBehaviour, "verificar_conflito",
+                                   atrasar(HorariosBehaviour.verificar_conflito, 0.5)):
+                com_cancelamento = await simulador.enviar(dict(pedido))
+                # O Horários ainda não respondeu: o pedido dele já não está pendente
+                await asyncio.sleep(0.1)
+                pendentes = dict(comportamento.pending_requests)
+            
+            # O lugar continua livre para outro estudante
+            outro = await simulador.enviar({"tipo": "inscricao", "estudante_id": "20230001", "disciplina": "X1"})
+            return depois_reserva, com_cancelamento, reservas, pendentes, outro
+        finally:
+            await barramento.parar()
+    
+    with mock.patch.dict(os.environ, {"ASM_DADOS": copiar_dados(cursos_extra)}):
+        sequencial = asyncio.run(executar(False))
+    with mock.patch.dict(os.environ, {"ASM_DADOS": copiar_dados(cursos_extra)}):
+        paralela = asyncio.run(executar(True))
+    depois_reserva, com_cancelamento, reservas, pendentes, outro = paralela
+    print(f"   Paralela: {depois_reserva['mensagem']}")
+    
+    assert depois_reserva["status"] == "recusado" and "Propinas em atraso" in depois_reserva["mensagem"]
+    # Mesma resposta que no modo sequencial, em qualquer ordem de chegada das verificações
+    assert depois_reserva == com_cancelamento == sequencial[0] == sequencial[1]
+    assert reservas == {}
+    assert pendentes == {}
+    assert outro["status"] == sequencial[4]["status"] == "aprovado"
+    
+    return True
+
+
+def test_respostas_por_thread():
+    """Testa a entrega das respostas dos agentes especializados pelo thread de cada pedido"""
+    print("\n🧪 Testando respostas fora de ordem...\n")
+    
+    from spade.agent import Agent
+    from spade.behaviour import CyclicBehaviour
+    from spade.message import Message
+    from main import SimuladorEstudante
+    from agentes import BarramentoLocal, AgenteAssistente
+    
+    class RespondeInvertido(CyclicBehaviour):
+        """Académico falso: junta dois pedidos e responde primeiro ao segundo; ignora a disciplina "SILENCIO"."""
+        
+        async def on_start(self):
+            self.recebidos = []
+        
+        async def run(self):
+            msg = await self.receive(timeout=10)
+            if not msg or json.loads(msg.body).get("disciplina") == "SILENCIO":
+                return
+            self.recebidos.append(msg)
+            if len(self.recebidos) < 2:
+                return
+            for pedido in reversed(self.recebidos):
+                resposta = Message(to=str(pedido.sender))
+                resposta.thread = pedido.thread
+                resposta.body = json.dumps({"status": "sucesso", "disciplina": json.loads(pedido.body)["disciplina"]})
+                await self.send(resposta)
+            self.recebidos = []
+    
+    class AcademicoInvertido(Agent):
+        async def setup(self):
+            self.add_behaviour(RespondeInvertido())
+    
+    async def executar():
+        barramento = BarramentoLocal()
+        assistente = AgenteAssistente("assistente@localhost", "password", "academico@localhost",
+                                      "horarios@localhost", "regulamentos@localhost", "financeiro@localhost")
+        for agente in (AcademicoInvertido("academico@localhost", "password"), assistente):
+            barramento.registar(agente)
+        await barramento.iniciar()
+        simulador = SimuladorEstudante("assistente@localhost", barramento)
+        try:
+            # Dois pedidos do mesmo estudante em simultâneo; as respostas chegam pela ordem inversa
+            respostas = await asyncio.gather(*(
+                simulador.enviar({"tipo": "cadeia_prerequisitos", "estudante_id": "20230001", "disciplina": d})
+                for d in ("IA201", "RC301")
+            ))
+            comportamento = assistente.behaviours[0]
+            pendentes = dict(comportamento.pending_requests)
+            # Sem resposta: o pedido expira e deixa de estar pendente
+            expirado = await comportamento.pedir("academico@localhost", {"disciplina": "SILENCIO"}, timeout=0.1)
+            return respostas, pendentes, expirado, dict(comportamento.pending_requests)
+        finally:
+            await barramento.parar()
+    
+    respostas, pendentes, expirado, pendentes_depois = asyncio.run(executar())
+    print(f"   Respostas: {[r['disciplina'] for r in respostas]}")
+    assert [r["disciplina"] for r in respostas] == ["IA201", "RC301"]
+    assert pendentes == {}
+    assert expirado is None and pendentes_depois == {}
+    
+    return True
+
+
+def test_estatuto_sem_bloqueio():
+    """Testa que a gravação de um estatuto concedido não atrasa os outros pedidos do Agente Regulamentos"""
+    print("\n🧪 Testando concessão de estatuto em segundo plano...\n")
+    
+    import time
+    from main import SimuladorEstudante
+    from agentes import BarramentoLocal, AgenteRegulamentos
+    from agentes.armazenamento import ArmazenamentoSQLite
+    
+    escrever = ArmazenamentoSQLite.escrever
+    
+    def escrever_devagar(self, operacoes):
+        time.sleep(0.5)
+        return escrever(self, operacoes)
+    
+    async def executar():
+        barramento = BarramentoLocal()
+        barramento.registar(AgenteRegulamentos("regulamentos@localhost", "password"))
+        await barramento.iniciar()
+        simulador = SimuladorEstudante("regulamentos@localhost", barramento)
+        ordem = []
+        
+        async def pedir(nome, pedido):
+            resposta = await simulador.enviar(pedido)
+            ordem.append(nome)
+            return resposta
+        
+        try:
+            documentos = ["Declaração da federação desportiva", "Calendário de competições"]
+            concessoes = [
+                asyncio.create_task(pedir(nome, {"tipo": "verificar_estatuto", "estudante_id": "20230001",
+                                                 "tipo_estatuto": tipo, "documentos": documentos}))
+                for nome, tipo in (("atleta", "atleta"), ("outro", "dirigente-associativo"))
+            ]
+            await asyncio.sleep(0.05)
+            consulta = await pedir("consulta", {"tipo": "consultar_estatuto", "tipo_estatuto": "atleta"})
+            return await asyncio.gather(*concessoes), consulta, ordem
+        finally:
+            simulador.parar()
+            await barramento.parar()
+    
+    with mock.patch.dict(os.environ, {"ASM_DADOS": copiar_dados()}), \
+            mock.patch.object(ArmazenamentoSQLite, "escrever", escrever_devagar):
+        (atleta, outro), consulta, ordem = asyncio.run(executar())
+    print(f"   Ordem das respostas: {ordem}")
+    # A consulta não espera pelo commit da concessão
+    assert ordem.index("consulta") < ordem.index("atleta") and consulta["status"] == "sucesso"
+    assert atleta["status"] == "aprovado"
+    # O segundo pedido já vê o estatuto concedido, ainda antes de gravado
+    assert outro["status"] == "recusado" and "atleta" in outro["mensagem"]
+    
+    return True
+
+
 if __name__ == "__main__":
     print("="*70)
     print("🧪 TESTES DO SISTEMA DE SECRETARIA UNIVERSITÁRIA")
@@ -107,6 +1559,33 @@ if __name__ == "__main__":
     success = test_data_loading() and success
     success = test_agents_import() and success
     success = test_logic() and success
+    success = test_inscricao_lote() and success
+    success = test_barramento_local() and success
+    success = test_gerador_carga() and success
+    success = test_gerar_dados() and success
+    success = test_repositorio_dados() and success
+    success = test_recarregar_dados() and success
+    success = test_armazenamento() and success
+    success = test_reservas_vagas() and success
+    success = test_horarios_compilados() and success
+    success = test_mascaras_horario() and success
+    success = test_horas_fora_da_grelha() and success
+    success = test_matriz_conflitos() and success
+    success = test_relatorio_conflitos() and success
+    success = test_propor_horario() and success
+    success = test_disciplinas_compativeis() and success
+    success = test_horario_consultado() and success
+    success = test_turmas() and success
+    success = test_grafo_prerequisitos() and success
+    success = test_elegibilidade_lote() and success
+    success = test_creditos_inscritos() and success
+    success = test_equivalencias_lote() and success
+    success = test_lista_espera() and success
+    success = test_admissao_inscricoes() and success
+    success = test_indice_dividas() and success
+    success = test_inscricao_paralela() and success
+    success = test_respostas_por_thread() and success
+    success = test_estatuto_sem_bloqueio() and success
     
     # Resultado final
     print("\n" + "="*70)